@@ -16,12 +16,12 @@ VERSION = "0.7.14"
 
 # What packages are required for this module to be executed?
 REQUIRED = [
-    'numpy', 'python-constraint', 'matplotlib', 'pandas'
+    'numpy', 'matplotlib', 'pandas'
 ]
 
 # What packages are optional?
 EXTRAS = {
-
+    'benchmark': ['python-constraint'],  # Reference candidate generation of python -m tacle.benchmark join
 }
 
 # Distribute: python setup.py upload
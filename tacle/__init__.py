@@ -4,11 +4,19 @@ from typing import List, Union
 import numpy as np
 import csv
 
+from . import parallel, sparse
 from .core.virtual_template import is_virtual
 from .convert import get_tables
 from .detect import detect_table_ranges, get_type_data
+from .frame import table_from_columns
+from .incremental import IncrementalSheet
 from .learn import learn_constraints
+from .core.selectivity import statistics as filter_statistics
 from .core.solutions import Constraint
+from .sheet_cache import SheetCache
+from .sparse import SparseSheet
+from .stream import read_csv
+from .util.cache import registry as cache_registry
 
 
 def parse_csv(csv_file):
@@ -27,14 +35,23 @@ def parse_csv(csv_file):
     return data
 
 
-def learn_from_csv(csv_file, filters=None, virtual=None, solve_timeout=None, tables=None):
-    return learn_from_cells(parse_csv(csv_file), filters, virtual=virtual, solve_timeout=solve_timeout, tables=tables)
+def learn_from_csv(csv_file, filters=None, virtual=None, solve_timeout=None, tables=None, workers=None,
+                   cache_dir=None):
+    if cache_dir is not None and not tables:
+        data, tables = cached_tables_from_csv(csv_file, cache_dir, workers=workers)
+        return learn_from_cells(data, filters, virtual=virtual, solve_timeout=solve_timeout, tables=tables)
+    data, type_data = read_csv(csv_file)
+    return learn_from_cells(data, filters, virtual=virtual, solve_timeout=solve_timeout, tables=tables,
+                            type_data=type_data, workers=workers)
 
 
-def learn_from_cells(data, filters=None, virtual=None, orientation=None, solve_timeout=None, tables=None):
-    data = np.array(data, dtype=object)
-    type_data = get_type_data(data)
-    tables = tables or get_tables(data, type_data, detect_table_ranges(type_data, orientation=orientation))
+def learn_from_cells(data, filters=None, virtual=None, orientation=None, solve_timeout=None, tables=None,
+                     type_data=None, workers=None):
+    if not tables:
+        # Given tables already contain their cells, the grid (e.g., memory-mapped from the sheet cache) is not needed
+        data = np.asarray(data, dtype=object)
+        type_data = parallel.get_type_data(data, workers) if type_data is None else type_data
+        tables = get_tables(data, type_data, detect_table_ranges(type_data, orientation=orientation))
     constraints = learn_constraints(data, tables, virtual, solve_timeout).constraints
     if virtual:
         # constraints = [c for c in constraints if c.template.target and
@@ -47,30 +64,74 @@ def learn_from_cells(data, filters=None, virtual=None, orientation=None, solve_t
     return constraints
 
 
+def learn_from_frame(frame, filters=None, virtual=None, solve_timeout=None, name="T1"):
+    """
+    Learns constraints from a pandas DataFrame (or a dictionary of typed columns), using the column dtypes
+    """
+    table = table_from_columns(frame, name)
+    return learn_from_cells(table.data, filters, virtual=virtual, solve_timeout=solve_timeout, tables=[table])
+
+
 def ranges_from_csv(csv_file, orientation=None):
-    return ranges_from_cells(parse_csv(csv_file), orientation)
+    data, type_data = read_csv(csv_file)
+    return ranges_from_cells(data, orientation, type_data=type_data)
 
 
-def ranges_from_cells(data, orientation=None):
-    data = np.array(data, dtype=object)
-    type_data = get_type_data(data)
+def ranges_from_cells(data, orientation=None, type_data=None, workers=None):
+    data = np.asarray(data, dtype=object)
+    if type_data is None:
+        type_data = parallel.get_type_data(data, workers)
     t_ranges = detect_table_ranges(type_data, orientation=orientation)
     return t_ranges
 
 
-def tables_from_csv(csv_file, orientation=None, min_cells=None, min_rows=None, min_columns=None):
-    return tables_from_cells(parse_csv(csv_file), orientation,
-                             min_cells=min_cells, min_rows=min_rows, min_columns=min_columns)
+def tables_from_csv(csv_file, orientation=None, min_cells=None, min_rows=None, min_columns=None, workers=None,
+                    cache_dir=None):
+    if cache_dir is not None:
+        return cached_tables_from_csv(csv_file, cache_dir, orientation, min_cells=min_cells, min_rows=min_rows,
+                                      min_columns=min_columns, workers=workers)[1]
+    data, type_data = read_csv(csv_file)
+    return tables_from_cells(data, orientation, min_cells=min_cells, min_rows=min_rows, min_columns=min_columns,
+                             type_data=type_data, workers=workers)
 
 
-def tables_from_cells(data, orientation=None, min_cells=None, min_rows=None, min_columns=None):
-    data = np.array(data, dtype=object)
-    type_data = get_type_data(data)
+def tables_from_cells(data, orientation=None, min_cells=None, min_rows=None, min_columns=None, type_data=None,
+                      workers=None):
+    data = np.asarray(data, dtype=object)
+    type_data = parallel.get_type_data(data, workers) if type_data is None else type_data
     ranges = detect_table_ranges(type_data, orientation=orientation, min_cells=min_cells, min_rows=min_rows,
                                  min_columns=min_columns)
     return get_tables(data, type_data, ranges)
 
 
+def tables_from_frame(frame, name="T1"):
+    return [table_from_columns(frame, name)]
+
+
+def tables_from_sparse(sheet, orientation=None, min_cells=None, min_rows=None, min_columns=None):
+    """
+    Detects the tables of a SparseSheet, only visiting its non-empty cells
+    """
+    ranges = sparse.detect_table_ranges(sheet, orientation, min_cells=min_cells, min_rows=min_rows,
+                                        min_columns=min_columns)
+    return sparse.get_tables(sheet, ranges)
+
+
+def cached_tables_from_csv(csv_file, cache_dir, orientation=None, min_cells=None, min_rows=None, min_columns=None,
+                           workers=None):
+    cache = SheetCache(cache_dir)
+    options = dict(orientation=orientation, min_cells=min_cells, min_rows=min_rows, min_columns=min_columns)
+    cached = cache.load(csv_file, **options)
+    if cached is not None:
+        data, _, tables = cached
+        return data, tables
+
+    data, type_data = read_csv(csv_file)
+    tables = tables_from_cells(data, type_data=type_data, workers=workers, **options)
+    cache.store(csv_file, data, type_data, tables, **options)
+    return data, tables
+
+
 def filter_constraints(constraints, *args):
     # type: (List[Constraint], List[Union[str, type]]) -> List[Constraint]
 
@@ -2,7 +2,7 @@ import argparse
 import logging
 
 from .indexing import Orientation
-from tacle import learn_from_csv, filter_constraints, tables_from_csv
+from tacle import learn_from_cells, filter_constraints, tables_from_cells, cached_tables_from_csv, read_csv
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,7 @@ if __name__ == "__main__":
     parser.add_argument("--min_cells", type=int, help="Minimum number of cells per table", default=None)
     parser.add_argument("--min_rows", type=int, help="Minimum number of rows per table", default=None)
     parser.add_argument("--min_columns", type=int, help="Minimum number of columns per table", default=None)
+    parser.add_argument("--cache", type=str, help="Directory to cache parsed sheets in", default=None)
 
     args = parser.parse_args()
 
@@ -32,7 +33,14 @@ if __name__ == "__main__":
     if args.debug:
         logging.basicConfig(level=logging.DEBUG)
 
-    tables = tables_from_csv(args.csv_file, args.orientation, args.min_cells, args.min_rows, args.min_columns)
+    # The cells are read (or loaded from the cache) once, for both table detection and learning
+    if args.cache is not None:
+        data, tables = cached_tables_from_csv(args.csv_file, args.cache, args.orientation, args.min_cells,
+                                              args.min_rows, args.min_columns)
+    else:
+        data, type_data = read_csv(args.csv_file)
+        tables = tables_from_cells(data, args.orientation, args.min_cells, args.min_rows, args.min_columns,
+                                   type_data=type_data)
 
     if args.verbose or args.debug or args.tables_only:
         for table in tables:
@@ -48,8 +56,7 @@ if __name__ == "__main__":
 
     if not args.tables_only:
         logger.info("\n".join("{}: {}".format(table, ", ".join(map(str, table.blocks))) for table in tables))
-        constraints = learn_from_csv(args.csv_file, virtual=args.virtual, solve_timeout=args.solve_timeout,
-                                     tables=tables)
+        constraints = learn_from_cells(data, virtual=args.virtual, solve_timeout=args.solve_timeout, tables=tables)
 
         if args.filter is not None:
             constraints = filter_constraints(constraints, *args.filter)
@@ -0,0 +1,600 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from .detect import get_type_data
+from .indexing import Typing
+
+
+def random_cells(rows, columns, seed=0):
+    generator = random.Random(seed)
+    labels = ["Vanilla", "Banana", "Chocolate", "BE", "DE", "NL", "YES", "NO"]
+
+    def cell(column):
+        kind = column % 6
+        if kind == 0:
+            return generator.choice(labels)
+        elif kind == 1:
+            return str(generator.randint(0, 1000))
+        elif kind == 2:
+            return "{:.2f}".format(generator.random() * 1000)
+        elif kind == 3:
+            return "{}%".format(generator.randint(0, 100))
+        elif kind == 4:
+            return "${:,}".format(generator.randint(0, 100000))
+        return "" if generator.random() < 0.2 else str(generator.randint(0, 10))
+
+    return [[cell(c) for c in range(columns)] for _ in range(rows)]
+
+
+def timed(f, *args, **kwargs):
+    t_start = time.time()
+    result = f(*args, **kwargs)
+    return result, time.time() - t_start
+
+
+def traced(f, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        result, duration = timed(f, *args, **kwargs)
+        return result, duration, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def retained(f, *args, **kwargs):
+    """
+    :return: The result of f and the memory (in bytes) that was allocated during the call and is still held
+    """
+    tracemalloc.start()
+    try:
+        result = f(*args, **kwargs)
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def write_csv(rows):
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="") as f:
+        csv.writer(f).writerows(rows)
+        return f.name
+
+
+def report(name, size, baseline_time, new_time, baseline="old", new="new"):
+    print("{} ({}): {} {:.3f}s, {} {:.3f}s ({:.1f}x)"
+          .format(name, size, baseline, baseline_time, new, new_time, baseline_time / max(new_time, 1e-9)))
+
+
+def benchmark_type_detection(rows, columns):
+    data = np.array(random_cells(rows, columns), dtype=object)
+    per_cell, per_cell_time = timed(np.vectorize(Typing.detect_type), data)
+    batched, batched_time = timed(Typing.detect_codes, data)
+    if not np.array_equal(per_cell, Typing.decode(batched)):
+        raise RuntimeError("Batched type detection differs from per-cell type detection")
+    report("Type detection", "{} cells".format(data.size), per_cell_time, batched_time, "per-cell", "batched")
+
+
+def benchmark_type_max(rows, columns):
+    def fold(_vector):
+        super_type = _vector[0]
+        for cell_type in _vector[1:]:
+            super_type = Typing._lowest_common_ancestor(super_type, cell_type)
+        return super_type
+
+    type_data = get_type_data(np.array(random_cells(rows, columns), dtype=object))
+    labels = Typing.decode(type_data)
+    folded, fold_time = timed(lambda: [fold(list(labels[:, c])) for c in range(columns)])
+    reduced, reduce_time = timed(Typing.max_codes, type_data, 0)
+    if list(Typing.decode(reduced)) != folded:
+        raise RuntimeError("Vectorized maximal types differ from the sequential maximal types")
+    report("Column types", "{} cells".format(type_data.size), fold_time, reduce_time, "fold", "vectorized")
+
+
+def benchmark_block_casts(rows, columns):
+    from tacle import tables_from_cells
+    from tacle.indexing import type_cache
+
+    blocks = [block for table in tables_from_cells(random_cells(rows, columns)) for block in table.blocks]
+
+    def per_vector(_block):
+        values = _block.relative_range.get_data(_block.table.data)
+        vectors = values.T if _block.orientation == "vertical" else values
+        for v_type, vector in zip(_block.vector_types, vectors):
+            np.vectorize(lambda v: Typing.cast(v_type, v))(vector)
+        data = np.vectorize(lambda v: Typing.cast(_block.type, v))(values.flatten())
+        return not np.all(np.vectorize(Typing.blank_detector(_block.type))(data))
+
+    def fused(_block):
+        data = Typing.cast_cells(_block.type, _block.relative_range.get_data(_block.table.data))
+        return Typing.has_blanks(_block.type, data)
+
+    type_cache.clear()
+    _, per_vector_time = timed(lambda: [per_vector(block) for block in blocks])
+    type_cache.clear()
+    _, fused_time = timed(lambda: [fused(block) for block in blocks])
+    report("Block casts", "{} cells".format(rows * columns), per_vector_time, fused_time, "per-vector", "fused")
+
+
+def benchmark_parallel_tables(rows, columns, workers=4):
+    from tacle import parallel, tables_from_cells
+
+    data = np.array(random_cells(rows, columns), dtype=object)
+    serial_types, serial_type_time = timed(get_type_data, data)
+    parallel_types, parallel_type_time = timed(parallel.get_type_data, data, workers)
+    if not np.array_equal(serial_types, parallel_types):
+        raise RuntimeError("Parallel type detection differs")
+    report("Type detection", "{} cells".format(data.size), serial_type_time, parallel_type_time, "serial",
+           "{} workers".format(workers))
+    _, serial_time = timed(tables_from_cells, data)
+    _, parallel_time = timed(tables_from_cells, data, workers=workers)
+    report("Tables", "{} cells".format(data.size), serial_time, parallel_time, "serial",
+           "{} workers".format(workers))
+
+
+def benchmark_csv_ingestion(rows, columns):
+    from tacle import parse_csv
+    from tacle.stream import read_csv
+
+    def parse_and_type(_csv_file):
+        data = np.array(parse_csv(_csv_file), dtype=object)
+        return data, get_type_data(data)
+
+    csv_file = write_csv(random_cells(rows, columns))
+    try:
+        (data, type_data), parse_time, parse_memory = traced(parse_and_type, csv_file)
+        del data, type_data
+        _, stream_time, stream_memory = traced(read_csv, csv_file)
+    finally:
+        os.remove(csv_file)
+    size = "{} cells".format(rows * columns)
+    report("CSV ingestion time", size, parse_time, stream_time, "parse_csv", "read_csv")
+    print("CSV ingestion peak memory ({}): parse_csv {:.1f}MB, read_csv {:.1f}MB"
+          .format(size, parse_memory / 2 ** 20, stream_memory / 2 ** 20))
+
+
+def benchmark_headers(rows, columns):
+    from .detect import get_headers_count
+    from .indexing import Orientation, Range
+
+    def per_element(_type_data, _orientation):
+        vectors = _type_data.T if _orientation == Orientation.vertical else _type_data
+        headers = []
+        for vector in vectors:
+            header, running = 0, vector[0]
+            for i in range(1, len(vector)):
+                if Typing.lca_table[vector[i], running] == Typing.none:
+                    header, running = i, vector[i]
+            headers.append(header)
+        return headers
+
+    # Wide tables: the generated sheet is transposed so that it has many columns
+    type_data = get_type_data(np.array(random_cells(columns, rows), dtype=object))
+    t_range = Range(0, 0, type_data.shape[1], type_data.shape[0])
+    for orientation in Orientation.all():
+        expected, loop_time = timed(per_element, type_data, orientation)
+        headers, vectorized_time = timed(get_headers_count, t_range, type_data, orientation)
+        if headers != expected:
+            raise RuntimeError("Vectorized header counts differ")
+        report("Headers {}".format(orientation), "{} cells".format(type_data.size), loop_time, vectorized_time,
+               "per-element", "vectorized")
+
+
+def benchmark_lazy_blocks(rows, columns):
+    from . import cache_registry, learn_from_cells, read_csv, tables_from_cells, tables_from_csv
+
+    def materialize(_tables):
+        for table in _tables:
+            for block in table.blocks:
+                block.materialize()
+        return _tables
+
+    def learn_first(_data, _type_data, eager):
+        tables = tables_from_cells(_data, type_data=_type_data)
+        if eager:
+            materialize(tables)
+        learn_from_cells(_data, tables=tables[:1])
+        return tables
+
+    # The tables-only CLI path (-t) only needs the typing of the blocks
+    csv_file = write_csv(random_cells(rows, columns))
+    try:
+        cache_registry.clear()
+        _, eager_time, eager_memory = traced(lambda: materialize(tables_from_csv(csv_file)))
+        cache_registry.clear()
+        _, lazy_time, lazy_memory = traced(tables_from_csv, csv_file)
+    finally:
+        os.remove(csv_file)
+    size = "{} cells".format(rows * columns)
+    report("Tables only time", size, eager_time, lazy_time, "eager", "lazy")
+    print("Tables only peak memory ({}): eager {:.1f}MB, lazy {:.1f}MB"
+          .format(size, eager_memory / 2 ** 20, lazy_memory / 2 ** 20))
+
+    # Tables of 20 rows separated by blank rows, constraints are only learned for the first table such that the
+    # blocks of all other tables are never touched
+    cells = random_cells(rows, columns)
+    for r in range(20, rows, 21):
+        cells[r] = [""] * columns
+    csv_file = write_csv(cells)
+    try:
+        data, type_data = read_csv(csv_file)
+    finally:
+        os.remove(csv_file)
+    cache_registry.clear()
+    _, eager_memory = retained(learn_first, data, type_data, True)
+    cache_registry.clear()
+    tables, lazy_memory = retained(learn_first, data, type_data, False)
+    blocks = [block for table in tables for block in table.blocks]
+    print("Learn first table, memory held by tables and caches ({} tables, {} blocks): eager {:.1f}MB, lazy {:.1f}MB "
+          "({} blocks materialized)".format(len(tables), len(blocks), eager_memory / 2 ** 20, lazy_memory / 2 ** 20,
+                                            sum(block._data is not None for block in blocks)))
+
+
+def benchmark_incremental_detection(rows, columns):
+    from . import tables_from_cells
+    from .incremental import IncrementalSheet
+
+    # Tables of 20 rows separated by blank rows, every edit changes a single cell of the middle table
+    cells = random_cells(rows, columns)
+    for r in range(20, rows, 21):
+        cells[r] = [""] * columns
+    data = np.array(cells, dtype=object)
+    sheet = IncrementalSheet(data)
+    sheet.tables()
+    edits = [{(rows // 2, c % columns): str(c)} for c in range(10)]
+
+    def full(_edits):
+        for edit in _edits:
+            for (r, c), value in edit.items():
+                data[r, c] = value
+            tables_from_cells(data)
+
+    def incremental(_edits):
+        for edit in _edits:
+            sheet.update(edit)
+            sheet.tables()
+
+    _, full_time = timed(full, edits)
+    _, incremental_time = timed(incremental, edits)
+    report("Edits", "{} cells, {} edits".format(data.size, len(edits)), full_time, incremental_time, "full",
+           "incremental")
+
+
+def benchmark_sparse_sheet(rows, columns, tables=10, table_rows=50, table_columns=10):
+    from . import tables_from_cells, tables_from_sparse
+    from .sparse import SparseSheet
+    from .stream import read_csv
+
+    def dense(_csv_file):
+        data, type_data = read_csv(_csv_file)
+        return tables_from_cells(data, type_data=type_data)
+
+    def sparse(_csv_file):
+        return tables_from_sparse(SparseSheet.from_csv(_csv_file))
+
+    # A few dense tables scattered across a large, otherwise empty sheet
+    generator = random.Random(0)
+    cells = [[""] * columns for _ in range(rows)]
+    for _ in range(tables):
+        row, column = generator.randrange(rows - table_rows), generator.randrange(columns - table_columns)
+        for r, table_row in enumerate(random_cells(table_rows, table_columns, generator.random())):
+            cells[row + r][column:column + table_columns] = table_row
+    csv_file = write_csv(cells)
+    del cells
+    try:
+        dense_tables, dense_time = timed(dense, csv_file)
+        sparse_tables, sparse_time = timed(sparse, csv_file)
+        dense_memory, sparse_memory = traced(dense, csv_file)[2], traced(sparse, csv_file)[2]
+    finally:
+        os.remove(csv_file)
+    if [(t.name, t.range) for t in dense_tables] != [(t.name, t.range) for t in sparse_tables]:
+        raise RuntimeError("Sparse tables differ from dense tables")
+    size = "{} cells".format(rows * columns)
+    report("Sparse sheet time", size, dense_time, sparse_time, "dense", "sparse")
+    print("Sparse sheet peak memory ({}): dense {:.1f}MB, sparse {:.1f}MB"
+          .format(size, dense_memory / 2 ** 20, sparse_memory / 2 ** 20))
+
+
+def benchmark_key_matching(rows, columns):
+    from .core.group import Bounds, Group, GType, StringDictionary, Table
+
+    # Foreign key tests between every pair of string columns, as in the internal solving strategy
+    generator = random.Random(0)
+    keys = ["K{}".format(i) for i in range(rows // 10 + 1)]
+    data = np.array([[generator.choice(keys) for _ in range(columns)] for _ in range(rows)], dtype=object)
+    data[:len(keys), 0] = keys
+    table = Table("T1", data)
+    group = Group(table, Bounds([1, rows, 1, columns]), False, data, [GType.string] * columns, StringDictionary())
+    vectors = list(group)
+
+    def by_value(_vectors):
+        pk_sets = {v: set(v.get_vector(1)) for v in _vectors}
+        return [all(x is None or x in pk_sets[pk] for x in fk.get_vector(1)) for pk in _vectors for fk in _vectors]
+
+    def by_code(_vectors):
+        dictionary = group.dictionary
+        return [bool(np.all(dictionary.isin(fk.get_vector_codes(1)[~fk.get_vector_blanks(1)], pk.get_vector_codes(1))))
+                for pk in _vectors for fk in _vectors]
+
+    expected, value_time = timed(by_value, vectors)
+    found, code_time = timed(by_code, vectors)
+    if found != expected:
+        raise RuntimeError("Dictionary encoded key matching differs")
+    report("Key matching", "{} cells".format(data.size), value_time, code_time, "values", "codes")
+
+
+def benchmark_vector_views(rows, columns, repeat=20):
+    from .core.group import Bounds, Group, GType, Table
+
+    data = np.random.RandomState(0).rand(rows, columns)
+    data[::7, ::3] = np.nan
+    table = Table("T1", data)
+
+    def group():
+        return Group(table, Bounds([1, rows, 1, columns]), False, data, [GType.float] * columns)
+
+    def constructed(_groups):
+        # Building every vector as a new group (as subgroups used to be built), which rescans its blanks
+        def vector(_g, _i):
+            _bounds = Bounds([None, None, _i, _i])
+            _data = Bounds([1, _g.rows(), 1, _g.columns()]).combine(_bounds).subset(_g.data)
+            return Group(table, _g.bounds.combine(_bounds), False, _data, [GType.float])
+
+        return [[vector(g, i) for i in range(1, columns + 1)] for g in _groups]
+
+    def views(_groups):
+        return [list(g) for g in _groups]
+
+    _, constructed_time = timed(constructed, [group() for _ in range(repeat)])
+    _, views_time = timed(views, [group() for _ in range(repeat)])
+    report("Vector enumeration", "{} x {} vectors".format(repeat, columns), constructed_time, views_time,
+           "constructed", "views")
+
+
+def benchmark_solution_lookups(rows, columns):
+    from .core.group import Bounds, Group, GType, Table
+    from .core.solutions import Solutions
+    from .core.template import Equal
+
+    # Equality solutions between every pair of vectors, looked up again as during learning
+    template = Equal()
+    names = [v.name for v in template.variables]
+    table = Table("T1", np.zeros((rows, columns)))
+
+    def vectors():
+        return list(Group(table, Bounds([1, rows, 1, columns]), False, table.data, [GType.float] * columns))
+
+    found_vectors = vectors()
+    found = [{names[0]: v1, names[1]: v2} for v1 in found_vectors for v2 in found_vectors if v1 < v2]
+    # Solutions used to index tuples of groups
+    properties = {template: set(tuple(s[name] for name in names) for s in found)}
+    solutions = Solutions()
+    solutions.add(template, found)
+
+    def to_tuple(_template, _solution):
+        try:
+            return tuple(_solution[v.name] for v in _template.variables)
+        except KeyError as e:
+            raise RuntimeError("No value for {} in solution {}".format(e.args[0], _solution))
+
+    def by_group(_queries):
+        return [to_tuple(template, q) in properties[template] for q in _queries]
+
+    def by_id(_queries):
+        return [solutions.has_solution(template, q) for q in _queries]
+
+    # Queries of the same group objects, and of equal groups that were created separately
+    for kind, query_vectors in [("same", found_vectors), ("equal", vectors())]:
+        queries = [{names[0]: v1, names[1]: v2} for v1 in query_vectors for v2 in query_vectors] * 5
+        expected, group_time = timed(by_group, queries)
+        result, id_time = timed(by_id, queries)
+        if result != expected:
+            raise RuntimeError("Interned solution lookups differ")
+        report("Solution lookups", "{} solutions, {} lookups of {} groups".format(len(found), len(queries), kind),
+               group_time, id_time, "groups", "IDs")
+
+
+def benchmark_overlap_filter(rows, columns, keys=3):
+    import itertools
+    from .core.group import Bounds, Group, GType, Table
+    from .core.solutions import Solutions
+
+    # Candidate combinations of vectors of three (overlapping) groups, as enumerated by the internal strategy
+    table = Table("T1", np.zeros((rows, columns)))
+    width = columns // 2
+    bounds = [Bounds([1, rows, 1 + i * width // 2, i * width // 2 + width]) for i in range(keys)]
+    groups = [list(Group(table, b, False, b.subset(table.data), [GType.float] * width)) for b in bounds]
+
+    def pairwise(_groups):
+        return [vectors for vectors in itertools.product(*_groups)
+                if not any(g1.overlaps_with(g2) for g1, g2 in itertools.combinations(vectors, 2))]
+
+    def indexed(_groups):
+        return list(Solutions().overlaps.disjoint_product(_groups))
+
+    expected, pairwise_time = timed(pairwise, groups)
+    found, indexed_time = timed(indexed, groups)
+    if found != expected:
+        raise RuntimeError("Overlap filtering differs")
+    report("Overlap filter", "{} candidates, {} disjoint".format(width ** keys, len(found)), pairwise_time,
+           indexed_time, "pairwise", "index")
+
+
+def problem_candidates(template, groups, solutions):
+    from constraint import Problem
+    from .core.assignment import ConstraintSource
+    from .indexing import Typing
+
+    # Candidate generation as it was done with python-constraint (pip install tacle[benchmark])
+    source = template.source
+    if isinstance(source, ConstraintSource):
+        assignments = [{source.dictionary[k]: v for k, v in s.items()}
+                       for s in solutions.get_solutions(source.constraint)]
+    else:
+        assignments = [{}]
+    result = []
+    for assignment in assignments:
+        problem = Problem()
+        for variable in source.variables:
+            candidates = [assignment[variable.name]] if variable.name in assignment else groups
+            domain = [g for g in candidates
+                      if any(Typing.as_legacy_type(gt) in variable.types for gt in g.vector_types)]
+            if len(domain) == 0:
+                if variable.name in assignment:
+                    break
+                return []
+            problem.addVariable(variable.name, domain)
+        else:
+            for f in template.filters:
+                names = [v.name for v in f.variables]
+                problem.addConstraint(lambda *args, _f=f, _names=names:
+                                      _f.test_relaxed(dict(zip(_names, args)), solutions), names)
+            result += problem.getSolutions()
+    return result
+
+
+def benchmark_candidate_join(rows, columns):
+    from collections import Counter
+    from .convert import get_tables
+    from .detect import detect_table_ranges
+    from .learn import get_groups, learn_constraints
+
+    # Candidates of every template for the groups of a generated sheet with several tables (some transposed)
+    sheets = []
+    for i, (table_rows, table_columns) in enumerate([(20, 6), (30, 12), (25, 8), (12, 7), (40, 9), (15, 12)]):
+        cells = np.array(random_cells(max(2, table_rows * rows // 2000), min(columns, table_columns), seed=i),
+                         dtype=object)
+        sheets.append(cells.T if i % 3 == 2 else cells)
+    data = np.full((sum(len(cells) + 1 for cells in sheets), max(np.size(c, 1) for c in sheets)), "", dtype=object)
+    row = 0
+    for cells in sheets:
+        data[row:row + len(cells), :np.size(cells, 1)] = cells
+        row += len(cells) + 1
+    type_data = get_type_data(data)
+    tables = get_tables(data, type_data, detect_table_ranges(type_data))
+    groups = get_groups(tables)
+    solutions = learn_constraints(data, tables)
+
+    problem_total = join_total = 0
+    for template in solutions.solutions:
+        expected, problem_time = timed(problem_candidates, template, groups, solutions)
+        found, join_time = timed(template.source.candidates, groups, solutions, template.filters, template)
+        if Counter(frozenset(c.items()) for c in found) != Counter(frozenset(c.items()) for c in expected):
+            raise RuntimeError("Candidates of {} differ".format(template.name))
+        problem_total, join_total = problem_total + problem_time, join_total + join_time
+        report("Candidates {}".format(template.name), "{} candidates".format(len(found)), problem_time, join_time,
+               "python-constraint", "join")
+    report("Candidates", "{} templates, {} groups".format(len(solutions.solutions), len(groups)), problem_total,
+           join_total, "python-constraint", "join")
+
+
+def benchmark_feature_masks(rows, columns):
+    from .core.group import Bounds, Group, GType, Table
+    from .core.solutions import Solutions
+    from .workflow import get_constraint_list
+
+    # Domain pruning by the single-variable filters of every template, for candidates of various shapes and types
+    table = Table("T1", np.zeros((rows, columns)))
+    groups = []
+    for width in range(1, columns // 4 + 1):
+        for start in range(0, columns - width + 1, width):
+            bounds = Bounds([1, rows, start + 1, start + width])
+            g_types = [GType.int if width % 2 == 0 else GType.float] * width
+            groups.append(Group(table, bounds, False, bounds.subset(table.data), g_types))
+            bounds = Bounds([start + 1, start + width, 1, columns])
+            groups.append(Group(table, bounds, True, bounds.subset(table.data), g_types))
+    solutions = Solutions()
+    checks = [(f, v) for template in get_constraint_list() for f in template.filters
+              if len(f.variables) == 1 and f.feature_mask(solutions.features.get(groups[:1])) is not None
+              for v in f.variables]
+
+    def per_candidate(_groups):
+        return [[f.test_relaxed({v.name: g}, solutions) for g in _groups] for f, v in checks]
+
+    def vectorized(_groups):
+        features = solutions.features.get(_groups)
+        return [f.feature_mask(features, relaxed=True).tolist() for f, _ in checks]
+
+    solutions.features.get(groups)
+    expected, per_candidate_time = timed(per_candidate, groups)
+    found, vectorized_time = timed(vectorized, groups)
+    if found != expected:
+        raise RuntimeError("Feature masks differ")
+    report("Feature masks", "{} filters, {} groups".format(len(checks), len(groups)), per_candidate_time,
+           vectorized_time, "per candidate", "vectorized")
+
+
+def benchmark_join_plan(rows, columns):
+    from .core.assignment import CandidateJoin, NotSubgroup, SameLength, Variable, type_bits
+    from .core.group import Bounds, Group, GType, Table
+    from .core.selectivity import FilterStatistics
+    from .core.solutions import Solutions
+
+    # Numeric vectors of various lengths, of which only a few have the length of the (rare) textual vectors
+    groups = []
+    for length in range(2, 2 + max(2, rows // 100)):
+        table = Table("N{}".format(length), np.zeros((length, min(columns, 20))))
+        bounds = Bounds([1, length, 1, min(columns, 20)])
+        groups += list(Group(table, bounds, False, bounds.subset(table.data), [GType.float] * min(columns, 20)))
+    for i in range(2):
+        table = Table("S{}".format(i), np.full((5, 1), "a", dtype=object))
+        groups.append(Group(table, Bounds([1, 5, 1, 1]), False, table.data, [GType.string]))
+    numeric, textual = {GType.int, GType.float}, {GType.string}
+    variables = [Variable("X", types=numeric), Variable("Y", types=numeric), Variable("Z", types=textual)]
+    filters = [NotSubgroup(variables[:2]), SameLength(variables[:2]), SameLength(variables[1:])]
+    solutions = Solutions()
+    features = solutions.features.get(groups)
+    domains, domain_features = [], []
+    for variable in variables:
+        selected = np.flatnonzero(features["types"] & type_bits(variable.types))
+        domains.append([groups[i] for i in selected.tolist()])
+        domain_features.append(features[selected])
+
+    def enumerate_join(order):
+        join = CandidateJoin("plan", variables, domains, domain_features, filters, FilterStatistics(), order)
+        return list(join.enumerate(solutions)), join.plan
+
+    (expected, _), declared_time = timed(enumerate_join, list(range(len(variables))))
+    (found, plan), planned_time = timed(enumerate_join, None)
+    if found != expected:
+        raise RuntimeError("Planned join differs")
+    report("Join plan ({})".format(", ".join(plan.order)), "{} groups, {} candidates".format(len(groups), len(found)),
+           declared_time, planned_time, "declared order", "planned order")
+
+
+benchmarks = {
+    "types": benchmark_type_detection,
+    "max": benchmark_type_max,
+    "blocks": benchmark_block_casts,
+    "parallel": benchmark_parallel_tables,
+    "csv": benchmark_csv_ingestion,
+    "headers": benchmark_headers,
+    "lazy": benchmark_lazy_blocks,
+    "incremental": benchmark_incremental_detection,
+    "sparse": benchmark_sparse_sheet,
+    "keys": benchmark_key_matching,
+    "vectors": benchmark_vector_views,
+    "solutions": benchmark_solution_lookups,
+    "overlaps": benchmark_overlap_filter,
+    "join": benchmark_candidate_join,
+    "features": benchmark_feature_masks,
+    "plan": benchmark_join_plan,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("benchmark", nargs="*", help="Benchmarks to run ({})".format(", ".join(sorted(benchmarks))))
+    parser.add_argument("-r", "--rows", type=int, default=2000, help="Number of rows of the generated sheet")
+    parser.add_argument("-c", "--columns", type=int, default=100, help="Number of columns of the generated sheet")
+    args = parser.parse_args()
+
+    for name in args.benchmark or sorted(benchmarks.keys()):
+        if name not in benchmarks:
+            parser.error("Unknown benchmark {}".format(name))
+        benchmarks[name](args.rows, args.columns)
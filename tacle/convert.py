@@ -2,53 +2,64 @@ from typing import List
 
 import numpy as np
 
-from .indexing import Table, Orientation, Typing, Block
+from .core.group import StringDictionary
+from .indexing import Table, Orientation, Typing, Block, TypeSummary
 
 
 def get_tables(data, type_data, ranges, names=None):
-    data = np.array(data, dtype=np.object)
+    data = np.asarray(data, dtype=object)
     if names is None:
         names = ["T{}".format(i + 1) for i in range(len(ranges))]
     tables = []
+    dictionary = StringDictionary()
     for name, t_range in zip(names, ranges):
-        t_data = t_range.get_data(data)
-        supported_orientation = [o for o in Orientation.all() if orientation_compatible(type_data, t_range, o)]
-        if len(supported_orientation) > 0:
-            tables.append(Table(t_data, t_range.get_data(type_data), t_range, name, supported_orientation))
+        table = build_table(name, t_range.get_data(data), t_range.get_data(type_data), t_range, dictionary)
+        if table is not None:
+            tables.append(table)
 
     return tables
 
 
+def build_table(name, t_data, t_type_data, t_range, dictionary=None):
+    """
+    Builds a table from the cells and type codes within its range
+    :param dictionary: The StringDictionary shared by the tables of the sheet
+    :return: The table or None if the range does not support any orientation
+    """
+    summary = TypeSummary(t_type_data)
+    supported_orientation = summary.orientations()
+    if len(supported_orientation) > 0:
+        return Table(t_data, t_type_data, t_range, name, supported_orientation, summary=summary,
+                     dictionary=dictionary)
+    return None
+
+
 def get_blocks(table):
     # type: (Table) -> List[Block]
     blocks = []
     for orientation in table.orientations:
         rel_range = table.relative_range
-        max_types = []
         vector_count = rel_range.vector_count(orientation)
-        for i in range(vector_count):
-            vector_type_data = rel_range.vector_range(i, orientation).get_data(table.type_data)
-            max_type = Typing.max(vector_type_data)
-            max_types.append(Typing.soft_root(max_type))
+        max_types = Typing.soft_root_table[table.summary.max_codes[orientation]]
+        blank = max_types == Typing.codes[Typing.any]
         block_indices = [0]
         for i in range(1, vector_count):
-            if max_types[i] == Typing.unknown or Typing.max([max_types[i], max_types[block_indices[-1]]]) is None:
+            if max_types[i] == Typing.codes[Typing.unknown] or blank[i] != blank[i - 1] \
+                    or Typing.lca_table[max_types[i], max_types[block_indices[-1]]] == Typing.none:
                 block_indices.append(i)
         block_indices.append(vector_count)
         lengths = [block_indices[i + 1] - block_indices[i] for i in range(len(block_indices) - 1)]
         for start, count in zip(block_indices, lengths):
-            block_range = rel_range.sub_range(start, count, orientation)
-            blocks.append(Block(table, block_range, orientation))
+            # Vectors without any values (e.g., empty columns of a data frame) are not part of any block
+            if not blank[start]:
+                block_range = rel_range.sub_range(start, count, orientation)
+                blocks.append(Block(table, block_range, orientation))
     return blocks
 
 
 def orientation_compatible(type_data, t_range, orientation):
-    for vi in range(t_range.vector_count(orientation)):
-        vector_range = t_range.vector_range(vi, orientation)
-        cell_types = vector_range.get_data(type_data)
-        if Typing.max(cell_types) is None:
-            return False
-    return True
+    axis = 0 if orientation == Orientation.vertical else 1
+    return not np.any(Typing.max_codes(t_range.get_data(type_data), axis) == Typing.none)
 
 # def get_groups(data, indexing_data):
 #     type_data = np.vectorize(detect_type)(data)
@@ -1,15 +1,19 @@
+from collections import Counter
 from typing import List, Dict, Set
 
-from constraint import Problem
+import numpy
 
 from tacle import indexing
 from tacle.indexing import Typing
 from tacle.parse.parser import GType
 from .group import Group, Orientation
+from .selectivity import get_statistics
 from .solutions import Solutions
 
 
 class Variable:
+    __slots__ = ("name", "vector", "_types")
+
     def __init__(self, name, vector=False, types={GType.int, GType.float, GType.string}):
         self.name = name
         self.vector = vector
@@ -49,34 +53,39 @@ class Source:
     def variables(self):
         return self._variables
 
-    def candidates(self, groups, solutions, filters):
-        return self._complete([{}], groups, filters, solutions)
+    def candidates(self, groups, solutions, filters, template):
+        """
+        :param template: The template whose candidates are generated (filter statistics are kept per template)
+        :return: The assignments of groups to the variables that satisfy the filters (the plans of the candidate joins
+        are recorded in solutions.plans)
+        """
+        return self._complete([{}], groups, filters, solutions, template)
 
-    def _complete(self, assignments, groups, filters, solutions):
+    def _complete(self, assignments, groups, filters, solutions, template):
         result = []
+        groups = list(groups)
+        plans = solutions.plans[template] = []
+        group_features = solutions.features.get(groups)
 
         # TODO type as constraint
 
         def try_assignment():
-            problem = Problem()
-
+            domains, features = [], []
             for variable in self.variables:
-                candidates = [assignment[variable.name]] if variable.name in assignment else groups
-                domain = list([g for g in candidates if any(st in variable.types for st in
-                                                            (Typing.as_legacy_type(gt) for gt in g.vector_types))])
-                if len(domain) == 0:
+                if variable.name in assignment:
+                    candidates = [assignment[variable.name]]
+                    candidate_features = solutions.features.get(candidates)
+                else:
+                    candidates, candidate_features = groups, group_features
+                selected = numpy.flatnonzero(candidate_features["types"] & type_bits(variable.types))
+                if len(selected) == 0:
                     return variable.name in assignment, []
-                problem.addVariable(variable.name, domain)
-
-            for f in filters:
-                variables = list([v.name for v in f.variables])
-
-                def c_j(ff, vv):
-                    return lambda *args: ff.test_relaxed({vv[i]: args[i] for i in range(len(args))}, solutions)
+                domains.append([candidates[i] for i in selected.tolist()])
+                features.append(candidate_features[selected])
 
-                problem.addConstraint(c_j(f, variables), variables)
-
-            return True, list(problem.getSolutions())
+            join = CandidateJoin(template.name, self.variables, domains, features, filters)
+            plans.append(join.plan)
+            return True, list(join.enumerate(solutions))
 
         for assignment in assignments:
             resume, candidate_solutions = try_assignment()
@@ -99,9 +108,9 @@ class ConstraintSource(Source):
     def constraint(self):
         return self._constraint
 
-    def candidates(self, groups, solutions, filters):
+    def candidates(self, groups, solutions, filters, template):
         assignments = [{self.dictionary[k]: v for k, v in s.items()} for s in solutions.get_solutions(self.constraint)]
-        return self._complete(assignments, groups, filters, solutions)
+        return self._complete(assignments, groups, filters, solutions, template)
 
     def depends_on(self):
         return {self.constraint}
@@ -124,6 +133,32 @@ class Filter:
     def is_relaxed(self):
         return False
 
+    @property
+    def key(self):
+        """
+        Description of the filter (its type, variables and parameters) that identifies it in the selectivity statistics of its template
+        """
+        key = getattr(self, "_key", None)
+        if key is None:
+            names = [v.name for v in self.variables]
+            parameters = sorted(names) if isinstance(self.variables, set) else names
+            for name, value in sorted(vars(self).items()):
+                if name not in ("_variables", "_key"):
+                    parameters.append("{}={}".format(name.lstrip("_"),
+                                                     value.key if isinstance(value, Filter) else value))
+            key = self._key = "{}({})".format(type(self).__name__, ", ".join(parameters))
+        return key
+
+    def feature_mask(self, features, relaxed=False):
+        """
+        Tests the filter on a whole column of candidates for one of its variables at once
+        :param features: The features of the candidates (see FeatureTable)
+        :param relaxed: Whether the relaxed version of the filter should be tested
+        :return: A boolean array marking the candidates that satisfy the filter, or None if the filter does not only
+        depend on the features of the individual candidates
+        """
+        return None
+
     def test_same(self, assignment, f):
         groups = list([assignment[v.name] for v in self.variables])
         result = all(f(groups[i]) == f(groups[j]) for i in range(len(groups)) for j in range(i + 1, len(groups)))
@@ -213,6 +248,12 @@ class Not(Filter):
     def test(self, assignment, solutions):
         return not self._original_filter.test(assignment, solutions)
 
+    def feature_mask(self, features, relaxed=False):
+        if len(self.variables) != 1:
+            return None
+        mask = self._original_filter.feature_mask(features)
+        return None if mask is None else ~mask
+
 
 class If(Filter):
     def __init__(self, if_filter: Filter, then_filter: Filter, else_filter: Filter=None):
@@ -301,6 +342,26 @@ class SizeFilter(Filter):
     def is_relaxed(self):
         return self._max_size
 
+    def feature_mask(self, features, relaxed=False):
+        mask = numpy.ones(len(features), dtype=bool)
+        if relaxed and self._max_size:
+            orientation = features["orientation"]
+            if self._rows is not None:
+                mask &= (orientation == FeatureTable.orientations[indexing.Orientation.horizontal]) \
+                    | (features["rows"] <= self._rows)
+            if self._cols is not None:
+                mask &= (orientation == FeatureTable.orientations[indexing.Orientation.vertical]) \
+                    | (features["columns"] <= self._cols)
+            if self._length is not None:
+                mask &= features["length"] <= self._length
+            return mask
+        op = numpy.less_equal if self._max_size else numpy.greater_equal
+        for column, bound in [("rows", self._rows), ("columns", self._cols), ("length", self._length),
+                              ("vectors", self._vectors)]:
+            if bound is not None:
+                mask &= op(features[column], bound)
+        return mask
+
 
 class OrientationFilter(Filter):
     def __init__(self, variables, orientation):
@@ -314,6 +375,10 @@ class OrientationFilter(Filter):
     def test(self, assignment: Dict[str, Group], solutions):
         return self.test_all(assignment, lambda g: g.row == (self.orientation == Orientation.HORIZONTAL))
 
+    def feature_mask(self, features, relaxed=False):
+        horizontal = features["orientation"] == FeatureTable.orientations[indexing.Orientation.horizontal]
+        return horizontal if self.orientation == Orientation.HORIZONTAL else ~horizontal
+
 
 class NotPartial(Filter):
     @staticmethod
@@ -328,11 +393,17 @@ class NotPartial(Filter):
     def test(self, assignment: Dict[str, Group], solutions):
         return not any([self.has_blanks(assignment[v.name]) for v in self.variables])
 
+    def feature_mask(self, features, relaxed=False):
+        return ~features["partial"]
+
 
 class Partial(Filter):
     def test(self, assignment: Dict[str, Group], solutions):
         return all([NotPartial.has_blanks(assignment[v.name]) for v in self.variables])
 
+    def feature_mask(self, features, relaxed=False):
+        return features["partial"].copy()
+
 
 class NotSubgroup(Filter):
     def test(self, assignment: Dict[str, Group], solutions):
@@ -359,3 +430,288 @@ class SatisfiesConstraint(Filter):
         variables = self.constraint.variables
         return solutions.has(self.constraint, variables, {assignment[self.mapping[v.name]] for v in variables})
 
+
+
+def type_bits(types):
+    """
+    :param types: Vector types (legacy GTypes or cell types)
+    :return: A bitmask with the bits of the (legacy) GTypes of the given types set
+    """
+    bits = 0
+    for t in types:
+        bits |= 1 << Typing.as_legacy_type(t).value
+    return bits
+
+
+class FeatureTable(object):
+    """
+    The features that filters test for the groups (and blocks) of a learning task.  The features of every group are
+    computed once and stored in a structured array, such that filters can test whole columns of candidates at once (see
+    Filter.feature_mask).  Features are keyed by the table and bounds of the groups, the groups themselves are not
+    retained (most vectors are transient views of their groups).
+    """
+
+    dtype = numpy.dtype([
+        ("rows", numpy.int64), ("columns", numpy.int64), ("length", numpy.int64), ("vectors", numpy.int64),
+        ("table", numpy.int32), ("orientation", numpy.int8), ("type", numpy.int8), ("partial", bool),
+        ("types", numpy.uint8),  # type_bits of the vector types
+    ])
+    orientations = {indexing.Orientation.vertical: 0, indexing.Orientation.horizontal: 1}
+
+    def __init__(self):
+        self._tables = dict()
+        self._slots = dict()  # key of a group (see _key) -> index of its features
+        self._features = numpy.zeros(64, dtype=self.dtype)
+
+    def get(self, groups):
+        """
+        :return: A structured array with the features of the groups
+        """
+        slots = []
+        for group in groups:
+            key = self._key(group)
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = len(self._slots)
+                if slot == len(self._features):
+                    self._features = numpy.resize(self._features, 2 * slot)
+                self._features[slot] = self._features_of(group)
+            slots.append(slot)
+        return self._features[numpy.array(slots, dtype=numpy.int64)]
+
+    @staticmethod
+    def _key(block):
+        if isinstance(block, Group):
+            return block.table.name, block.row, block.bounds.bounds
+        return block.table.name, block.orientation, block.relative_range
+
+    def _features_of(self, block):
+        return (Filter.rows(block), Filter.cols(block), Filter.vector_length(block), Filter.vector_count(block),
+                self._tables.setdefault(Filter.table(block), len(self._tables)),
+                self.orientations[Filter.orientation(block)], Typing.code(Filter.block_type(block)),
+                NotPartial.has_blanks(block), type_bits(block.vector_types))
+
+
+class JoinPlan(object):
+    """
+    The plan of a candidate join: the filters that pruned the candidates of the variables and, for every step, the
+    variable that is bound, its number of candidates (after pruning), the variables it is joined with, the residual
+    filters it tests (most selective first) with their estimated selectivity, and the estimated and (once the join was
+    enumerated) actual number of partial assignments after the step.
+    """
+
+    def __init__(self):
+        self.pruned = []  # (filter key, variable name, selectivity) of the filters that pruned the candidates
+        self.steps = []
+
+    @property
+    def order(self):
+        return [step["variable"] for step in self.steps]
+
+    def __str__(self):
+        lines = ["Prune {} with {} ({:.3f})".format(name, key, selectivity) for key, name, selectivity in self.pruned]
+        for step in self.steps:
+            joins = ", ".join("{}={}".format(attribute, name) for attribute, name in step["joins"])
+            lines.append("Bind {} ({} candidates{}): estimated {:.1f}, found {}".format(
+                step["variable"], step["candidates"], ", join on " + joins if joins else "", step["estimate"],
+                "?" if step["matches"] is None else step["matches"]))
+            lines += ["  Test {} ({:.3f})".format(key, selectivity) for key, selectivity in step["filters"]]
+        return "\n".join(lines)
+
+
+class CandidateJoin(object):
+    """
+    Enumerates the assignments of candidate groups to variables that satisfy a list of filters.  Filters that only
+    depend on the features of individual candidates prune the candidates of their variables up front (as vector
+    operations on the feature table).  Filters that require variables to share a feature (SameLength, SameTable,
+    SameOrientation and SameType) are evaluated as equi-joins: the candidates of every variable are partitioned by the
+    features it shares with the variables that are bound before it, such that only compatible combinations are
+    enumerated.  The remaining (residual) filters are tested (relaxed) as soon as all of their variables are bound.
+
+    The selectivity of every filter is recorded in the filter statistics (of the template).  Variables are bound in the order that
+    minimizes the estimated number of partial assignments (greedily), residual filters are tested most selective first.
+    Assignments are enumerated in the same order regardless of the binding order.
+    """
+
+    join_attributes = {
+        SameLength: "length",
+        SameTable: "table",
+        SameOrientation: "orientation",
+        SameType: "type",
+    }
+
+    def __init__(self, template, variables, domains, features, filters, statistics=None, order=None):
+        """
+        :param template: The name of the template whose candidates are joined
+        :param variables: The variables to assign
+        :param domains: The candidate groups of every variable
+        :param features: The features of the candidates of every variable (see FeatureTable)
+        :param filters: The filters that assignments have to satisfy
+        :param statistics: The filter statistics to use and update (the global statistics if None)
+        :type statistics: tacle.core.selectivity.FilterStatistics
+        :param order: The positions of the variables in the order in which they should be bound (planned if None)
+        """
+        self.template = template
+        self.names = [v.name for v in variables]
+        self.domains = domains
+        self.filters = filters
+        self.statistics = statistics if statistics is not None else get_statistics()
+        self.attributes = list(self.join_attributes.values())
+        self.plan = JoinPlan()
+        position = {name: i for i, name in enumerate(self.names)}
+
+        # Filters that only depend on the features of individual candidates prune the candidates of their variables
+        masks = [numpy.ones(len(domain), dtype=bool) for domain in domains]
+        joins, residual = [], []  # (attribute, filter key, variables) and (filter, filter key, variables)
+        for f in filters:
+            attribute = self.join_attributes.get(type(f))
+            indices = [position[v.name] for v in f.variables]
+            if attribute is not None:
+                joins.append((self.attributes.index(attribute), f.key, indices))
+                continue
+            filter_masks = [f.feature_mask(features[i], relaxed=True) for i in indices]
+            if len(indices) == 0 or any(mask is None for mask in filter_masks):
+                residual.append((f, f.key, indices))
+                continue
+            for i, mask in zip(indices, filter_masks):
+                satisfied = int(numpy.count_nonzero(mask))
+                self.statistics.record(self.template, f.key, len(mask), satisfied)
+                self.plan.pruned.append((f.key, self.names[i], satisfied / len(mask) if len(mask) > 0 else 0.0))
+                masks[i] &= mask
+
+        # The remaining candidates of every variable as (domain position, group, attribute values) triples
+        candidates = []
+        for i, domain in enumerate(domains):
+            selected = numpy.flatnonzero(masks[i])
+            selected_features = features[i][selected]
+            values = zip(*[selected_features[attribute].tolist() for attribute in self.attributes])
+            candidates.append([(j, domain[j], row) for j, row in zip(selected.tolist(), values)])
+
+        # Variables that have to share an attribute form components, the selectivity of joining two variables on an
+        # attribute is computed from the attribute values of their candidates
+        components = [list(range(len(self.names))) for _ in self.attributes]
+        for attribute, _, indices in joins:
+            component = components[attribute]
+            roots = {self._root(component, i) for i in indices}
+            for root in roots:
+                component[root] = min(roots)
+        histograms, selectivities = dict(), dict()
+
+        def histogram(attribute, i):
+            if (attribute, i) not in histograms:
+                histograms[(attribute, i)] = Counter(row[attribute] for _, _, row in candidates[i])
+            return histograms[(attribute, i)]
+
+        def join_selectivity(attribute, i, j):
+            if (attribute, i, j) not in selectivities:
+                other = histogram(attribute, j)
+                matches = sum(count * other.get(value, 0) for value, count in histogram(attribute, i).items())
+                selectivities[(attribute, i, j)] = len(candidates[i]) * len(candidates[j]), matches
+            return selectivities[(attribute, i, j)]
+
+        for attribute, key, indices in joins:
+            for j in indices[1:]:
+                self.statistics.record(self.template, key, *join_selectivity(attribute, indices[0], j))
+
+        # Variables are bound greedily, choosing the variable that leads to the fewest (estimated) partial assignments
+        def fan_out(i, bound):
+            estimate = float(len(candidates[i]))
+            for attribute, component in enumerate(components):
+                partners = [j for j in bound if self._root(component, j) == self._root(component, i)]
+                if len(partners) > 0:
+                    pairs, matches = join_selectivity(attribute, i, partners[0])
+                    estimate *= matches / pairs if pairs > 0 else 0.0
+            for f, key, indices in residual:
+                if i in indices and all(j == i or j in bound for j in indices):
+                    estimate *= self.statistics.selectivity(self.template, key)
+            return estimate
+
+        self.order = []
+        estimate = 1.0
+        while len(self.order) < len(self.names):
+            fan_outs = {i: fan_out(i, self.order) for i in range(len(self.names)) if i not in self.order}
+            i = min(fan_outs, key=lambda j: (fan_outs[j], j)) if order is None else order[len(self.order)]
+            self.order.append(i)
+            estimate *= fan_outs[i]
+            self.plan.steps.append(dict(variable=self.names[i], candidates=len(candidates[i]), joins=[],
+                                        filters=[], estimate=estimate, matches=None))
+
+        # Every step joins the bound variable with the first bound variable of its components and tests the residual
+        # filters whose variables are all bound
+        step_of = {i: s for s, i in enumerate(self.order)}
+        self.links = [[] for _ in self.order]  # (attribute position, earlier step) pairs of every step
+        for attribute, component in enumerate(components):
+            first = dict()
+            for s, i in enumerate(self.order):
+                root = first.setdefault(self._root(component, i), s)
+                if root != s:
+                    self.links[s].append((attribute, root))
+                    self.plan.steps[s]["joins"].append((self.attributes[attribute], self.names[self.order[root]]))
+        self.residual = [[] for _ in self.order]  # residual filters tested at every step
+        for f, key, indices in residual:
+            self.residual[max(step_of[i] for i in indices)].append((f, key))
+        for s, step_filters in enumerate(self.residual):
+            step_filters.sort(key=lambda entry: self.statistics.selectivity(self.template, entry[1]))
+            self.plan.steps[s]["filters"] = [(key, self.statistics.selectivity(self.template, key))
+                                             for _, key in step_filters]
+
+        # Candidates are partitioned by the values of the attributes they share with the variables bound before them
+        self.partitions = []
+        for s, i in enumerate(self.order):
+            partition = dict()
+            for candidate in candidates[i]:
+                partition.setdefault(tuple(candidate[2][a] for a, _ in self.links[s]), []).append(candidate)
+            self.partitions.append(partition)
+
+    @staticmethod
+    def _root(component, i):
+        while component[i] != i:
+            i = component[i]
+        return i
+
+    def enumerate(self, solutions):
+        """
+        :return: An iterator over the assignments (dictionaries of variable names to groups) that satisfy the filters,
+        in the order of the positions of their groups in the domains (of the first, second, ... variable)
+        """
+        assignment = dict()
+        chosen = [None] * len(self.order)  # the attribute values of the candidates chosen at every step
+        positions = [None] * len(self.names)  # the domain positions of the candidates chosen for every variable
+        matches = [0] * len(self.order)
+        tests = [[[f, 0, 0] for f, _ in step_filters] for step_filters in self.residual]  # filter, tested, satisfied
+
+        def extend(s):
+            if s == len(self.order):
+                yield tuple(positions), dict(assignment)
+                return
+            i = self.order[s]
+            name = self.names[i]
+            key = tuple(chosen[root][attribute] for attribute, root in self.links[s])
+            for j, group, row in self.partitions[s].get(key, []):
+                assignment[name] = group
+                chosen[s], positions[i] = row, j
+                satisfied = True
+                for counts in tests[s]:
+                    counts[1] += 1
+                    if not counts[0].test_relaxed(assignment, solutions):
+                        satisfied = False
+                        break
+                    counts[2] += 1
+                if satisfied:
+                    matches[s] += 1
+                    yield from extend(s + 1)
+            assignment.pop(name, None)
+
+        def run():
+            if self.order == sorted(self.order):
+                for _, result in extend(0):
+                    yield result
+            else:
+                for _, result in sorted(extend(0), key=lambda entry: entry[0]):
+                    yield result
+            for s, step_tests in enumerate(tests):
+                self.plan.steps[s]["matches"] = matches[s]
+                for (_, key), (_, tested, satisfied) in zip(self.residual[s], step_tests):
+                    self.statistics.record(self.template, key, tested, satisfied)
+
+        return run()
@@ -2,6 +2,8 @@ from enum import Enum
 
 import numpy
 
+from tacle.util.cache import LRUCache
+
 
 class GType(Enum):
     int = 0
@@ -44,6 +46,8 @@ def null(var, val):
 # --- Bounds ---
 
 class Bounds:
+    __slots__ = ("bounds",)
+
     def __init__(self, bounds_list):
         self.bounds = tuple(bounds_list)
 
@@ -94,6 +98,54 @@ class Bounds:
         return self.bounds == other.bounds
 
 
+# --- Dictionary ---
+
+class StringDictionary:
+    """
+    Dictionary encoding of strings as int32 codes.  A single dictionary is shared by all groups (and blocks) of a
+    sheet, so that equal strings have equal codes across groups and key matching becomes integer comparisons.
+    """
+    blank = -1
+
+    def __init__(self):
+        self._codes = dict()
+        self._strings = []
+
+    def _code(self, value):
+        if value is None:
+            return StringDictionary.blank
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._codes[value] = code
+            self._strings.append(value)
+        return code
+
+    def encode(self, data):
+        """
+        :param data: An array of strings (None for blank cells)
+        :return: An int32 array of codes with the same shape (blank cells are StringDictionary.blank)
+        """
+        data = numpy.asarray(data, dtype=object)
+        return numpy.fromiter(map(self._code, data.ravel()), dtype=numpy.int32, count=data.size).reshape(data.shape)
+
+    def isin(self, codes, reference_codes):
+        """
+        Vectorized membership test of codes in reference codes, using a lookup table over the dictionary
+        :return: A boolean array (shaped like codes)
+        """
+        present = numpy.zeros(len(self._strings) + 1, dtype=bool)
+        present[numpy.asarray(reference_codes)] = True
+        return present[codes]
+
+    def decode(self, codes):
+        strings = numpy.array(self._strings + [None], dtype=object)
+        return strings[numpy.where(numpy.asarray(codes) == StringDictionary.blank, len(self._strings), codes)]
+
+    def __len__(self):
+        return len(self._strings)
+
+
 # --- Table ---
 
 class Table:
@@ -131,17 +183,27 @@ class Table:
 # --- Group ---
 
 class Group:
-    def __init__(self, table, bounds, row, data, gtype_set):
+    __slots__ = ("_table", "_bounds", "_row", "_vector_types", "_dtype", "_data", "_blanks", "_is_partial",
+                 "_dictionary", "_codes", "_subgroups", "_hash", "_interned")
+
+    def __init__(self, table, bounds, row, data, gtype_set, dictionary=None):
+        """
+        :param dictionary: The StringDictionary (shared by the groups of a sheet) used to encode textual data
+        """
         self._table = table
         self._bounds = bounds
         self._row = row
         self._vector_types = gtype_set
         self._dtype = GType.max(gtype_set)
         self._data = data
-        from tacle.core.template import blank_filter
-        self._is_partial = not numpy.all(numpy.vectorize(blank_filter(self._data)[1])(self._data))
-        self._subgroups = dict()
+        from tacle.core.template import blank_mask
+        self._blanks = blank_mask(self._data)
+        self._is_partial = bool(numpy.any(self._blanks))
+        self._dictionary = dictionary
+        self._codes = None
+        self._subgroups = None
         self._hash = None
+        self._interned = None
 
     @property
     def is_partial(self):
@@ -171,6 +233,30 @@ class Group:
     def data(self):
         return self._data
 
+    @property
+    def blanks(self):
+        """
+        Boolean array (shaped like data) marking the blank cells
+        """
+        return self._blanks
+
+    @property
+    def dictionary(self):
+        return self._dictionary
+
+    @property
+    def codes(self):
+        """
+        The dictionary codes of the (textual) data, shaped like data
+        """
+        if self._codes is None:
+            if not self.is_textual():
+                raise ValueError("Only textual groups are dictionary encoded, {} has type {}".format(self, self.dtype))
+            if self._dictionary is None:
+                self._dictionary = StringDictionary()
+            self._codes = self._dictionary.encode(self._data)
+        return self._codes
+
     def __repr__(self):
         r1, r2, c1, c2 = self.bounds.bounds
         if self.row:
@@ -216,21 +302,60 @@ class Group:
     def row_oriented(self):
         return self.row
 
+    @property
+    def subgroups(self):
+        """
+        The cache of subgroups of this group (registered with the global cache registry), created when first needed
+        """
+        if self._subgroups is None:
+            self._subgroups = LRUCache("subgroups")
+        return self._subgroups
+
     def subgroup(self, bounds):
-        if bounds not in self._subgroups:
+        group = self.subgroups.get(bounds)
+        if group is None:
             sub_bounds = Bounds([1, self.rows(), 1, self.columns()]).combine(bounds)
             r1, r2, c1, c2 = sub_bounds.bounds
-            sub_data = sub_bounds.subset(self.data)
             indices = [r1, r2] if self.row else [c1, c2]
-            vector_types = [self._vector_types[i - 1] for i in range(indices[0], indices[1] + 1)]
-            group = Group(self.table, self.bounds.combine(bounds), self.row, sub_data, vector_types)
-            self._subgroups[bounds] = group
-            return group
-        return self._subgroups[bounds]
+            vector_types = list(self._vector_types[indices[0] - 1:indices[1]])
+            group = self._view(self.bounds.combine(bounds), sub_bounds, vector_types)
+            self.subgroups[bounds] = group
+        return group
+
+    def _view(self, bounds, sub_bounds, vector_types):
+        """
+        Creates a subgroup whose data, blank flags and codes are views of the buffers of this group
+        :param bounds: The bounds of the subgroup (within the table)
+        :param sub_bounds: The bounds of the subgroup within this group
+        """
+        group = Group.__new__(Group)
+        group._table = self._table
+        group._bounds = bounds
+        group._row = self._row
+        group._vector_types = vector_types
+        group._dtype = GType.max(vector_types)
+        group._data = sub_bounds.subset(self._data)
+        group._blanks = sub_bounds.subset(self._blanks)
+        group._is_partial = bool(numpy.any(group._blanks))
+        if self.is_textual():
+            group._codes = sub_bounds.subset(self.codes)
+        else:
+            group._codes = None
+        group._dictionary = self._dictionary
+        group._subgroups = None
+        group._hash = None
+        group._interned = None
+        return group
 
     def get_vector(self, i):
         return self.data[i - 1, :] if self.row else self.data[:, i - 1]
 
+    def get_vector_blanks(self, i):
+        return self.blanks[i - 1, :] if self.row else self.blanks[:, i - 1]
+
+    def get_vector_codes(self, i):
+        return self.codes[i - 1, :] if self.row else self.codes[:, i - 1]
+
     def __iter__(self):
         for i in range(1, self.vectors() + 1):
             yield self.vector_subset(i, i)
@@ -244,8 +369,24 @@ class Group:
         return self.bounds.overlaps_with(group.bounds)
 
     def vector_subset(self, start, end):
-        l = [start, end] + [None, None] if self.row else [None, None] + [start, end]
-        return self.subgroup(Bounds(l))
+        # Vector subsets are cached by index and their bounds are computed directly (without combining bounds)
+        key = (start, end)
+        group = self.subgroups.get(key)
+        if group is None:
+            if 1 <= start <= end <= self.vectors():
+                r1, r2, c1, c2 = self._bounds.bounds
+                if self._row:
+                    bounds = Bounds((r1 + start - 1, r1 + end - 1, c1, c2))
+                    sub_bounds = Bounds((start, end, 1, c2 - c1 + 1))
+                else:
+                    bounds = Bounds((r1, r2, c1 + start - 1, c1 + end - 1))
+                    sub_bounds = Bounds((1, r2 - r1 + 1, start, end))
+                group = self._view(bounds, sub_bounds, list(self._vector_types[start - 1:end]))
+            else:
+                l = [start, end] + [None, None] if self.row else [None, None] + [start, end]
+                group = self.subgroup(Bounds(l))
+            self.subgroups[key] = group
+        return group
 
     def __hash__(self):
         if self._hash is None:
@@ -0,0 +1,71 @@
+import json
+
+from tacle.util.cache import LRUCache
+
+
+class FilterStatistics(object):
+    """
+    Selectivity statistics of filters: how many candidates (or combinations of candidates) were tested against every
+    filter and how many of them satisfied it.  Statistics are kept per template, since the candidates of templates
+    that share a filter differ.  Filters are identified by their key (see Filter.key), such that statistics carry over
+    between learning tasks and, when they are saved and loaded, between runs.  The counts are kept in a cache of the
+    global cache registry ("filter_statistics"), which also bounds and clears them.
+    """
+
+    def __init__(self):
+        self._counts = LRUCache("filter_statistics")  # (template name, filter key) -> [tested, satisfied]
+
+    def record(self, template, key, tested, satisfied):
+        counts = self._counts.get((template, key))
+        if counts is None:
+            counts = self._counts[(template, key)] = [0, 0]
+        counts[0] += tested
+        counts[1] += satisfied
+
+    def selectivity(self, template, key, default=1.0):
+        """
+        :return: The fraction of tested candidates that satisfied the filter (default if it was never tested)
+        """
+        counts = self._counts.get((template, key))
+        return counts[1] / counts[0] if counts is not None and counts[0] > 0 else default
+
+    def __contains__(self, template_key):
+        return template_key in self._counts
+
+    def __len__(self):
+        return len(self._counts)
+
+    def as_dict(self):
+        """
+        :return: The statistics as a nested dictionary (template name -> filter key -> tested and satisfied counts)
+        """
+        result = dict()
+        for (template, key), (tested, satisfied) in self._counts.items():
+            result.setdefault(template, dict())[key] = {"tested": tested, "satisfied": satisfied}
+        return result
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.as_dict(), f, indent=2, sort_keys=True)
+
+    def load(self, filename):
+        """
+        Adds the statistics stored in the given file (see save) to these statistics
+        """
+        with open(filename) as f:
+            for template, filters in json.load(f).items():
+                for key, counts in filters.items():
+                    self.record(template, key, counts["tested"], counts["satisfied"])
+
+    def clear(self):
+        self._counts.clear()
+
+
+statistics = FilterStatistics()
+
+
+def get_statistics():
+    """
+    :return: The global filter statistics, collected by all candidate joins of the process
+    """
+    return statistics
@@ -1,9 +1,13 @@
 from typing import Dict, TYPE_CHECKING, List, Union
 
+import numpy
+
+from tacle.util.cache import LRUCache
+from .group import Group
 
 if TYPE_CHECKING:
+    from .assignment import JoinPlan
     from .template import ConstraintTemplate
-    from .group import Group
 
 
 class Importer:
@@ -21,7 +25,9 @@ class Importer:
 
 
 class Constraint(object):
-    importer = None
+    __slots__ = ("template", "assignment")
+    # Holds the importer (mapping names to templates), it is rebuilt when the cache was cleared
+    importer = LRUCache("importer")
 
     def __init__(self, template, assignment):
         # type: (ConstraintTemplate, Dict[str, object]) -> None
@@ -69,44 +75,178 @@ class Constraint(object):
 
     @staticmethod
     def from_dict(constraint_dict):
-        if Constraint.importer is None:
-            Constraint.importer = Importer()
-        return Constraint.importer.import_constraint(constraint_dict["name"], constraint_dict["assignment"])
+        importer = Constraint.importer.get(Importer)
+        if importer is None:
+            importer = Constraint.importer[Importer] = Importer()
+        return importer.import_constraint(constraint_dict["name"], constraint_dict["assignment"])
+
+
+class GroupRegistry(object):
+    """
+    Interns the groups (and vectors) of a learning task as dense integer IDs.  Groups remember the ID they were given,
+    so looking up a group that was interned before does not need to hash it.
+    """
+
+    def __init__(self):
+        self.groups = []
+        self._ids = dict()
+        self._token = object()
+
+    def get_id(self, group, add=False):
+        """
+        :param group: The group (or any other hashable value) to look up
+        :param add: Whether to intern the group if it does not yet have an ID
+        :return: The ID of the group, None if it has no ID (and add is False)
+        """
+        try:
+            interned = group._interned
+            if interned is not None and interned[0] is self._token:
+                return interned[1]
+        except AttributeError:
+            pass
+        group_id = self._ids.get(group)
+        if group_id is None:
+            if not add:
+                return None
+            group_id = self._ids[group] = len(self.groups)
+            self.groups.append(group)
+        if hasattr(group, "_interned"):
+            group._interned = (self._token, group_id)
+        return group_id
+
+    def __getitem__(self, group_id):
+        return self.groups[group_id]
+
+    def __len__(self):
+        return len(self.groups)
+
+
+class OverlapIndex(object):
+    """
+    Builds overlap matrices for batches of groups (and vectors) of a learning task: the tables and bounds of two lists
+    of groups are gathered in arrays and all pairs are tested at once.  Nothing is stored per group (most vectors are
+    transient views of their groups), only the indices of the tables.  Overlaps are defined as in
+    Group.overlaps_with (the same table and intersecting bounds), single pairs are best tested with that method.
+    """
+
+    def __init__(self):
+        self._tables = dict()  # table name -> table index
+
+    def coordinates(self, groups):
+        """
+        :return: An array with the table index and bounds (r1, r2, c1, c2) of every group
+        """
+        tables = self._tables
+        coordinates = [(tables.setdefault(group.table.name, len(tables)),) + group.bounds.bounds for group in groups]
+        return numpy.array(coordinates, dtype=numpy.int64).reshape(len(coordinates), 5)
+
+    def matrix(self, groups1, groups2):
+        """
+        :return: A boolean matrix (len(groups1) x len(groups2)) that marks which pairs of groups overlap
+        """
+        if not all(isinstance(g, Group) for groups in (groups1, groups2) for g in groups):
+            # Blocks (of virtual templates) are compared pairwise
+            overlaps = [[g1.overlaps_with(g2) for g2 in groups2] for g1 in groups1]
+            return numpy.array(overlaps, dtype=bool).reshape(len(groups1), len(groups2))
+        c1, c2 = self.coordinates(groups1)[:, numpy.newaxis, :], self.coordinates(groups2)
+        disjoint = (c2[..., 2] < c1[..., 1]) | (c2[..., 1] > c1[..., 2]) | (c2[..., 4] < c1[..., 3]) \
+            | (c2[..., 3] > c1[..., 4])
+        return (c1[..., 0] == c2[..., 0]) & ~disjoint
+
+    def disjoint_product(self, group_lists):
+        """
+        Enumerates the combinations of groups (one of every list, in the order of itertools.product) in which no two
+        groups overlap
+        """
+        group_lists = [list(groups) for groups in group_lists]
+        disjoint = {(i, j): ~self.matrix(group_lists[i], group_lists[j])
+                    for j in range(len(group_lists)) for i in range(j)}
+
+        def extend(prefix, chosen):
+            depth, groups = len(chosen), group_lists[len(chosen)]
+            allowed = numpy.ones(len(groups), dtype=bool)
+            for i, index in enumerate(chosen):
+                allowed &= disjoint[(i, depth)][index]
+            for index in numpy.flatnonzero(allowed).tolist():
+                if depth == len(group_lists) - 1:
+                    yield prefix + (groups[index],)
+                else:
+                    yield from extend(prefix + (groups[index],), chosen + [index])
+
+        return extend((), []) if len(group_lists) > 0 else iter([()])
 
 
 class Solutions:
+    """
+    The solutions found for every template.  Solutions are stored as tuples of group IDs (ordered like the variables
+    of their template), groups are only looked up again when solutions or constraints are requested.  The plans of the
+    candidate joins of every template (one per seed assignment) are kept as well (see tacle.core.assignment.JoinPlan).
+    """
+
     def __init__(self):
-        self.solutions = {}
+        self.solutions = {}  # type: Dict[ConstraintTemplate, List[tuple]]
         self.properties = {}
+        self.plans = {}  # type: Dict[ConstraintTemplate, List[JoinPlan]]
         self.canon_map = dict()
-        self.constraints = []  # type: List[Constraint]
+        self.registry = GroupRegistry()
+        self.overlaps = OverlapIndex()
+        self._features = None
+
+    @property
+    def features(self):
+        """
+        The feature table of the groups of the task (see tacle.core.assignment.FeatureTable)
+        """
+        if self._features is None:
+            from tacle.core.assignment import FeatureTable
+            self._features = FeatureTable()
+        return self._features
 
     def add(self, template, solutions):
-        solutions_l = list(solutions)
-        self.solutions[template] = solutions_l
-        solution_set = set(self._to_tuple(template, solution) for solution in solutions_l)
-        self.properties[template] = solution_set
-        for solution in solutions_l:
-            self.constraints.append(Constraint(template, solution))
+        solution_ids = [self._to_ids(template, solution, add=True) for solution in solutions]
+        self.solutions[template] = solution_ids
+        self.properties[template] = set(solution_ids)
 
     def get_solutions(self, template):
-        return self.solutions.get(template, [])
+        return [self._to_solution(template, ids) for ids in self.solutions.get(template, [])]
+
+    @property
+    def constraints(self):
+        # type: () -> List[Constraint]
+        return [Constraint(template, self._to_solution(template, ids))
+                for template, solution_ids in self.solutions.items() for ids in solution_ids]
 
     def has_solution(self, template, solution):
-        return self._to_tuple(template, solution) in self.properties[template]
+        ids = self._to_ids(template, solution)
+        return ids is not None and ids in self.properties[template]
 
     def has(self, template, keys, values):
         return self.has_solution(template, {k.name: v for k, v in zip(keys, values)})
 
-    @staticmethod
-    def _to_tuple(template, solution):
+    def _to_ids(self, template, solution, add=False):
+        """
+        :return: The IDs of the groups assigned to the variables of the template, None if a group has no ID (and add
+        is False)
+        """
         try:
-            return tuple(solution[v.name] for v in template.variables)
+            groups = [solution[v.name] for v in template.variables]
         except KeyError as e:
             raise RuntimeError("No value for {} in solution {}".format(e.args[0], solution))
+        token, ids = self.registry._token, []
+        for group in groups:
+            # Inlines the look up of groups that were interned by this registry
+            interned = getattr(group, "_interned", None)
+            if interned is not None and interned[0] is token:
+                ids.append(interned[1])
+            else:
+                group_id = self.registry.get_id(group, add)
+                if group_id is None:
+                    return None
+                ids.append(group_id)
+        return tuple(ids)
+
+    def _to_solution(self, template, ids):
+        return {v.name: self.registry[group_id] for v, group_id in zip(template.variables, ids)}
 
     def set_canon(self, canon_map):
         self.canon_map = canon_map
-
-                  
-
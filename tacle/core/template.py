@@ -7,6 +7,7 @@ from .assignment import Source, Filter, Variable, SameLength, ConstraintSource,
     SameOrientation, SameType, SizeFilter, Not, NotPartial, Partial
 from .group import GType, Group, Orientation
 from tacle import indexing
+from tacle.util.cache import LRUCache
 
 
 class ConstraintTemplate:
@@ -53,6 +54,38 @@ class ConstraintTemplate:
     def __ne__(self, other):
         return not (self == other)
 
+    @classmethod
+    def instance(cls, *args):
+        """
+        :return: The interned instance of this template for the given constructor arguments
+        """
+        return template_registry.get(cls, *args)
+
+
+class TemplateRegistry(object):
+    """
+    Process-wide registry of interned template instances, keyed by their class and constructor arguments (e.g., the
+    orientation and operation of an aggregate).  Templates do not change once they are built, so solving strategies
+    and learning tasks can share them instead of building templates (with their variables, sources and filters) again.
+    Interned templates are kept in a cache of the global cache registry ("templates"), templates that are built again
+    after the registry was cleared are equal to the previous instances.
+    """
+
+    def __init__(self):
+        self._templates = LRUCache("templates")
+
+    def get(self, template_class, *args):
+        key = (template_class,) + args
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = template_class(*args)
+        return template
+
+    def __len__(self):
+        return len(self._templates)
+
+
+template_registry = TemplateRegistry()
 
 integer = {GType.int}
 numeric = {GType.int, GType.float}
@@ -76,6 +109,19 @@ def blank_filter(data, vectorized=False):
     return blank, (blank_f if not vectorized else numpy.vectorize(blank_f))
 
 
+def blank_mask(data):
+    """
+    Vectorized version of blank_filter
+    :return: A boolean array marking the blank cells (NaN for floating point data, None otherwise)
+    """
+    data = numpy.asarray(data)
+    if numpy.issubdtype(data.dtype, numpy.floating):
+        return numpy.isnan(data)
+    if data.dtype == object:
+        return numpy.equal(data, None)
+    return numpy.zeros(data.shape, dtype=bool)
+
+
 def count_agg(data, axis=None):
     if axis is None:
         res = [len(data.flatten())]
@@ -166,7 +212,7 @@ class Aggregate(ConstraintTemplate):
         format_s = "{Y} = " + op_string.upper() + "({X}, " + or_string + ")"
         name = "{} ({})".format(op_string.lower(), or_string)
         # TODO Dependency only min max average
-        super().__init__(name, format_s, Source(variables), filters, {Equal(), Projection()}, self.y)
+        super().__init__(name, format_s, Source(variables), filters, {Equal.instance(), Projection.instance()}, self.y)
 
     @property
     def orientation(self):
@@ -178,7 +224,7 @@ class Aggregate(ConstraintTemplate):
 
     @classmethod
     def instance(cls, orientation: Orientation, operation: Operation):
-        return Aggregate(orientation, operation)
+        return template_registry.get(cls, orientation, operation)
 
     @classmethod
     def instances(cls):
@@ -194,7 +240,7 @@ class Permutation(ConstraintTemplate):
 
     def __init__(self):
         variables = [self.x]
-        source = ConstraintSource(variables, AllDifferent(), {AllDifferent.x.name: self.x.name})
+        source = ConstraintSource(variables, AllDifferent.instance(), {AllDifferent.x.name: self.x.name})
         filters = [NotPartial(variables)]
         super().__init__("permutation", "PERMUTATION({X})", source, filters)
 
@@ -204,7 +250,7 @@ class Series(ConstraintTemplate):
 
     def __init__(self):
         variables = [self.x]
-        source = ConstraintSource(variables, Permutation(), {Permutation.x.name: self.x.name})
+        source = ConstraintSource(variables, Permutation.instance(), {Permutation.x.name: self.x.name})
         filters = [NotPartial(variables)]
         super().__init__("series", "SERIES({X})", source, filters, None, self.x)
 
@@ -236,7 +282,7 @@ class Rank(ConstraintTemplate):
         variables = [self.x, self.y]
         source = Source(variables)  # Not from Permutation because of possible ties
         filters = [SameLength(variables), NotPartial(variables)]
-        super().__init__("rank", "{Y} = RANK({X})", source, filters, {Equal()}, self.y)
+        super().__init__("rank", "{Y} = RANK({X})", source, filters, {Equal.instance()}, self.y)
 
 
 class ForeignKey(ConstraintTemplate):
@@ -245,7 +291,7 @@ class ForeignKey(ConstraintTemplate):
 
     def __init__(self):
         variables = [self.pk, self.fk]
-        source = ConstraintSource(variables, AllDifferent(), {"X": "PK"})
+        source = ConstraintSource(variables, AllDifferent.instance(), {"X": "PK"})
         filters = [Not(SameTable(variables)), SameType(variables), NotPartial([self.pk])]
         super().__init__("foreign-key", "{FK} -> {PK}", source, filters)
 
@@ -258,12 +304,12 @@ class Lookup(ConstraintTemplate):
 
     def __init__(self):
         variables = [self.o_key, self.o_value, self.f_key, self.f_value]
-        source = ConstraintSource(variables, ForeignKey(), {"PK": "OK", "FK": "FK"})
+        source = ConstraintSource(variables, ForeignKey.instance(), {"PK": "OK", "FK": "FK"})
         filters = [SameType([self.o_value, self.f_value]), NotPartial(variables),
                    SameLength([self.f_key, self.f_value]), SameLength([self.o_key, self.o_value]),
                    SameTable([self.f_key, self.f_value]), SameTable([self.o_key, self.o_value]),
                    SameOrientation([self.f_key, self.f_value]), SameOrientation([self.o_key, self.o_value])]
-        super().__init__("lookup", "{FV} = LOOKUP({FK}, {OK}, {OV})", source, filters, {Equal()}, self.f_value)
+        super().__init__("lookup", "{FV} = LOOKUP({FK}, {OK}, {OV})", source, filters, {Equal.instance()}, self.f_value)
 
 
 class FuzzyLookup(ConstraintTemplate):
@@ -275,13 +321,13 @@ class FuzzyLookup(ConstraintTemplate):
     def __init__(self):
         variables = [self.o_key, self.o_value, self.f_key, self.f_value]
         # source = Source(variables)
-        source = ConstraintSource(variables, Ordered(), {Ordered.x.name: self.o_key.name})
+        source = ConstraintSource(variables, Ordered.instance(), {Ordered.x.name: self.o_key.name})
         filters = [SameType([self.o_value, self.f_value]), NotPartial(variables),
                    SameLength([self.f_key, self.f_value]), SameLength([self.o_key, self.o_value]),
                    SameTable([self.f_key, self.f_value]), SameTable([self.o_key, self.o_value]),
                    SameOrientation([self.f_key, self.f_value]), SameOrientation([self.o_key, self.o_value])]
         print_format = "{FV} = FUZZY-LOOKUP({FK}, {OK}, {OV})"
-        super().__init__("fuzzy-lookup", print_format, source, filters, {Equal()}, self.f_value)
+        super().__init__("fuzzy-lookup", print_format, source, filters, {Equal.instance()}, self.f_value)
 
 
 class ConditionalAggregate(ConstraintTemplate):
@@ -295,7 +341,7 @@ class ConditionalAggregate(ConstraintTemplate):
         self._operation = operation
         name = operation.name
         variables = [self.o_key, self.result, self.f_key, self.values]
-        all_diff = AllDifferent()
+        all_diff = AllDifferent.instance()
         source = ConstraintSource(variables, all_diff, {all_diff.x.name: "OK"})
         filters = [SameLength([self.o_key, self.result]), SameLength([self.f_key, self.values]),
                    SameTable([self.f_key, self.values]), Not(SameTable([self.f_key, self.o_key])),
@@ -303,7 +349,7 @@ class ConditionalAggregate(ConstraintTemplate):
                    NotPartial([self.o_key]), SameType([self.f_key, self.o_key]),
                    SameOrientation([self.o_key, self.result]), SameOrientation([self.f_key, self.values])]
         p_format = "{R} = " + name.upper() + "IF({FK}={OK}, {V})"
-        super().__init__("{}-if".format(name.lower()), p_format, source, filters, {Lookup()}, self.result)
+        super().__init__("{}-if".format(name.lower()), p_format, source, filters, {Lookup.instance()}, self.result)
 
     @property
     def operation(self) -> Operation:
@@ -315,7 +361,7 @@ class ConditionalAggregate(ConstraintTemplate):
 
     @classmethod
     def instance(cls, operation: Operation):
-        return ConditionalAggregate(operation)
+        return template_registry.get(cls, operation)
 
     @classmethod
     def instances(cls):
@@ -331,7 +377,7 @@ class RunningTotal(ConstraintTemplate):
         variables = [self.acc, self.pos, self.neg]
         source = Source(variables)
         filters = [SameLength(variables), SizeFilter(variables, length=2), NotPartial(variables)]
-        super().__init__("running-total", "{A} = PREV({A}) + {P} - {N}", source, filters, {Equal()}, self.acc)
+        super().__init__("running-total", "{A} = PREV({A}) + {P} - {N}", source, filters, {Equal.instance()}, self.acc)
 
 
 class ForeignOperation(ConstraintTemplate):
@@ -346,7 +392,7 @@ class ForeignOperation(ConstraintTemplate):
         foreign = [self.f_key, self.result, self.f_value]
         original = [self.o_key, self.o_value]
         variables = foreign + original
-        foreign_key = ForeignKey()
+        foreign_key = ForeignKey.instance()
         source = ConstraintSource(variables, foreign_key, {foreign_key.pk.name: "OK", foreign_key.fk.name: "FK"})
         filters = [SameLength(foreign), SameTable(foreign), SameOrientation(foreign), NotPartial(variables),
                    SameLength(original), SameTable(original), SameOrientation(original)]
@@ -402,7 +448,7 @@ class PercentualDiff(VectorOperation):
         variables = self.list_variables()
         source = Source(variables)
         filters = [SameLength(variables), NotPartial(variables), SameOrientation(variables)]
-        super().__init__("percentual-diff", "{R} = ({O1} - {O2}) / {O2}", source, filters, False, {Equal()})
+        super().__init__("percentual-diff", "{R} = ({O1} - {O2}) / {O2}", source, filters, False, {Equal.instance()})
 
 
 class Projection(ConstraintTemplate):
@@ -10,10 +10,11 @@ def is_virtual(template):
 class VirtualLookup(Lookup):
     def __init__(self):
         variables = [self.o_key, self.o_value, self.f_key]
-        source = ConstraintSource(variables, ForeignKey(), {"PK": "OK", "FK": "FK"})
+        source = ConstraintSource(variables, ForeignKey.instance(), {"PK": "OK", "FK": "FK"})
         filters = [NotPartial(variables), SameLength([self.o_key, self.o_value]), SameTable([self.o_key, self.o_value]),
                    SameOrientation([self.o_key, self.o_value])]
-        ConstraintTemplate.__init__(self, "virtual-lookup", "? = LOOKUP({FK}, {OK}, {OV})", source, filters, {Equal()})
+        ConstraintTemplate.__init__(self, "virtual-lookup", "? = LOOKUP({FK}, {OK}, {OV})", source, filters,
+                                    {Equal.instance()})
 
 
 class VirtualConditionalAggregate(ConditionalAggregate):
@@ -22,16 +23,13 @@ class VirtualConditionalAggregate(ConditionalAggregate):
         self._operation = operation
         name = operation.name
         variables = [self.o_key, self.f_key, self.values]
-        # source = ConstraintSource(variables, ForeignKey(), {"PK": self.o_key, "FK": self.f_key})
-        source = ConstraintSource(variables, AllDifferent(), {AllDifferent.x.name: self.o_key})
+        # source = ConstraintSource(variables, ForeignKey.instance(), {"PK": self.o_key, "FK": self.f_key})
+        source = ConstraintSource(variables, AllDifferent.instance(), {AllDifferent.x.name: self.o_key})
         filters = [SameLength([self.f_key, self.values]),
                    SameTable([self.f_key, self.values]), Not(SameTable([self.f_key, self.o_key])),
                    # SameTable([self.o_key, self.result]),  # TODO think about this
                    NotPartial([self.o_key]), SameType([self.f_key, self.o_key]),
                    SameOrientation([self.f_key, self.values])]
         p_format = "? = " + name.upper() + "IF({FK}={OK}, {V})"
-        ConstraintTemplate.__init__(self, "virtual-{}-if".format(name.lower()), p_format, source, filters, {Lookup()})
-
-    @classmethod
-    def instance(cls, operation):
-        return VirtualConditionalAggregate(operation)
+        ConstraintTemplate.__init__(self, "virtual-{}-if".format(name.lower()), p_format, source, filters,
+                                    {Lookup.instance()})
@@ -1,4 +1,5 @@
-from typing import List
+import itertools
+from typing import List, Optional
 
 import numpy
 import numpy as np
@@ -7,88 +8,191 @@ from .indexing import Typing, Range, Orientation, Table
 
 
 def get_headers_count(table_range: Range, table_type_data, orientation):
-    def get(_vi, _ei):
-        return table_type_data[_vi, _ei] if orientation == Orientation.horizontal else table_type_data[_ei, _vi]
-
-    headers = []
-    for vector_index in range(table_range.vector_count(orientation)):
-        running_type = get(vector_index, 0)
-        running_header = 0
-        for element_index in range(1, table_range.vector_length(orientation)):
-            current_type = get(vector_index, element_index)
-            if Typing.lowest_common_ancestor(current_type, running_type) is None:
-                running_header = max(running_header, element_index)
-                running_type = current_type
-
-        headers.append(running_header)
-
-    return headers
+    """
+    Computes the number of header cells of every vector: the last position at which the type of the vector changes
+    (i.e., has no common ancestor with the running type, which is the type at the previous change).  Every position
+    is processed for all vectors at once.
+    :return: A list containing the header count of every vector
+    """
+    type_codes = Typing.encode(table_type_data)
+    if orientation == Orientation.horizontal:
+        type_codes = type_codes.T
+    vector_count = table_range.vector_count(orientation)
+    headers = np.zeros(vector_count, dtype=int)
+    running = type_codes[0].copy()
+    for i in range(1, table_range.vector_length(orientation)):
+        current = type_codes[i]
+        changed = Typing.lca_table[current, running] == Typing.none
+        headers[changed] = i
+        running[changed] = current[changed]
+    return headers.tolist()
+
+
+def score_headers(headers, vector_length):
+    """
+    Scores every split of a range into header vectors and data: using the first i vectors as headers requires
+    skipping the maximal header count of the remaining vectors
+    :return: A tuple (score, header vectors, header elements) of the first split with the maximal number of cells
+    """
+    suffix_max = np.maximum.accumulate(np.asarray(headers)[::-1])[::-1]
+    scores = (vector_length - suffix_max) * (len(headers) - np.arange(len(headers)))
+    best = int(np.argmax(scores))
+    return int(scores[best]), best, int(suffix_max[best])
 
 
 def get_type_data(data):
-    data = numpy.array(data, dtype=object)
-    return numpy.vectorize(Typing.detect_type)(data)
+    return Typing.detect_codes(data)
+
+
+def label_ranges(occupied):
+    """
+    Groups the occupied cells into ranges, see label_ranges_with_origins
+    :param occupied: A boolean array indicating which cells are occupied
+    :return: The list of ranges
+    """
+    return label_ranges_with_origins(occupied)[0]
+
+
+def label_ranges_with_origins(occupied):
+    """
+    Groups the occupied cells into ranges, see label_row_cells
+    :param occupied: A boolean array indicating which cells are occupied
+    :return: A tuple (ranges, origins) of the list of ranges and the list of (row, column) cells that created them,
+    ranges are ordered by their origin
+    """
+    return label_row_cells((r, numpy.flatnonzero(occupied[r]).tolist()) for r in range(numpy.size(occupied, 0)))
+
+
+def label_row_cells(row_cells):
+    """
+    Groups the occupied cells into ranges with a single scan over the cells (row by row).  Every occupied cell that
+    is not yet part of a range joins the range above it and / or to its left (taking the bounding box), or starts a
+    new range.  Membership is tested on the bounding boxes, so ranges also absorb cells that lie within their bounding
+    box and the first range (in order of creation) is used if bounding boxes overlap.
+    For the current and the previous row, the first range containing every column is kept up to date when ranges
+    grow.  Ranges that are merged away point to the range they were merged into (union-find), so the columns they
+    owned need not be updated, which makes the scan linear in the number of occupied cells (plus the area of the
+    bounding boxes).
+    :param row_cells: An iterable of (row, columns) pairs listing the occupied columns of every row (in increasing
+    order), rows without occupied cells may be left out
+    :return: A tuple (ranges, origins) of the list of ranges and the list of (row, column) cells that created them,
+    ranges are ordered by their origin
+    """
+    ranges = []  # type: List[Optional[Range]]
+    origins = []
+    parent = []  # ranges that were merged into another range point to it
+    r, current = -1, dict()
+
+    def find(_i):
+        _root = _i
+        while parent[_root] != _root:
+            _root = parent[_root]
+        while parent[_i] != _root:
+            parent[_i], _i = _root, parent[_i]
+        return _root
+
+    def owner(_owners, _c):
+        _i = _owners.get(_c, -1)
+        return -1 if _i == -1 else find(_i)
+
+    def covers(_range, _row):
+        return _range is not None and _range.y0 <= _row < _range.y1
+
+    def paint(_i, _new, *_olds):
+        # The columns of the old ranges (that the new range is the bounding box of) are already owned by _i or by an
+        # earlier range, or by a range that was merged into _i
+        for _row, _owners in ((r - 1, previous), (r, current)):
+            if not covers(_new, _row):
+                continue
+            _start = _new.x0
+            for _old in sorted((_o for _o in _olds if covers(_o, _row)), key=lambda _o: _o.x0):
+                paint_columns(_i, _owners, range(_start, _old.x0))
+                _start = max(_start, _old.x1)
+            paint_columns(_i, _owners, range(_start, _new.x1))
+
+    def paint_columns(_i, _owners, _columns):
+        for _c in _columns:
+            _j = owner(_owners, _c)
+            if _j == -1 or _j > _i:
+                _owners[_c] = _i
+
+    for row, columns in row_cells:
+        # Owners are only set while processing cells, so the owners of skipped rows are empty
+        previous, current = (current if row == r + 1 else dict()), dict()
+        r = row
+        for c in columns:
+            if c in current:
+                continue
+            top = owner(previous, c)
+            left = owner(current, c - 1)
+            cell_range = Range(c, r, 1, 1)
+            if top == -1 and left == -1:
+                ranges.append(cell_range)
+                origins.append((r, c))
+                parent.append(len(parent))
+                paint(len(ranges) - 1, cell_range)
+            elif top == -1:
+                old = ranges[left]
+                ranges[left] = cell_range.bounding_box(old)
+                paint(left, ranges[left], old)
+            elif left == -1:
+                old = ranges[top]
+                ranges[top] = cell_range.bounding_box(old)
+                paint(top, ranges[top], old)
+            else:
+                old = ranges[top]
+                ranges[top] = old.bounding_box(ranges[left])
+                paint(top, ranges[top], old, ranges[left])
+                # The columns owned by the left range are owned by the merged range
+                ranges[left] = None
+                parent[left] = top
+
+    kept = [i for i, t_range in enumerate(ranges) if t_range is not None]
+    return [ranges[i] for i in kept], [origins[i] for i in kept]
+
+
+def remove_headers(t_range, type_data, orientation=None):
+    """
+    Removes the header rows and columns of a range, choosing the split (in the given orientations) that keeps the
+    most cells
+    :param t_range: The range (of occupied cells)
+    :param type_data: The type codes of the cells within the range
+    :param orientation: The allowed orientation (None allows both orientations)
+    :return: The range without its headers
+    """
+    row_headers = get_headers_count(t_range, type_data, Orientation.horizontal)
+    column_headers = get_headers_count(t_range, type_data, Orientation.vertical)
+    headers = None
+    cells = 0
+
+    if orientation is None or orientation == Orientation.vertical:
+        cells, column_header, row_header = score_headers(column_headers, t_range.rows)
+        headers = (column_header, row_header)
+
+    if orientation is None or orientation == Orientation.horizontal:
+        cell_score, row_header, column_header = score_headers(row_headers, t_range.columns)
+        if cell_score > cells:
+            cells = cell_score
+            headers = (column_header, row_header)
+
+    return t_range.intersect(Range(t_range.x0 + headers[0], t_range.y0 + headers[1], t_range.columns, t_range.rows))
+
+
+def large_enough(t_range, min_cells=None, min_rows=None, min_columns=None):
+    return (min_cells is None or t_range.columns * t_range.rows >= min_cells) \
+        and (min_rows is None or t_range.rows >= min_rows) and (min_columns is None or t_range.columns >= min_columns)
 
 
 def detect_table_ranges(type_data, typed=True, orientation=None, min_cells=None, min_rows=None, min_columns=None):
     if not typed:
         type_data = get_type_data(type_data)
+    type_data = Typing.encode(type_data)
+    occupied = type_data != Typing.codes[Typing.any]
 
-    ranges = []
-
-    def find_range(_c, _r):
-        for _i, _range in enumerate(ranges):
-            if _range is not None and _range.contains_cell((_c, _r)):
-                return _i, _range
-        return None
-
-    for r in range(numpy.size(type_data, 0)):
-        for c in range(numpy.size(type_data, 1)):
-            if type_data[r, c] != Typing.any:
-                selected_range = find_range(c, r)
-                if selected_range is None:
-                    top_range = find_range(c, r - 1) if r - 1 >= 0 else None
-                    left_range = find_range(c - 1, r) if c - 1 >= 0 else None
-                    cell_range = Range(c, r, 1, 1)
-                    if top_range is None and left_range is None:
-                        ranges.append(cell_range)
-                    elif top_range is None:
-                        ranges[left_range[0]] = cell_range.bounding_box(left_range[1])
-                    elif left_range is None:
-                        ranges[top_range[0]] = cell_range.bounding_box(top_range[1])
-                    else:
-                        ranges[top_range[0]] = top_range[1].bounding_box(left_range[1])
-                        ranges[left_range[0]] = None
-
-    ranges = [r for r in ranges if r is not None]
     table_ranges = []
-
-    for t_range in ranges:
-        t_type_data = t_range.get_data(type_data)
-        row_headers = get_headers_count(t_range, t_type_data, Orientation.horizontal)
-        column_headers = get_headers_count(t_range, t_type_data, Orientation.vertical)
-        headers = None
-        cells = 0
-
-        if orientation is None or orientation == Orientation.vertical:
-            for column_header in range(t_range.columns):
-                row_header = max(column_headers[column_header:])
-                cell_score = (t_range.rows - row_header) * (t_range.columns - column_header)
-                if cell_score > cells:
-                    cells = cell_score
-                    headers = (column_header, row_header)
-
-        if orientation is None or orientation == Orientation.horizontal:
-            for row_header in range(t_range.rows):
-                column_header = max(row_headers[row_header:])
-                cell_score = (t_range.rows - row_header) * (t_range.columns - column_header)
-                if cell_score > cells:
-                    cells = cell_score
-                    headers = (column_header, row_header)
-
-        t_r = t_range.intersect(Range(t_range.x0 + headers[0], t_range.y0 + headers[1], t_range.columns, t_range.rows))
-        if (min_cells is None or t_r.columns * t_r.rows >= min_cells) and (min_rows is None or t_r.rows >= min_rows)\
-                and (min_columns is None or t_r.columns >= min_columns):
+    for t_range in label_ranges(occupied):
+        t_r = remove_headers(t_range, t_range.get_data(type_data), orientation)
+        if large_enough(t_r, min_cells, min_rows, min_columns):
             table_ranges.append(t_r)
 
     return table_ranges
@@ -1,4 +1,3 @@
-import functools
 import itertools
 
 import math
@@ -9,6 +8,7 @@ from tacle.core.template import *
 from tacle.core.group import Group
 from tacle.core.solutions import Solutions
 from tacle.core.strategy import AssignmentStrategy, DictSolvingStrategy
+from tacle.util.cache import cached
 
 
 class MaxRange:
@@ -41,32 +41,32 @@ class InternalCSPStrategy(AssignmentStrategy):
         super().__init__()
         self._constraints = set()
 
-        self.add_constraint(Equal())
-        self.add_constraint(EqualGroup())
-        self.add_constraint(Series())
-        self.add_constraint(AllDifferent())
-        self.add_constraint(Permutation())
-        self.add_constraint(Rank())
-        self.add_constraint(ForeignKey())
-        self.add_constraint(VirtualLookup())
-        self.add_constraint(Lookup())
-        self.add_constraint(FuzzyLookup())
+        self.add_constraint(Equal.instance())
+        self.add_constraint(EqualGroup.instance())
+        self.add_constraint(Series.instance())
+        self.add_constraint(AllDifferent.instance())
+        self.add_constraint(Permutation.instance())
+        self.add_constraint(Rank.instance())
+        self.add_constraint(ForeignKey.instance())
+        self.add_constraint(VirtualLookup.instance())
+        self.add_constraint(Lookup.instance())
+        self.add_constraint(FuzzyLookup.instance())
         for c in VirtualConditionalAggregate.instances():
             self.add_constraint(c)
         for c in ConditionalAggregate.instances():
             self.add_constraint(c)
-        self.add_constraint(RunningTotal())
-        self.add_constraint(ForeignProduct())
-        self.add_constraint(Projection())
+        self.add_constraint(RunningTotal.instance())
+        self.add_constraint(ForeignProduct.instance())
+        self.add_constraint(Projection.instance())
         for c in Aggregate.instances():
             self.add_constraint(c)
-        self.add_constraint(Product())
-        self.add_constraint(Diff())
-        self.add_constraint(PercentualDiff())
-        self.add_constraint(SumProduct())
-        self.add_constraint(Ordered())
-        self.add_constraint(MutualExclusivity())
-        self.add_constraint(MutualExclusiveVector())
+        self.add_constraint(Product.instance())
+        self.add_constraint(Diff.instance())
+        self.add_constraint(PercentualDiff.instance())
+        self.add_constraint(SumProduct.instance())
+        self.add_constraint(Ordered.instance())
+        self.add_constraint(MutualExclusivity.instance())
+        self.add_constraint(MutualExclusiveVector.instance())
 
     def add_constraint(self, constraint: ConstraintTemplate):
         self._constraints.add(constraint)
@@ -75,7 +75,7 @@ class InternalCSPStrategy(AssignmentStrategy):
         return constraint in self._constraints
 
     def apply(self, constraint: ConstraintTemplate, groups: [Group], solutions):
-        return constraint.source.candidates(groups, solutions, constraint.filters)
+        return constraint.source.candidates(groups, solutions, constraint.filters, constraint)
 
 
 class InternalSolvingStrategy(DictSolvingStrategy):
@@ -90,7 +90,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         return False
                 return True
 
-            return self._generate_test_vectors(assignments, [c.x], test_series)
+            return self._generate_test_vectors(assignments, [c.x], test_series, solutions)
 
         def all_different(c: AllDifferent, assignments, solutions):
             def test_all_different(x_v):
@@ -98,6 +98,10 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                 if not (x_v.is_textual or x_v.is_integer()):
                     return False
 
+                if isinstance(x_v, Group) and x_v.is_textual():
+                    x = x_v.get_vector_codes(1)
+                    return len(numpy.unique(x)) == len(x)
+
                 x, = to_data(x_v)
                 seen = set()
                 for i in range(len(x)):
@@ -106,7 +110,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     seen.add(x[i])
                 return True
 
-            return self._generate_test_vectors(assignments, [c.x], test_all_different)
+            return self._generate_test_vectors(assignments, [c.x], test_all_different, solutions)
 
         def permutation(c: Permutation, assignments, solutions):
             def test_permutation(x_v):
@@ -119,7 +123,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     number_set.remove(x[i])
                 return True
 
-            return self._generate_test_vectors(assignments, [c.x], test_permutation)
+            return self._generate_test_vectors(assignments, [c.x], test_permutation, solutions)
 
         def rank(c: Rank, assignments, solutions):
             # TODO Speed up by using local inconsistencies: check some random elements and check consistency of rank
@@ -141,20 +145,21 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                 # Check if not equal
                 return not found_equal(y_v, x_v, solutions)
 
-            return self._generate_test_vectors(assignments, [c.y, c.x], is_rank)
+            return self._generate_test_vectors(assignments, [c.y, c.x], is_rank, solutions)
 
         def foreign_keys(constraint, assignments, solutions):
 
             pks = dict()
-            for assignment in assignments:
-                pk_block = assignment[constraint.pk.name]
-                for pk_v in pk_block:
-                    if pk_v not in pks:
-                        pks[pk_v] = set(pk_v.get_vector(1))
-
             keys = [constraint.pk, constraint.fk]
 
             def test_foreign_key(pk_v, fk_v):
+                codes = to_codes(pk_v, fk_v)
+                if codes is not None:
+                    pk_codes, fk_codes = codes
+                    return bool(numpy.all(pk_v.dictionary.isin(fk_codes[~fk_v.get_vector_blanks(1)], pk_codes)))
+
+                if pk_v not in pks:
+                    pks[pk_v] = set(pk_v.get_vector(1))
                 blank_f = blank_filter(fk_v.data)[1]
                 fk = fk_v.get_vector(1)
                 pk_set = pks[pk_v]
@@ -163,7 +168,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         return False
                 return True
 
-            return self._generate_test_vectors(assignments, keys, test_foreign_key)
+            return self._generate_test_vectors(assignments, keys, test_foreign_key, solutions)
 
         def lookups(c: Lookup, assignments, solutions):
             # TODO redundant lookups
@@ -181,16 +186,49 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         return False
                 return True
 
+            def is_encoded_lookup(pk_v, pv_v, fk_v, fv_v):
+                # Keys are matched as dictionary codes, the value of the last occurrence of a key is used
+                pk_codes, fk_codes = to_codes(pk_v, fk_v)
+                if len(fk_codes) != len(fv_v.get_vector(1)):
+                    print("Unexpected case (differing lengths)")
+                    return False
+                unique, last = numpy.unique(pk_codes[::-1], return_index=True)
+                last = len(pk_codes) - 1 - last
+                positions = numpy.minimum(numpy.searchsorted(unique, fk_codes), len(unique) - 1)
+                missing = unique[positions] != fk_codes
+
+                value_codes = to_codes(pv_v, fv_v)
+                if value_codes is not None:
+                    reference, values = value_codes[0][last[positions]], value_codes[1]
+                else:
+                    reference, values = pv_v.get_vector(1)[last[positions]], fv_v.get_vector(1)
+                failed = missing | numpy.asarray(reference != values, dtype=bool)
+                if numpy.any(failed):
+                    if missing[numpy.argmax(failed)]:
+                        print("Unexpected case (key not present)")
+                    return False
+                return True
+
             for assignment in assignments:
-                pk, pv, fk, fv = [assignment[k.name] for k in [c.o_key, c.o_value, c.f_key, c.f_value]]
-                for pk_v, pv_v in itertools.product(pk, pv):
-                    if not pk_v.overlaps_with(pv_v):
-                        pk_dict = dict(zip(pk_v.get_vector(1), pv_v.get_vector(1)))
-                        for fk_v, fv_v in itertools.product(fk, fv):
-                            if not (found_equal(pk_v, fk_v, solutions) and found_equal(pv_v, fv_v, solutions))\
-                                    and not any(g1.overlaps_with(g2) for g1 in [pk_v, pv_v] for g2 in [fk_v, fv_v]) \
-                                    and not fk_v.overlaps_with(fv_v) \
-                                    and is_lookup(pk_dict, fk_v.get_vector(1), fv_v.get_vector(1)):
+                pk, pv, fk, fv = [list(assignment[k.name]) for k in [c.o_key, c.o_value, c.f_key, c.f_value]]
+                overlaps = solutions.overlaps
+                pk_pv, fk_fv = overlaps.matrix(pk, pv).tolist(), overlaps.matrix(fk, fv).tolist()
+                pk_fk, pk_fv = overlaps.matrix(pk, fk).tolist(), overlaps.matrix(pk, fv).tolist()
+                pv_fk, pv_fv = overlaps.matrix(pv, fk).tolist(), overlaps.matrix(pv, fv).tolist()
+                for (i, pk_v), (j, pv_v) in itertools.product(enumerate(pk), enumerate(pv)):
+                    if not pk_pv[i][j]:
+                        pk_dict = None
+                        for (k, fk_v), (l, fv_v) in itertools.product(enumerate(fk), enumerate(fv)):
+                            if pk_fk[i][k] or pk_fv[i][l] or pv_fk[j][k] or pv_fv[j][l] or fk_fv[k][l] \
+                                    or (found_equal(pk_v, fk_v, solutions) and found_equal(pv_v, fv_v, solutions)):
+                                continue
+                            if to_codes(pk_v, fk_v) is not None:
+                                found = is_encoded_lookup(pk_v, pv_v, fk_v, fv_v)
+                            else:
+                                if pk_dict is None:
+                                    pk_dict = dict(zip(pk_v.get_vector(1), pv_v.get_vector(1)))
+                                found = is_lookup(pk_dict, fk_v.get_vector(1), fv_v.get_vector(1))
+                            if found:
                                 result = {c.o_key: pk_v, c.o_value: pv_v, c.f_key: fk_v, c.f_value: fv_v}
                                 results.append({k.name: v for k, v in result.items()})
             return results
@@ -222,7 +260,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         return False
                 return not exact and not found_equal(ok_v, fk_v, solutions) and not found_equal(ov_v, fv_v, solutions)
 
-            return self._generate_test_vectors(assignments, keys, test_equal)
+            return self._generate_test_vectors(assignments, keys, test_equal, solutions)
 
         def conditional_aggregate(c: ConditionalAggregate, assignments, solutions: Solutions):
             partial_cache = dict()
@@ -241,7 +279,11 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     for fk_v in fk_block:
                         key = frozenset({ok_v, fk_v})
                         if key not in overlap:
-                            overlap[key] = len(set(ok_v.get_vector(1)) & set(fk_v.get_vector(1))) > 0
+                            codes = to_codes(ok_v, fk_v)
+                            if codes is not None:
+                                overlap[key] = len(numpy.intersect1d(*codes)) > 0
+                            else:
+                                overlap[key] = len(set(ok_v.get_vector(1)) & set(fk_v.get_vector(1))) > 0
                         if overlap[key]:
                             candidate = True
 
@@ -255,18 +297,25 @@ class InternalSolvingStrategy(DictSolvingStrategy):
             else:
                 keys = [c.o_key, c.f_key, c.values, c.result]
 
+            foreign_key, lookup = ForeignKey.instance(), Lookup.instance()
+
             def is_aggregate(ok, fk, v, r=None):
                 if not overlap[frozenset({ok, fk})]:
                     return False
 
-                foreign_key = ForeignKey()
                 if solutions.has(foreign_key, [foreign_key.fk, foreign_key.pk], [ok, fk]):
                     return False
 
                 if r is None:
                     vectors = {g: g.get_vector(1) for g in [ok, fk, v]}
                     r = "?"
-                    vectors[r] = evaluate.evaluate_template(c, {k: assignment[k.name].get_vector(1) for k in keys}).flatten()
+                    # The virtual result is computed from the candidate vectors themselves, foreign keys that are
+                    # missing from the original keys make the candidate invalid
+                    try:
+                        vectors[r] = evaluate.evaluate_template(c, {k: vectors[g] for k, g in zip(keys, [ok, fk, v])})
+                    except evaluate.InvalidArguments:
+                        return False
+                    vectors[r] = vectors[r].flatten()
 
                 else:
                     if solutions.has(foreign_key, [foreign_key.fk, foreign_key.pk], [r, v]):
@@ -275,25 +324,29 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     vectors = {g: g.get_vector(1) for g in [ok, r, fk, v]}
 
                 for g in [ok, r, v]:
-                    # FIXME avoid all call
                     if g not in partial_cache:
-                        partial_cache[g] = all(numpy.vectorize(blank_filter(vectors[g])[1])(vectors[g]))
+                        blanks = g.get_vector_blanks(1) if isinstance(g, Group) else blank_mask(vectors[g])
+                        partial_cache[g] = not numpy.any(blanks)
                     if not partial_cache[g]:
                         return False
 
-                if fk not in fk_dict:
-                    filtered = vectors[fk][blank_filter(vectors[fk], True)[1](vectors[fk])]
-                    unique = set(filtered)
-                    masks = {u: vectors[fk] == u for u in unique}
-                    fk_dict[fk] = masks
+                # Keys are matched as dictionary codes if both key vectors are textual
+                codes = to_codes(ok, fk)
+                ok_keys, fk_keys = codes if codes is not None else (vectors[ok], vectors[fk])
+                if (fk, codes is not None) not in fk_dict:
+                    filtered = fk_keys[~blank_mask(vectors[fk])]
+                    unique = numpy.unique(filtered) if codes is not None else set(filtered)
+                    masks = {u: fk_keys == u for u in unique}
+                    fk_dict[(fk, codes is not None)] = masks
+                masks = fk_dict[(fk, codes is not None)]
 
                 any_match = False
                 for i in range(len(vectors[ok])):
-                    if vectors[ok][i] not in fk_dict[fk]:
+                    if ok_keys[i] not in masks:
                         res = c.default
                     else:
-                        k = vectors[ok][i]
-                        data = vectors[v][fk_dict[fk][k]]
+                        k = ok_keys[i]
+                        data = vectors[v][masks[k]]
                         res = c.operation.aggregate(data) if len(data) > 0 else c.default
                         any_match = True
 
@@ -302,13 +355,12 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     if not equal(res, vectors[r][i]):
                         return False
 
-                    lookup = Lookup()
                     if solutions.has(lookup, [lookup.f_value, lookup.f_key, lookup.o_key, lookup.o_value],
                                      [fk, v, r, ok]):
                         return False
                 return any_match
 
-            return self._generate_test_vectors(assignments, keys, is_aggregate)
+            return self._generate_test_vectors(assignments, keys, is_aggregate, solutions)
 
         def running_total(c: RunningTotal, assignments, solutions):
             def is_running_diff(acc_v, pos_v, neg_v):
@@ -322,7 +374,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     return False
                 return True
 
-            return self._generate_test_vectors(assignments, [c.acc, c.pos, c.neg], is_running_diff)
+            return self._generate_test_vectors(assignments, [c.acc, c.pos, c.neg], is_running_diff, solutions)
 
         def foreign_operation(c: ForeignOperation, assignments, solutions):
             keys = [c.o_key, c.f_key, c.result, c.o_value, c.f_value]
@@ -335,12 +387,12 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         return False
                 return True
 
-            return self._generate_test_vectors(assignments, keys, is_foreign_product)
+            return self._generate_test_vectors(assignments, keys, is_foreign_product, solutions)
 
         def aggregate(c: Aggregate, assignments: List[Dict[str, Group]], solutions: Solutions):
             results = []
             o_column = Orientation.column(c.orientation)
-            projection = Projection()
+            projection = Projection.instance()
 
             def add(solution):
                 mapping = {c.x: projection.projected, c.y: projection.result}
@@ -417,7 +469,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                 # cache.add((r_v, o1_v, o2_v))
                 return True
 
-            return self._generate_test_vectors(assignments, keys, is_product)
+            return self._generate_test_vectors(assignments, keys, is_product, solutions)
 
         def diff(c: Diff, assignments, solutions):
             def is_diff(r_v, o1_v, o2_v):
@@ -431,7 +483,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                 return all(not equal_v(v, 0).all() for v in (r, o1, o2))
 
             keys = [c.result, c.first, c.second]
-            return self._generate_test_vectors(assignments, keys, is_diff)
+            return self._generate_test_vectors(assignments, keys, is_diff, solutions)
 
         def percent_diff(c: PercentualDiff, assignments, solutions):
 
@@ -450,7 +502,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                 return True
 
             keys = [c.result, c.first, c.second]
-            return self._generate_test_vectors(assignments, keys, is_diff)
+            return self._generate_test_vectors(assignments, keys, is_diff, solutions)
 
         def sum_product(c: Product, assignments, solutions):
             keys = [c.result, c.first, c.second]
@@ -464,7 +516,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                 # TODO too many vector operations (easy)
                 return equal_v(r, numpy.sum(numpy.vectorize(Operation.PRODUCT.func)(o1, o2))).all()
 
-            return self._generate_test_vectors(assignments, keys, is_sum_product)
+            return self._generate_test_vectors(assignments, keys, is_sum_product, solutions)
 
         def project(c: Projection, assignments, _):
             solutions = []
@@ -498,7 +550,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         max_range.find(0, p_group.vectors(), size)
             return solutions
 
-        def equality(c: Equal, assignments, _):
+        def equality(c: Equal, assignments, solutions):
             equal_map = dict()
 
             def test(x_v, y_v):
@@ -526,7 +578,7 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                     equal_map[y_v] = x_v
                 return True
 
-            return self._generate_test_vectors(assignments, [c.first, c.second], test)
+            return self._generate_test_vectors(assignments, [c.first, c.second], test, solutions)
 
         def equal_group(c: EqualGroup, assignments, solutions: Solutions):
             result = []
@@ -552,10 +604,10 @@ class InternalSolvingStrategy(DictSolvingStrategy):
                         return False
                 return True
 
-            return self._generate_test_vectors(assignments, [c.x], test_ordering)
+            return self._generate_test_vectors(assignments, [c.x], test_ordering, solutions)
 
         def xor_vector(c: MutualExclusiveVector, assignments, solutions):
-            return self._generate_test_vectors(assignments, [c.x], lambda xb: c.test_data(*to_data(xb)))
+            return self._generate_test_vectors(assignments, [c.x], lambda xb: c.test_data(*to_data(xb)), solutions)
 
         def xor(c, assignments, solutions):
             result = []
@@ -582,52 +634,54 @@ class InternalSolvingStrategy(DictSolvingStrategy):
             results = []
 
             for assignment in assignments:
-                pk, pv, fk = [assignment[k.name] for k in [Lookup.o_key, Lookup.o_value, Lookup.f_key]]
-                for pk_v, pv_v in itertools.product(pk, pv):
-                    if not pk_v.overlaps_with(pv_v):
-                        for fk_v in fk:
-                            if not found_equal(pk_v, fk_v, solutions)\
-                                    and not any(g1.overlaps_with(g2) for g1 in [pk_v, pv_v] for g2 in [fk_v]):
+                pk, pv, fk = [list(assignment[k.name]) for k in [Lookup.o_key, Lookup.o_value, Lookup.f_key]]
+                overlaps = solutions.overlaps
+                pk_pv, pk_fk, pv_fk = (overlaps.matrix(g1, g2).tolist() for g1, g2 in [(pk, pv), (pk, fk), (pv, fk)])
+                for (i, pk_v), (j, pv_v) in itertools.product(enumerate(pk), enumerate(pv)):
+                    if not pk_pv[i][j]:
+                        for k, fk_v in enumerate(fk):
+                            if not pk_fk[i][k] and not pv_fk[j][k] and not found_equal(pk_v, fk_v, solutions):
                                 result = {Lookup.o_key: pk_v, Lookup.o_value: pv_v, Lookup.f_key: fk_v}
                                 results.append({k.name: v for k, v in result.items()})
 
             return results
 
-        self.add_strategy(Equal(), equality)
-        self.add_strategy(EqualGroup(), equal_group)
-        self.add_strategy(Series(), series)
-        self.add_strategy(AllDifferent(), all_different)
-        self.add_strategy(Permutation(), permutation)
-        self.add_strategy(Rank(), rank)
-        self.add_strategy(ForeignKey(), foreign_keys)
-        self.add_strategy(VirtualLookup(), virtual_lookups)
-        self.add_strategy(Lookup(), lookups)
-        self.add_strategy(FuzzyLookup(), fuzzy_lookup)
+        self.add_strategy(Equal.instance(), equality)
+        self.add_strategy(EqualGroup.instance(), equal_group)
+        self.add_strategy(Series.instance(), series)
+        self.add_strategy(AllDifferent.instance(), all_different)
+        self.add_strategy(Permutation.instance(), permutation)
+        self.add_strategy(Rank.instance(), rank)
+        self.add_strategy(ForeignKey.instance(), foreign_keys)
+        self.add_strategy(VirtualLookup.instance(), virtual_lookups)
+        self.add_strategy(Lookup.instance(), lookups)
+        self.add_strategy(FuzzyLookup.instance(), fuzzy_lookup)
         for c_instance in ConditionalAggregate.instances():
             self.add_strategy(c_instance, conditional_aggregate)
         for c_instance in VirtualConditionalAggregate.instances():
             self.add_strategy(c_instance, conditional_aggregate)
-        self.add_strategy(RunningTotal(), running_total)
-        self.add_strategy(ForeignProduct(), foreign_operation)
-        self.add_strategy(Projection(), project)
+        self.add_strategy(RunningTotal.instance(), running_total)
+        self.add_strategy(ForeignProduct.instance(), foreign_operation)
+        self.add_strategy(Projection.instance(), project)
         for c_instance in Aggregate.instances():
             self.add_strategy(c_instance, aggregate)
-        self.add_strategy(Product(), product)
-        self.add_strategy(Diff(), diff)
-        self.add_strategy(PercentualDiff(), percent_diff)
-        self.add_strategy(SumProduct(), sum_product)
-        self.add_strategy(Ordered(), ordered_constraint)
-        self.add_strategy(MutualExclusivity(), xor)
-        self.add_strategy(MutualExclusiveVector(), xor_vector)
+        self.add_strategy(Product.instance(), product)
+        self.add_strategy(Diff.instance(), diff)
+        self.add_strategy(PercentualDiff.instance(), percent_diff)
+        self.add_strategy(SumProduct.instance(), sum_product)
+        self.add_strategy(Ordered.instance(), ordered_constraint)
+        self.add_strategy(MutualExclusivity.instance(), xor)
+        self.add_strategy(MutualExclusiveVector.instance(), xor_vector)
 
     @staticmethod
-    def _generate_test_vectors(assignments, keys, test_groups):
+    def _generate_test_vectors(assignments, keys, test_groups, solutions):
         # FIXME Improve code by avoiding to test overlapping subgroups multiple times
+        names = [k.name for k in keys]
         for assignment in assignments:
-            for vectors in itertools.product(*[assignment[k.name] for k in keys]):
-                if not any(g1.overlaps_with(g2) for g1, g2 in itertools.combinations(vectors, 2)) \
-                        and (test_groups is None or test_groups(*vectors)):
-                    yield dict(zip([k.name for k in keys], vectors))
+            # Combinations of overlapping vectors are filtered per assignment using the overlap index of the task
+            for vectors in solutions.overlaps.disjoint_product([assignment[name] for name in names]):
+                if test_groups is None or test_groups(*vectors):
+                    yield dict(zip(names, vectors))
 
 
 def rank_data(a):
@@ -657,7 +711,7 @@ def equal(x, y, scale=False):
         return x == y
 
 
-@functools.lru_cache(maxsize=None)
+@cached("precision_and_scale")
 def precision_and_scale(x):
     max_digits = 14
     int_part = int(abs(x))
@@ -708,7 +762,7 @@ def to_vector_groups(*args):
 def equal_groups(solutions, solution):
     vector_set = to_vector_groups(*solution.values())
     sols = itertools.combinations(sorted(vector_set), 2)
-    equal_c = Equal()
+    equal_c = Equal.instance()
     sols = [{equal_c.first.name: v1, equal_c.second.name: v2} for (v1, v2) in sols]
     return all(solutions.has_solution(equal_c, sol) for sol in sols)
 
@@ -721,6 +775,18 @@ def to_data(*args):
             yield arg.vector_data[0]
 
 
+def to_codes(*args):
+    """
+    Returns the dictionary codes of the (first) vectors of the given groups if they are all textual and share a
+    dictionary (such that equal codes mean equal values), and None otherwise
+    """
+    if not all(isinstance(arg, Group) and arg.is_textual() and arg.dictionary is not None for arg in args):
+        return None
+    if any(arg.dictionary is not args[0].dictionary for arg in args):
+        return None
+    return [arg.get_vector_codes(1) for arg in args]
+
+
 def complete(vector):
     _, blank_f = blank_filter(vector)
     if not blank_f(vector[0]):
@@ -732,6 +798,6 @@ def complete(vector):
 
 
 def found_equal(v1, v2, solutions):
-    eq = Equal()
+    eq = Equal.instance()
     keys = [eq.first, eq.second]
     return solutions.has(eq, keys, (v1, v2)) if v1 < v2 else solutions.has(eq, keys, (v2, v1))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from .indexing import Typing, Orientation, Range, Table, TypeSummary
+
+
+def type_column(values):
+    """
+    Types a column using its dtype.  Integer and float columns are used as they are (NaN values are blank cells),
+    boolean columns become integer columns, datetime and timedelta columns are converted to text and the cells of all
+    other columns are typed and cast individually (columns of mixed types are textual, columns without values are
+    blank).
+    :param values: A one-dimensional array
+    :return: A tuple (codes, cells, vector) of the type codes, the cell values and the typed vector data
+    """
+    kind = values.dtype.kind
+    if kind in "iu":
+        return np.full(len(values), Typing.codes[Typing.int], dtype=np.int8), values, values
+    if kind == "b":
+        values = values.astype(np.int64)
+        return np.full(len(values), Typing.codes[Typing.int], dtype=np.int8), values, values
+    if kind == "f":
+        codes = np.where(np.isnan(values), Typing.codes[Typing.any], Typing.codes[Typing.float]).astype(np.int8)
+        return codes, values, values
+
+    if kind in "Mm":
+        # Dates and durations would otherwise become integer nanoseconds, their cells are textual instead
+        missing = np.isnat(values)
+        values = np.asarray(pd.Series(values).astype(str), dtype=object)
+        values[missing] = ""
+    cells = np.array(values, dtype=object)
+    cells[np.asarray(pd.isna(cells), dtype=bool)] = ""
+    codes = Typing.detect_codes(cells)
+    cell_type = Typing.max(codes)
+    if cell_type == Typing.any:
+        # Blank columns have no vector data to cast, their cells stay blank
+        return codes, cells, cells
+    if cell_type is None:
+        # Cells without a common type (e.g., strings and integers) are textual
+        cell_type = Typing.string
+        codes = np.where(codes == Typing.codes[Typing.any], codes, Typing.codes[Typing.string]).astype(np.int8)
+    return codes, cells, Typing.cast_cells(cell_type, cells)
+
+
+def table_from_columns(columns, name="T1"):
+    """
+    Builds a table from typed columns without converting them to strings
+    :param columns: A pandas DataFrame or a dictionary mapping column names to one-dimensional arrays
+    :param name: The name of the table
+    :return: The table, integer and float columns are the vector data of the vertical blocks without being copied
+    (horizontal blocks are built from the cells, their vectors are copies)
+    """
+    items = list(columns.items())
+    if len(items) == 0:
+        raise ValueError("Cannot build a table without columns")
+    typed = [type_column(np.asarray(column)) for _, column in items]
+    rows = len(typed[0][1])
+    if any(len(cells) != rows for _, cells, _ in typed):
+        raise ValueError("Columns have different lengths: {}".format([len(cells) for _, cells, _ in typed]))
+
+    data = np.empty((rows, len(typed)), dtype=object)
+    type_data = np.empty((rows, len(typed)), dtype=np.int8)
+    for i, (codes, cells, _) in enumerate(typed):
+        data[:, i] = cells
+        type_data[:, i] = codes
+
+    t_range = Range(0, 0, len(typed), rows)
+    summary = TypeSummary(type_data)
+    orientations = summary.orientations()
+    if len(orientations) == 0:
+        raise ValueError("The columns do not form a table in any orientation")
+    return Table(data, type_data, t_range, name, orientations,
+                 vectors={Orientation.vertical: [vector for _, _, vector in typed]}, summary=summary)
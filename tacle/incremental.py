@@ -0,0 +1,113 @@
+import numpy as np
+
+from .convert import build_table
+from .core.group import StringDictionary
+from .detect import get_type_data, label_ranges_with_origins, remove_headers, large_enough
+from .indexing import Typing, Range
+
+
+def _overlaps(range1, range2, margin=0):
+    return range1.x0 < range2.x1 + margin and range2.x0 < range1.x1 + margin \
+        and range1.y0 < range2.y1 + margin and range2.y0 < range1.y1 + margin
+
+
+class IncrementalSheet(object):
+    """
+    Table detection for a sheet that is edited a few cells at a time.  The sheet keeps the typed grid and the ranges
+    of occupied cells found by the previous detection.  Edits only re-type the changed cells and only re-detect the
+    region around them, which grows until it contains every previous range it touches.  Ranges that do not touch
+    that region are unaffected by the edits, so the result equals detecting the tables of the whole edited sheet.
+    """
+
+    def __init__(self, data, type_data=None, orientation=None, min_cells=None, min_rows=None, min_columns=None):
+        """
+        :param data: The cells of the sheet
+        :param type_data: Optional type codes of the cells, they are detected if not given
+        :param orientation: The allowed table orientation (None allows both orientations)
+        """
+        self.data = np.array(data, dtype=object)
+        if type_data is None:
+            self.type_data = get_type_data(self.data)
+        else:
+            self.type_data = np.array(Typing.encode(type_data), dtype=np.int8)
+        self.orientation = orientation
+        self.options = dict(min_cells=min_cells, min_rows=min_rows, min_columns=min_columns)
+        # (origin, range, table range) of every range of occupied cells, ordered by origin
+        self.ranges = self._detect(Range(0, 0, np.size(self.data, 1), np.size(self.data, 0)))
+        self._tables = dict()
+        self.dictionary = StringDictionary()
+
+    def _detect(self, region):
+        occupied = region.get_data(self.type_data) != Typing.codes[Typing.any]
+        detected = []
+        for t_range, (row, column) in zip(*label_ranges_with_origins(occupied)):
+            t_range = region.relative_to_absolute(t_range)
+            detected.append(((region.y0 + row, region.x0 + column), t_range,
+                             remove_headers(t_range, t_range.get_data(self.type_data), self.orientation)))
+        return detected
+
+    @property
+    def table_ranges(self):
+        """
+        The table ranges of the sheet, equal to detect.detect_table_ranges on the current type data
+        """
+        return [table_range for _, _, table_range in self.ranges if large_enough(table_range, **self.options)]
+
+    def update(self, changes):
+        """
+        Edits cells and re-detects the ranges affected by the edits
+        :param changes: A dictionary (or an iterable of pairs) mapping (row, column) cells to their new values, the
+        sheet grows if cells lie outside of it
+        :return: The region that was re-detected (None if there were no changes)
+        """
+        changes = dict(changes)
+        if len(changes) == 0:
+            return None
+        cells = np.array(list(changes.keys()), dtype=int).reshape(-1, 2)
+        if np.any(cells < 0):
+            raise ValueError("Invalid cells {}".format(cells[np.any(cells < 0, axis=1)].tolist()))
+        rows, columns = cells[:, 0], cells[:, 1]
+        self._grow(int(rows.max()) + 1, int(columns.max()) + 1)
+
+        values = np.empty(len(changes), dtype=object)
+        values[:] = list(changes.values())
+        self.data[rows, columns] = values
+        self.type_data[rows, columns] = Typing.detect_codes(values)
+
+        region = Range.from_coordinates(int(columns.min()), int(rows.min()), int(columns.max()) + 1,
+                                        int(rows.max()) + 1)
+        unaffected = self.ranges
+        while True:
+            touching = [entry for entry in unaffected if _overlaps(entry[1], region, margin=1)]
+            if len(touching) == 0:
+                break
+            unaffected = [entry for entry in unaffected if not _overlaps(entry[1], region, margin=1)]
+            for _, t_range, _ in touching:
+                region = region.bounding_box(t_range)
+
+        self.ranges = sorted(unaffected + self._detect(region), key=lambda entry: entry[0])
+        self._tables = {key: table for key, table in self._tables.items() if not _overlaps(key[1], region)}
+        return region
+
+    def _grow(self, rows, columns):
+        pad_rows, pad_columns = max(0, rows - np.size(self.data, 0)), max(0, columns - np.size(self.data, 1))
+        if pad_rows > 0 or pad_columns > 0:
+            padding = ((0, pad_rows), (0, pad_columns))
+            self.data = np.pad(self.data, padding, constant_values="")
+            self.type_data = np.pad(self.type_data, padding, constant_values=Typing.codes[Typing.any])
+
+    def tables(self):
+        """
+        Builds the tables of the sheet, tables whose range was not re-detected since they were last built are reused
+        :return: The same tables as convert.get_tables for the current table ranges
+        """
+        tables = dict()
+        for i, table_range in enumerate(self.table_ranges):
+            key = ("T{}".format(i + 1), table_range)
+            if key in self._tables:
+                tables[key] = self._tables[key]
+            else:
+                tables[key] = build_table(key[0], table_range.get_data(self.data),
+                                          table_range.get_data(self.type_data), table_range, self.dictionary)
+        self._tables = tables
+        return [table for table in tables.values() if table is not None]
@@ -1,9 +1,11 @@
 import re
+import sys
 from typing import Optional, Union, List
 
 import numpy as np
 
 from tacle.core import group
+from tacle.util.cache import LRUCache
 
 
 class Typing(object):
@@ -22,25 +24,76 @@ class Typing(object):
     currency_symbols = re.compile(r"[$€£]")
     place_holder = re.compile(r"[\s,]")
     nested_index_pattern = re.compile(r"\d+\.\d+(\.\d+)")
+    type_pattern = re.compile("(?P<percentage>{})|(?P<currency>{})|(?P<nested_index>{})".format(
+        percent_pattern.pattern, currency_pattern.pattern, nested_index_pattern.pattern))
+
+    # Cell types in the order of their integer codes, type grids store these codes as int8 values
+    types = [any, unknown, int, float, numeric, currency, percentage, string, nested_index]
+    codes = dict(zip(types, range(len(types))))
+    # Code used for the absence of a common type (None)
+    none = len(types)
 
     @staticmethod
     def hierarchy():
         return {Typing.int: Typing.numeric, Typing.float: Typing.numeric, Typing.currency: Typing.float,
                 Typing.percentage: Typing.float, Typing.nested_index: Typing.string}
 
+    @staticmethod
+    def code(cell_type):
+        return Typing.none if cell_type is None else Typing.codes[cell_type]
+
+    @staticmethod
+    def encode(cell_types):
+        """
+        Converts cell types to their integer codes, arrays that are already integer-coded are returned as they are
+        :param cell_types: A (nested) sequence or array of cell types or type codes
+        :return: An int8 array of type codes with the same shape
+        """
+        cell_types = np.asarray(cell_types) if not isinstance(cell_types, np.ndarray) else cell_types
+        if np.issubdtype(cell_types.dtype, np.integer):
+            return cell_types.astype(np.int8, copy=False)
+        codes = np.fromiter((Typing.code(t) for t in cell_types.ravel()), dtype=np.int8, count=cell_types.size)
+        return codes.reshape(cell_types.shape)
+
+    @staticmethod
+    def decode(codes):
+        """
+        Converts type codes back to cell types
+        :param codes: A (nested) sequence or array of type codes
+        :return: An object array of cell types (None for the absence of a common type) with the same shape
+        """
+        return Typing.labels[np.asarray(codes)]
+
     @staticmethod
     def root(cell_type):
+        code = Typing.codes.get(cell_type)
+        return Typing._root(cell_type) if code is None else Typing.labels[Typing.root_table[code]]
+
+    @staticmethod
+    def _root(cell_type):
         hierarchy = Typing.hierarchy()
-        return Typing.root(hierarchy[cell_type]) if cell_type in hierarchy else cell_type
+        return Typing._root(hierarchy[cell_type]) if cell_type in hierarchy else cell_type
 
     @staticmethod
     def soft_root(cell_type):
+        code = Typing.codes.get(cell_type)
+        return Typing._soft_root(cell_type) if code is None else Typing.labels[Typing.soft_root_table[code]]
+
+    @staticmethod
+    def _soft_root(cell_type):
         hierarchy = Typing.hierarchy()
-        return Typing.soft_root(hierarchy[cell_type]) if cell_type not in [Typing.int, Typing.string, Typing.float]\
+        return Typing._soft_root(hierarchy[cell_type]) if cell_type not in [Typing.int, Typing.string, Typing.float]\
             and cell_type in hierarchy else cell_type
 
     @staticmethod
     def lowest_common_ancestor(cell_type1, cell_type2):
+        code1, code2 = Typing.codes.get(cell_type1), Typing.codes.get(cell_type2)
+        if code1 is None or code2 is None:
+            return Typing._lowest_common_ancestor(cell_type1, cell_type2)
+        return Typing.labels[Typing.lca_table[code1, code2]]
+
+    @staticmethod
+    def _lowest_common_ancestor(cell_type1, cell_type2):
         if cell_type1 == cell_type2:
             return cell_type1
         if cell_type1 is None or cell_type2 is None:
@@ -49,8 +102,8 @@ class Typing(object):
             return cell_type2 if cell_type2 != Typing.int else Typing.float
         if cell_type2 == Typing.any or cell_type2 == Typing.unknown:
             return cell_type1 if cell_type1 != Typing.int else Typing.float
-        if Typing.root(cell_type1) == Typing.numeric and cell_type2 == Typing.nested_index or\
-                cell_type1 == Typing.nested_index and Typing.root(cell_type2) == Typing.numeric:
+        if Typing._root(cell_type1) == Typing.numeric and cell_type2 == Typing.nested_index or\
+                cell_type1 == Typing.nested_index and Typing._root(cell_type2) == Typing.numeric:
             return Typing.nested_index
 
         hierarchy = Typing.hierarchy()
@@ -77,10 +130,36 @@ class Typing(object):
     def max(cell_types):
         if isinstance(cell_types, np.ndarray):
             cell_types = cell_types.flatten()
-        super_type = cell_types[0]
-        for cell_type in cell_types[1:]:
-            super_type = Typing.lowest_common_ancestor(super_type, cell_type)
-        return super_type
+        return Typing.labels[Typing.max_codes(Typing.encode(cell_types))]
+
+    @staticmethod
+    def max_codes(codes, axis=-1):
+        """
+        Computes Typing.max along an axis of a type code array.  The result equals folding lowest_common_ancestor over
+        the elements from first to last.  Since that fold is not associative on the type values themselves, every
+        element is represented by its transition (a row of the lowest common ancestor table) and the transitions are
+        composed pairwise, which takes a logarithmic number of vectorized steps.
+        :param codes: An array of type codes (or cell types)
+        :param axis: The axis to reduce
+        :return: An int8 array of type codes with the axis removed
+        """
+        codes = np.moveaxis(Typing.encode(codes), axis, -1)
+        if codes.shape[-1] == 0:
+            raise ValueError("Cannot compute the maximal type of an empty vector")
+
+        # transitions[..., i, s] is the state after combining state s with element i + 1
+        transitions = Typing.lca_table.T[codes[..., 1:]]
+        while transitions.shape[-2] > 1:
+            carry = transitions[..., -1:, :] if transitions.shape[-2] % 2 == 1 else None
+            first, second = transitions[..., 0:-1:2, :], transitions[..., 1::2, :]
+            transitions = np.take_along_axis(second, first, axis=-1)
+            if carry is not None:
+                transitions = np.concatenate((transitions, carry), axis=-2)
+
+        state = codes[..., 0]
+        if transitions.shape[-2] == 1:
+            state = np.take_along_axis(transitions[..., 0, :], state[..., np.newaxis], axis=-1)[..., 0]
+        return state
 
     @staticmethod
     def blank_detector(cell_type):
@@ -102,18 +181,18 @@ class Typing(object):
             return Typing.int
         elif isinstance(value, float):
             return Typing.float
+        return Typing.detect_string_type(str(value))
 
-        value = str(value)
+    @staticmethod
+    def detect_string_type(value):
         if value == "":
             return Typing.any
         if value == "#?":
             return Typing.unknown
-        elif re.match(Typing.percent_pattern, value):
-            return Typing.percentage
-        elif re.match(Typing.currency_pattern, value):
-            return Typing.currency
-        elif re.match(Typing.nested_index_pattern, value):
-            return Typing.nested_index
+
+        match = Typing.type_pattern.match(value)
+        if match is not None:
+            return match.lastgroup
 
         try:
             value = float(value.replace(",", ""))
@@ -123,9 +202,52 @@ class Typing(object):
         except ValueError:
             return Typing.string
 
+    @staticmethod
+    def detect_types(data):
+        """
+        Detects the types of all cells at once (see detect_codes)
+        :param data: A (nested) sequence or array of cell values
+        :return: An object array with the same shape as data containing the type of every cell
+        """
+        return Typing.decode(Typing.detect_codes(data))
+
+    @staticmethod
+    def detect_codes(data):
+        """
+        Detects the type codes of all cells at once.  Numbers are typed using their Python type, all other cells are
+        converted to strings and every distinct string is only classified once.
+        :param data: A (nested) sequence or array of cell values
+        :return: An int8 array with the same shape as data containing the type code of every cell
+        """
+        data = np.array(data, dtype=object)
+        flat = data.ravel()
+        types = np.empty(flat.shape, dtype=np.int8)
+
+        texts = flat
+        is_text = np.ones(flat.shape, dtype=bool)
+        others = np.flatnonzero(np.frompyfunc(type, 1, 1)(flat) != str)
+        if len(others) > 0:
+            values = flat[others]
+            is_instance = np.frompyfunc(isinstance, 2, 1)
+            ints = is_instance(values, int).astype(bool)
+            floats = is_instance(values, float).astype(bool) & ~ints
+            types[others[ints]] = Typing.codes[Typing.int]
+            types[others[floats]] = Typing.codes[Typing.float]
+            is_text[others[ints | floats]] = False
+            texts = flat.copy()
+            others = others[~(ints | floats)]
+            texts[others] = np.frompyfunc(str, 1, 1)(flat[others])
+
+        texts = texts[is_text]
+        distinct = dict()
+        codes = np.fromiter((distinct.setdefault(text, len(distinct)) for text in texts), dtype=int, count=len(texts))
+        distinct_types = np.array([Typing.codes[type_cache.detect_type(text)] for text in distinct], dtype=np.int8)
+        types[is_text] = distinct_types[codes]
+        return types.reshape(data.shape)
+
     @staticmethod
     def cast(cell_type, value):
-        original_cell_type = Typing.detect_type(value)
+        original_cell_type = type_cache.detect_type(value)
         if original_cell_type != cell_type and original_cell_type != Typing.any:
             value = Typing.cast(original_cell_type, value)
 
@@ -157,6 +279,61 @@ class Typing(object):
             return "#?"
         raise ValueError("Unexpected cell type: " + cell_type)
 
+    @staticmethod
+    def cast_cells(cell_type, values):
+        """
+        Casts all cell values to the given type at once, every distinct value is only cast once
+        :param cell_type: The type to cast to
+        :param values: A (nested) sequence or array of cell values
+        :return: An array with the same shape as values (int64, float64 or unicode, depending on the type)
+        """
+        values = np.asarray(values, dtype=object)
+        distinct = dict()
+        codes = np.fromiter((distinct.setdefault((type(v), v), len(distinct)) for v in values.ravel()),
+                            dtype=int, count=values.size)
+        cast_values = np.array([type_cache.cast(cell_type, v) for _, v in distinct])
+        return cast_values[codes].reshape(values.shape)
+
+    @staticmethod
+    def detect_and_cast(data):
+        """
+        Detects the type of every cell and casts it to that type in a single pass over the distinct cell values
+        :param data: A (nested) sequence or array of cell values
+        :return: A tuple (type_data, cast_data) of an int8 array of type codes and an object array of cast values
+        (blank cells become None)
+        """
+        data = np.array(data, dtype=object)
+        distinct = dict()
+        codes = np.fromiter((distinct.setdefault((type(v), v), len(distinct)) for v in data.ravel()),
+                            dtype=int, count=data.size)
+        distinct_codes = np.empty(len(distinct), dtype=np.int8)
+        distinct_values = np.empty(len(distinct), dtype=object)
+        for i, (_, value) in enumerate(distinct):
+            cell_type = type_cache.detect_type(value)
+            distinct_codes[i] = Typing.codes[cell_type]
+            distinct_values[i] = type_cache.cast(cell_type, value) if cell_type != Typing.any else None
+        return distinct_codes[codes].reshape(data.shape), distinct_values[codes].reshape(data.shape)
+
+    @staticmethod
+    def cast_compatible(cell_type1, cell_type2):
+        """
+        Tests whether casting a cell to either type yields the same value (ignoring the difference between int and
+        float values)
+        """
+        families = [{Typing.string, Typing.nested_index},
+                    {Typing.int, Typing.float, Typing.numeric, Typing.currency, Typing.percentage}]
+        return cell_type1 == cell_type2 or any(cell_type1 in f and cell_type2 in f for f in families)
+
+    @staticmethod
+    def has_blanks(cell_type, values):
+        """
+        Tests whether cast values contain blanks (NaN for numeric types, None otherwise)
+        """
+        values = np.asarray(values)
+        if Typing.root(cell_type) == Typing.numeric:
+            return bool(np.any(np.isnan(values.astype(float, copy=False))))
+        return values.dtype == object and any(v is None for v in values.ravel())
+
     @staticmethod
     def as_legacy_type(cell_type):
         from tacle.core.group import GType
@@ -172,6 +349,85 @@ class Typing(object):
         raise ValueError("Cannot convert {}".format(cell_type))
 
 
+# Precomputed lattice tables, indexed by type codes (including the code Typing.none)
+Typing.labels = np.array(Typing.types + [None], dtype=object)
+Typing.lca_table = np.array([[Typing.code(Typing._lowest_common_ancestor(t1, t2)) for t2 in Typing.labels]
+                             for t1 in Typing.labels], dtype=np.int8)
+Typing.root_table = np.array([Typing.code(Typing._root(t)) for t in Typing.labels], dtype=np.int8)
+Typing.soft_root_table = np.array([Typing.code(Typing._soft_root(t)) for t in Typing.labels], dtype=np.int8)
+
+
+class TypeCache(object):
+    """
+    Bounded least-recently-used cache of the detected types and cast values of raw cell values.  Spreadsheets repeat
+    the same cell values a lot, so repeated values only cost a dictionary lookup.  The entries are kept in caches of
+    the global cache registry ("cell_types" and "cell_casts"), which also bounds and clears them.
+    """
+
+    entry_size = 200  # Estimated size (in bytes) of an entry: the key tuple, the raw cell value and the result
+
+    def __init__(self, max_size=2 ** 16):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._types = LRUCache("cell_types", sizeof=self._sizeof, max_entries=max_size)
+        self._casts = LRUCache("cell_casts", sizeof=self._sizeof, max_entries=max_size)
+
+    @classmethod
+    def _sizeof(cls, _value):
+        return cls.entry_size
+
+    def detect_type(self, value):
+        key = (type(value), value)
+        try:
+            cell_type = self._types.get(key)
+        except TypeError:
+            self.misses += 1
+            return Typing.detect_type(value)
+        if cell_type is None:
+            self.misses += 1
+            cell_type = self._types[key] = Typing.detect_type(value)
+        else:
+            self.hits += 1
+        return cell_type
+
+    def cast(self, cell_type, value):
+        key = (cell_type, type(value), value)
+        try:
+            cast_value = self._casts.get(key, _missing)
+        except TypeError:
+            self.misses += 1
+            return Typing.cast(cell_type, value)
+        if cast_value is _missing:
+            self.misses += 1
+            cast_value = self._casts[key] = Typing.cast(cell_type, value)
+        else:
+            self.hits += 1
+        return cast_value
+
+    @property
+    def size(self):
+        return len(self._types) + len(self._casts)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": self.size, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        self._types.clear()
+        self._casts.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_missing = object()
+type_cache = TypeCache()
+
+
 class Orientation(object):
     vertical = "vertical"
     horizontal = "horizontal"
@@ -195,6 +451,8 @@ class Orientation(object):
 
 
 class Range(object):
+    __slots__ = ("column", "row", "width", "height")
+
     def __init__(self, column, row, width, height):
         self.column = column
         self.row = row
@@ -329,11 +587,43 @@ class Range(object):
         return self.x0 == other.x0 and self.y0 == other.y0 and self.x1 == other.x1 and self.y1 == other.y1
 
 
+class TypeSummary(object):
+    """
+    Summary of the type grid of a table: the maximal type and the number of blank (any or unknown) cells of every
+    vector, in both orientations.  It is computed once per table and shared by orientation checking, block detection
+    and block construction.
+    """
+
+    def __init__(self, type_data):
+        type_data = Typing.encode(type_data)
+        blank = (type_data == Typing.codes[Typing.any]) | (type_data == Typing.codes[Typing.unknown])
+        self.max_codes = dict()
+        self.blank_counts = dict()
+        for orientation in Orientation.all():
+            axis = 0 if orientation == Orientation.vertical else 1
+            self.max_codes[orientation] = Typing.max_codes(type_data, axis)
+            self.blank_counts[orientation] = np.count_nonzero(blank, axis=axis)
+
+    def compatible(self, orientation):
+        """
+        Tests whether every vector in the given orientation has a maximal type
+        """
+        return not np.any(self.max_codes[orientation] == Typing.none)
+
+    def orientations(self):
+        return [o for o in Orientation.all() if self.compatible(o)]
+
+    def vector_types(self, orientation, start, count):
+        return list(Typing.decode(self.max_codes[orientation][start:start + count]))
+
+    def blanks(self, orientation, start, count):
+        return int(np.sum(self.blank_counts[orientation][start:start + count]))
+
+
 class DataSheet(object):
     def __init__(self, data):
         self.raw_data = data
-        self.type_data = np.vectorize(Typing.detect_type)(self.raw_data)
-        self.data = np.vectorize(Typing.cast)(self.type_data, self.raw_data)
+        self.type_data, self.data = Typing.detect_and_cast(self.raw_data)
 
     def columns(self):
         return np.size(self.data, 1)
@@ -343,7 +633,16 @@ class DataSheet(object):
 
 
 class Table(object):
-    def __init__(self, data, type_data, t_range, name=None, orientations=None):
+    def __init__(self, data, type_data, t_range, name=None, orientations=None, blocks=None, vectors=None,
+                 summary=None, dictionary=None):
+        """
+        :param blocks: Optional list of (relative range, orientation, vector types) tuples describing the blocks of
+        the table, the blocks are detected if they are not given
+        :param vectors: Optional dictionary mapping orientations to lists containing the already typed data of every
+        vector (in that orientation), these arrays are used as vector data of the blocks instead of casting the cells
+        :param summary: Optional TypeSummary of the type data, it is computed when it is first needed otherwise
+        :param dictionary: The StringDictionary shared by the tables of a sheet (a new dictionary is used if None)
+        """
         if any(orientation not in [None, Orientation.vertical, Orientation.horizontal] for orientation in orientations):
             raise ValueError("Invalid orientations {}".format(orientations))
 
@@ -361,9 +660,23 @@ class Table(object):
         self.type_data = type_data
         self.range = t_range  # type: Range
         self.orientations = orientations
+        self.vectors = vectors if vectors is not None else dict()
+        self._summary = summary
+        self.dictionary = dictionary if dictionary is not None else group.StringDictionary()
 
-        from tacle.convert import get_blocks
-        self.blocks = get_blocks(self)
+        if blocks is None:
+            from tacle.convert import get_blocks
+            self.blocks = get_blocks(self)
+        else:
+            self.blocks = [Block(self, b_range, orientation, list(vector_types))
+                           for b_range, orientation, vector_types in blocks]
+
+    @property
+    def summary(self):
+        # type: () -> TypeSummary
+        if self._summary is None:
+            self._summary = TypeSummary(self.type_data)
+        return self._summary
 
     @property
     def columns(self):
@@ -412,18 +725,25 @@ class Table(object):
         raise RuntimeError("Illegal state: {}, {}, {}".format(i, orientation, self))
 
     def copy(self):
-        return Table(self.data.copy(), self.type_data.copy(), self.range, self.name, self.orientations)
+        return Table(self.data.copy(), self.type_data.copy(), self.range, self.name, self.orientations,
+                     dictionary=self.dictionary)
+
+    def __setstate__(self, state):
+        # String hashes differ between processes, so blocks built in another process need to be hashed again
+        self.__dict__.update(state)
+        for block in self.blocks:
+            block.hash = hash((block.table, block.relative_range, block.orientation))
 
     def add_vector(self, vector_data, vector_types, orientation):
         data = self.data.copy()
-        type_data = self.type_data.copy()
+        type_data = Typing.encode(self.type_data).copy()
         if orientation not in self.orientations:
             raise ValueError("Unsupported orientation: {}".format(orientation))
         if orientation == Orientation.vertical:
             new_data = np.concatenate((data, vector_data[:, np.newaxis]), axis=1)
-            new_type_data = np.concatenate((type_data, vector_types[:, np.newaxis]), axis=1)
+            new_type_data = np.concatenate((type_data, Typing.encode(vector_types)[:, np.newaxis]), axis=1)
             new_range = Range(self.range.column, self.range.row, self.range.width + 1, self.range.height)
-            return Table(new_data, new_type_data, new_range, self.name, self.orientations)
+            return Table(new_data, new_type_data, new_range, self.name, self.orientations, dictionary=self.dictionary)
         raise ValueError("Horizontal orientation is not yet supported")
 
     def __repr__(self):
@@ -446,10 +766,14 @@ class Table(object):
 
 
 class Block(object):
-    def __init__(self, table, relative_range, orientation, vector_types=None, virtual=False):
+    __slots__ = ("table", "relative_range", "orientation", "virtual", "vector_types", "type", "_vector_data", "_data",
+                 "_has_blanks", "_codes", "_cache", "hash")
+
+    def __init__(self, table, relative_range, orientation, vector_types=None, virtual=False, vector_data=None):
         """
         :type table: Table
         :type relative_range: Range
+        :param vector_data: Optional list of arrays containing the data of every vector (cast to its vector type)
         """
         if orientation not in [Orientation.vertical, Orientation.horizontal]:
             raise ValueError("Invalid orientation {}".format(orientation))
@@ -460,31 +784,134 @@ class Block(object):
         self.virtual = virtual
 
         if virtual is False:
-            self.vector_types = [] if not vector_types else vector_types
-            self.vector_data = []
-            for i in range(relative_range.vector_count(orientation)):
-                if vector_types is None:
-                    v_type = Typing.max(relative_range.vector_range(i, orientation).get_data(table.type_data))
-                    self.vector_types.append(v_type)
+            spans_table = relative_range.vector_length(orientation) == table.range.vector_length(orientation)
+            if vector_types is None:
+                if spans_table:
+                    vector_types = table.summary.vector_types(orientation, relative_range.vector_index(orientation),
+                                                              relative_range.vector_count(orientation))
                 else:
-                    v_type = vector_types[i]
-
-                v_data = relative_range.vector_range(i, orientation).get_data(table.data)
-                self.vector_data.append(np.vectorize(lambda v: Typing.cast(v_type, v))(v_data.flatten()))
-
+                    axis = 0 if orientation == Orientation.vertical else 1
+                    vector_types = list(Typing.decode(Typing.max_codes(relative_range.get_data(table.type_data),
+                                                                       axis)))
+            self.vector_types = vector_types
             self.type = Typing.max(self.vector_types)
-            self.data = np.vectorize(lambda v: Typing.cast(self.type, v))(relative_range.get_data(table.data).flatten())
-            self.has_blanks = not np.all(np.vectorize(Typing.blank_detector(self.type))(self.data))
+
+            if vector_data is None and orientation in table.vectors:
+                start = relative_range.vector_index(orientation)
+                vector_data = table.vectors[orientation][start:start + relative_range.vector_count(orientation)]
+            self._vector_data = list(vector_data) if vector_data is not None else None
+            self._data = None
+
+            # Only blank cells are cast to blank values, so blocks without blank cells need not be scanned
+            self._has_blanks = None
+            if spans_table and table.summary.blanks(orientation, relative_range.vector_index(orientation),
+                                                    relative_range.vector_count(orientation)) == 0:
+                self._has_blanks = False
         else:
             v_type, blanks = virtual
             self.vector_types = [v_type]
             self.type = v_type
-            self.data = None
-            self.has_blanks = blanks
+            self._vector_data = None
+            self._data = None
+            self._has_blanks = blanks
 
-        self.cache = dict()
+        self._codes = None
+        self._cache = None
         self.hash = hash((self.table, self.relative_range, self.orientation))
 
+    @property
+    def vector_data(self):
+        """
+        The cast data of every vector, computed when it is first accessed
+        """
+        if self._vector_data is None:
+            self.materialize()
+        return self._vector_data
+
+    @property
+    def data(self):
+        """
+        The (row-major, flattened) cast data of the block, computed when it is first accessed
+        """
+        if self._data is None:
+            self.materialize()
+        return self._data
+
+    @property
+    def has_blanks(self):
+        if self._has_blanks is None:
+            self._has_blanks = Typing.has_blanks(self.type, self.data)
+        return self._has_blanks
+
+    @property
+    def blanks(self):
+        """
+        Blank bitmap of the vectors: a boolean array (vectors x vector length) marking the blank (any or unknown)
+        cells of every vector
+        """
+        if self.virtual is not False:
+            raise ValueError("Virtual blocks have no cells")
+        type_data = Typing.encode(self.relative_range.get_data(self.table.type_data))
+        blanks = (type_data == Typing.codes[Typing.any]) | (type_data == Typing.codes[Typing.unknown])
+        return blanks.T if self.orientation == Orientation.vertical else blanks
+
+    @property
+    def codes(self):
+        """
+        The codes of the cells of a textual block in the dictionary of the table, as an int32 array (vectors x vector
+        length) in which blank cells are StringDictionary.blank
+        """
+        if self._codes is None:
+            if self.virtual is not False or Typing.root(self.type) != Typing.string:
+                raise ValueError("Only textual blocks are dictionary encoded, {} has type {}".format(self, self.type))
+            codes = self.table.dictionary.encode(self.data).reshape(self.rows(), self.columns())
+            codes = codes.T if self.orientation == Orientation.vertical else codes
+            codes[self.blanks] = group.StringDictionary.blank
+            self._codes = codes
+        return self._codes
+
+    def materialize(self):
+        """
+        Casts the cells of the block (if that did not yet happen), blocks only keep their typing until their data is
+        first needed
+        :return: The block itself
+        """
+        if self.virtual is not False or self._data is not None:
+            return self
+        if self._vector_data is not None:
+            self._data = Block.stack_vectors(self.type, self._vector_data, self.orientation)
+            return self
+
+        values = self.relative_range.get_data(self.table.data)
+        cast_data = Typing.cast_cells(self.type, values)
+        vector_data = []
+        vectors = cast_data.T if self.orientation == Orientation.vertical else cast_data
+        for i, v_type in enumerate(self.vector_types):
+            vector = vectors[i]
+            if v_type == Typing.int and self.type != Typing.int:
+                vector = vector.astype(np.int64)
+            elif not Typing.cast_compatible(v_type, self.type):
+                vector = Typing.cast_cells(v_type, values.T[i] if self.orientation == Orientation.vertical
+                                           else values[i])
+            vector_data.append(vector)
+        self._vector_data = vector_data
+        self._data = cast_data.ravel()
+        return self
+
+    @staticmethod
+    def stack_vectors(block_type, vector_data, orientation):
+        """
+        Combines typed vectors into the (row-major, flattened) data of a block of the given type
+        """
+        if len(vector_data) == 1:
+            return vector_data[0]
+        if Typing.root(block_type) == Typing.numeric:
+            dtype = np.int64 if block_type == Typing.int else np.float64
+        else:
+            dtype = np.result_type(*vector_data) if all(v.dtype.kind == "U" for v in vector_data) else object
+        axis = 1 if orientation == Orientation.vertical else 0
+        return np.stack([np.asarray(v, dtype=dtype) for v in vector_data], axis=axis).ravel()
+
     def __repr__(self):
         return "Block({}, {}, {}, {})".format(self.table, self.relative_range, self.type, self.orientation)
 
@@ -507,16 +934,24 @@ class Block(object):
     def bounds(self):
         return self.relative_range.as_legacy_bounds()
 
+    @property
+    def cache(self):
+        """
+        The cache of sub-blocks of this block (registered with the global cache registry), created when first needed
+        """
+        if self._cache is None:
+            self._cache = LRUCache("sub_blocks", sizeof=block_size)
+        return self._cache
+
     def sub_block(self, vector_index, vector_count=1):
         key = (vector_index, vector_count)
-        if key not in self.cache:
+        sub_block = self.cache.get(key)
+        if sub_block is None:
             new_range = self.relative_range.sub_range(vector_index, vector_count, self.orientation)
             vector_types = self.vector_types[vector_index:vector_index + vector_count]
             sub_block = Block(self.table, new_range, self.orientation, vector_types, virtual=self.virtual)
             self.cache[key] = sub_block
-            return sub_block
-        else:
-            return self.cache[key]
+        return sub_block
 
     def vector(self, vector_index):
         return self.sub_block(vector_index)
@@ -557,3 +992,13 @@ class Block(object):
     def __lt__(self, other):
         return (self.table, self.orientation, self.vector_index(), self.vector_count(), self.vector_length())\
             < (other.table, other.orientation, other.vector_index(), other.vector_count(), other.vector_length())
+
+
+def block_size(block):
+    """
+    :return: Estimated size (in bytes) of a block and of its cast data (if it was already materialized)
+    """
+    size = sys.getsizeof(block)
+    if block._data is not None:
+        size += block._data.nbytes
+    return size
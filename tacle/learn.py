@@ -6,37 +6,67 @@ from .core.virtual_template import VirtualLookup, VirtualConditionalAggregate
 from .core.solutions import Solutions
 from .workflow import main as learn
 from .workflow import get_constraint_list
-from .parse.parser import get_groups
+from .core.group import Bounds, Group, GType, StringDictionary
+from .core.group import Table as LegacyTable
+from .parse.parser import cast, detect_type
 from .indexing import Table, Block, Orientation, Range, Typing
 
 
 def learn_constraints(data, tables, virtual=False, solve_timeout=None):
     # type: (np.ndarray, List[Table], bool, Optional[int]) -> Solutions
-    indexing_data = {
-        "Tables": [
-            {"Name": table.name, "Bounds": table.range.as_legacy_bounds().bounds}
-            for table in tables
-        ],
-        "Groups": [
-            {
-                "Table": table.name,
-                "Bounds": block.relative_range.as_legacy_list(block.orientation),
-                "Types": block.vector_types
-            }
-            for table in tables
-            for block in table.blocks
-        ]
-    }
-    groups = get_groups(np.array(data), indexing_data)
+    groups = get_groups(tables)
     # if virtual:
     #     groups += [make_virtual_block(tables[1], Orientation.vertical, Typing.float)]
     templates = get_constraint_list()
     if virtual:
-        templates.append(VirtualLookup())
+        templates.append(VirtualLookup.instance())
         templates += VirtualConditionalAggregate.instances()
     return learn(None, None, False, True, templates, groups=groups, solve_timeout=solve_timeout)
 
 
+def get_groups(tables):
+    # type: (List[Table]) -> List[Group]
+    """
+    Builds the (legacy) groups from the blocks of the given tables, reusing the data that was typed and cast when
+    building the blocks.  Textual groups are encoded with the dictionary shared by the tables (of a sheet).
+    """
+    groups = []
+    if len(tables) > 0 and all(table.dictionary is tables[0].dictionary for table in tables):
+        dictionary = tables[0].dictionary
+    else:
+        dictionary = StringDictionary()
+    for table in tables:
+        legacy_table = LegacyTable(table.name, table.data)
+        for block in table.blocks:
+            row = block.orientation == Orientation.horizontal
+            r_range = block.relative_range
+            if row:
+                bounds = Bounds([r_range.y0 + 1, r_range.y1, 1, table.columns])
+            else:
+                bounds = Bounds([1, table.rows, r_range.x0 + 1, r_range.x1])
+
+            g_types = [GType.int if Typing.root(t) == Typing.numeric else GType.string for t in block.vector_types]
+            values = r_range.get_data(table.data)
+            if GType.max(g_types) == GType.string:
+                g_data = cast_strings(values)
+            else:
+                g_data = np.asarray(block.data).reshape(values.shape).astype(np.float64)
+            groups.append(Group(legacy_table, bounds, row, g_data, g_types, dictionary))
+    return groups
+
+
+def cast_strings(values):
+    """
+    Casts cell values for textual groups (in the same way as the legacy parser), every distinct value is cast once
+    """
+    distinct = dict()
+    codes = np.fromiter((distinct.setdefault((type(v), v), len(distinct)) for v in values.ravel()),
+                        dtype=int, count=values.size)
+    cast_values = np.empty(len(distinct), dtype=object)
+    cast_values[:] = [cast(GType.string, detect_type(v), v) for _, v in distinct]
+    return cast_values[codes].reshape(values.shape)
+
+
 def make_virtual_block(table, orientation, block_type):
     # type: (Table, Orientation, str) -> Block
     if orientation == Orientation.vertical:
@@ -0,0 +1,46 @@
+import multiprocessing
+
+import numpy as np
+
+from . import detect
+from .indexing import Typing
+
+# The grid that is being typed, forked worker processes inherit it instead of receiving (pickled) copies of its cells
+_grid = None
+
+
+def fork_available():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _detect_band(bounds):
+    start, end = bounds
+    return Typing.detect_codes(_grid[start:end])
+
+
+def get_type_data(data, workers=None, band_rows=None):
+    """
+    Detects the type codes of all cells by splitting the grid into row bands that are typed by a pool of forked
+    worker processes.  Workers inherit the grid and only receive the bounds of their bands, they send back the int8
+    type codes of their band.  The grid is typed serially if workers is None or smaller than 2, if it consists of a
+    single band or if processes cannot be forked on this platform.
+    :param workers: The number of worker processes
+    :param band_rows: The (maximal) number of rows per band, by default every worker types one band (distinct cell
+    values are only classified once per band)
+    :return: The same int8 array of type codes as detect.get_type_data
+    """
+    global _grid
+    data = np.asarray(data, dtype=object)
+    rows = np.size(data, 0)
+    if workers is None or workers < 2 or not fork_available():
+        return detect.get_type_data(data)
+    band_rows = -(-rows // workers) if band_rows is None else band_rows
+    if rows <= band_rows:
+        return detect.get_type_data(data)
+    bands = [(start, min(start + band_rows, rows)) for start in range(0, rows, band_rows)]
+    _grid = data
+    try:
+        with multiprocessing.get_context("fork").Pool(min(workers, len(bands))) as pool:
+            return np.concatenate(pool.map(_detect_band, bands, chunksize=1), axis=0)
+    finally:
+        _grid = None
@@ -0,0 +1,158 @@
+import numpy as np
+
+from tacle.core.group import Bounds, Group, GType, Orientation
+from tacle.parse import parser
+from tacle.parse.parser import DType, cast, detect_type
+
+# DType codes are the positions of the DType members
+dtypes = list(DType)
+codes = {d_type: i for i, d_type in enumerate(dtypes)}
+nan_code = codes[DType.nan]
+int_code = codes[DType.int]
+string_code = codes[DType.string]
+# Lookup table of parser.numeric_type, indexed by DType code
+numeric = np.array([parser.numeric_type(d_type) for d_type in dtypes])
+
+
+def _factorize(data):
+    distinct = dict()
+    indices = np.fromiter((distinct.setdefault((type(v), v), len(distinct)) for v in data.ravel()),
+                          dtype=int, count=data.size)
+    return [v for _, v in distinct], indices.reshape(data.shape)
+
+
+def detect_types(data):
+    """
+    Detects the DType of every cell, every distinct cell value is only typed once
+    :return: An int8 array of DType codes (positions in dtypes)
+    """
+    data = np.asarray(data, dtype=object)
+    values, indices = _factorize(data)
+    return np.array([codes[detect_type(v)] for v in values], dtype=np.int8)[indices]
+
+
+def detect_tables(type_codes):
+    """
+    Detects tables as maximal rectangles of non-blank cells (without their header row or column)
+    :return: A sorted list of (bounds, orientation) tuples, where bounds are 1-based and inclusive
+    """
+    rows, columns = type_codes.shape
+    filled = np.zeros((rows, columns + 2), dtype=np.int8)
+    filled[:, 1:-1] = type_codes != nan_code
+    steps = np.diff(filled, axis=1)
+    start_rows, start_columns = np.nonzero(steps == 1)
+    end_columns = np.nonzero(steps == -1)[1]
+
+    rectangles = [[] for _ in range(rows + 1)]
+    for row, c1, c2 in zip(start_rows.tolist(), start_columns.tolist(), end_columns.tolist()):
+        rectangles[row].append([row, row + 1, c1, c2])
+
+    saved = []
+    current = {(rec[2], rec[3]): rec for rec in rectangles[0]}
+    for i in range(1, len(rectangles)):
+        new_current = {}
+        for rec in rectangles[i]:
+            key = (rec[2], rec[3])
+            if key in current:
+                old = current.pop(key)
+                old[1] = rec[1]
+                new_current[key] = old
+            else:
+                new_current[key] = rec
+        saved += current.values()
+        current = new_current
+    tables = [((r1 + 1, r2, c1 + 1, c2), o)
+              for (r1, r2, c1, c2), o in [remove_header(rec, type_codes) for rec in saved]]
+    tables = [(rec, o) for rec, o in tables if rec[0] <= rec[1] and rec[2] <= rec[3]]
+    return sorted(tables, key=lambda t: (t[0][0], t[0][2], t[0][1], t[0][3]))
+
+
+def remove_header(rec, type_codes):
+    r1, r2, c1, c2 = rec
+    o = None
+    if np.all(type_codes[r1, c1:c2] == string_code):
+        rec = r1 + 1, r2, c1, c2
+        o = Orientation.VERTICAL
+    elif np.all(type_codes[r1:r2, c1] == string_code):
+        rec = r1, r2, c1 + 1, c2
+        o = Orientation.HORIZONTAL
+    return tuple(rec), o
+
+
+def is_type_consistent(type_codes, axis):
+    """
+    Tests whether all vectors along the given axis are type consistent: numeric and textual cells are not mixed
+    """
+    type_codes = np.moveaxis(type_codes, axis, 0)
+    blank = type_codes == nan_code
+    is_numeric = numeric[type_codes]
+    return not np.any(~blank[1:] & ~blank[:-1] & (is_numeric[1:] != is_numeric[:-1]))
+
+
+def detect_groups(type_codes, tables):
+    """
+    Splits the type consistent tables into groups of consecutive vectors that are either all numeric or all textual
+    """
+    groups = []
+    for b, table in tables:
+        t_codes = Bounds(b).subset(type_codes)
+        if Orientation.row(table.orientation) and is_type_consistent(t_codes, 1):
+            for start, end in _runs(numeric[t_codes[:, 0]]):
+                groups.append(create_group([start + 1, end, ":"], table, type_codes=t_codes[start:end, :]))
+        if Orientation.column(table.orientation) and is_type_consistent(t_codes, 0):
+            for start, end in _runs(numeric[t_codes[0, :]]):
+                groups.append(create_group([":", start + 1, end], table, type_codes=t_codes[:, start:end]))
+    return groups
+
+
+def _runs(flags):
+    boundaries = np.flatnonzero(flags[1:] != flags[:-1]) + 1
+    starts = [0] + boundaries.tolist()
+    return zip(starts, boundaries.tolist() + [len(flags)])
+
+
+def infer_types(type_codes, row):
+    """
+    Computes the GType of every vector (string if it contains text, int if all of its cells are integers)
+    """
+    axis = 1 if row else 0
+    if np.any(np.all(type_codes == nan_code, axis=axis)):
+        raise Exception("NaN type not allowed for groups")
+    strings = np.any(type_codes == string_code, axis=axis)
+    ints = np.all(type_codes == int_code, axis=axis)
+    return [GType.string if s else (GType.int if i else GType.float) for s, i in zip(strings, ints)]
+
+
+def create_group(bounds_list, table, g_types=None, type_codes=None):
+    """
+    Creates the group with the given bounds ([start, end, ":"] or [":", start, end]), every distinct cell value is only
+    typed and cast once
+    :param type_codes: Optional DType codes of the group cells, they are detected if not given
+    """
+    if bounds_list[0] == ":":
+        bounds = Bounds([1, table.rows] + bounds_list[1:3])
+        row = False
+    elif bounds_list[2] == ":":
+        bounds = Bounds(bounds_list[0:2] + [1, table.columns])
+        row = True
+    else:
+        raise Exception("Could not create group")
+
+    data = np.asarray(bounds.subset(table.data), dtype=object)
+    values, indices = _factorize(data)
+    if type_codes is None:
+        value_codes = np.array([codes[detect_type(v)] for v in values], dtype=np.int8)
+        type_codes = value_codes[indices]
+    else:
+        value_codes = np.empty(len(values), dtype=np.int8)
+        value_codes[indices] = type_codes
+    gtype_set = g_types if g_types is not None else infer_types(type_codes, row)
+    g_type = GType.max(gtype_set)
+
+    value_types = [dtypes[code] for code in value_codes]
+    if g_type is GType.string:
+        cast_values = np.empty(len(values), dtype=object)
+        cast_values[:] = [cast(g_type, t, v) for t, v in zip(value_types, values)]
+    else:
+        cast_values = np.array([cast(g_type, t, v) for t, v in zip(value_types, values)], dtype=float)
+    return Group(table, bounds, row, cast_values[indices], gtype_set)
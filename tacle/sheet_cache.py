@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .core.group import StringDictionary
+from .indexing import Range, Table
+
+
+class EncodedGrid(object):
+    """
+    Grid of strings stored as an array of integer codes into the distinct strings (e.g., memory-mapped from a sheet
+    cache entry).  Cells are only decoded when they are indexed, indexing returns an object array of strings.
+    """
+
+    def __init__(self, codes, strings):
+        """
+        :param codes: An integer array containing the position of the string of every cell
+        :param strings: An object array containing the distinct strings
+        """
+        self.codes = codes
+        self.strings = strings
+
+    @staticmethod
+    def encode(data):
+        data = np.asarray(data, dtype=object)
+        distinct = dict()
+        codes = np.fromiter((distinct.setdefault(str(v), len(distinct)) for v in data.ravel()), dtype=np.int32,
+                            count=data.size)
+        strings = np.empty(len(distinct), dtype=object)
+        strings[:] = list(distinct.keys())
+        return EncodedGrid(codes.reshape(data.shape), strings)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, item):
+        return self.strings[self.codes[item]]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.strings[self.codes], dtype=dtype)
+
+
+class SheetCache(object):
+    """
+    On-disk cache of parsed sheets.  Entries are keyed by the content of the CSV file and the detection options, and
+    contain the cell grid (as codes into its distinct strings, which are stored as UTF-8 bytes with offsets) and the
+    type grid, as .npy files that are memory-mapped when loaded, together with the table ranges and block typing (as
+    JSON).
+    """
+    version = 2
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, csv_file, **options):
+        content_hash = hashlib.sha256()
+        with open(csv_file, "rb") as f:
+            for block in iter(lambda: f.read(2 ** 20), b""):
+                content_hash.update(block)
+        options = json.dumps({"version": self.version, "options": options}, sort_keys=True)
+        return hashlib.sha256("{}:{}".format(content_hash.hexdigest(), options).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, csv_file, **options):
+        """
+        Loads a cached sheet
+        :param csv_file: The path of the CSV file
+        :param options: The detection options the sheet was stored with
+        :return: A tuple (data, type_data, tables) or None if the sheet is not cached, data is an EncodedGrid (only the
+        cells of the tables are decoded)
+        """
+        path = self.path(self.key(csv_file, **options))
+        if not os.path.isdir(path):
+            return None
+
+        offsets = np.load(os.path.join(path, "offsets.npy")).tolist()
+        with open(os.path.join(path, "strings.bin"), "rb") as f:
+            encoded = f.read()
+        strings = np.empty(len(offsets) - 1, dtype=object)
+        strings[:] = [encoded[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+        data = EncodedGrid(np.load(os.path.join(path, "codes.npy"), mmap_mode="r"), strings)
+        type_data = np.load(os.path.join(path, "type_data.npy"), mmap_mode="r")
+        with open(os.path.join(path, "tables.json")) as f:
+            tables_data = json.load(f)
+
+        tables = []
+        dictionary = StringDictionary()
+        for table_data in tables_data:
+            t_range = Range(*table_data["range"])
+            blocks = [(Range(*block_data["range"]), block_data["orientation"], block_data["vector_types"])
+                      for block_data in table_data["blocks"]]
+            tables.append(Table(t_range.get_data(data), t_range.get_data(type_data), t_range, table_data["name"],
+                                table_data["orientations"], blocks, dictionary=dictionary))
+        return data, type_data, tables
+
+    def store(self, csv_file, data, type_data, tables, **options):
+        """
+        Stores a sheet, existing entries are left untouched
+        :param csv_file: The path of the CSV file
+        :param data: The cell grid (containing strings)
+        :param type_data: The grid of type codes
+        :param tables: The tables detected in the sheet
+        :param options: The detection options used to detect the tables
+        """
+        path = self.path(self.key(csv_file, **options))
+        if os.path.isdir(path):
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=self.directory)
+        try:
+            grid = data if isinstance(data, EncodedGrid) else EncodedGrid.encode(data)
+            encoded = [string.encode("utf-8") for string in grid.strings]
+            np.save(os.path.join(temporary_path, "codes.npy"), np.asarray(grid.codes, dtype=np.int32))
+            np.save(os.path.join(temporary_path, "offsets.npy"),
+                    np.cumsum([0] + [len(string) for string in encoded], dtype=np.int64))
+            with open(os.path.join(temporary_path, "strings.bin"), "wb") as f:
+                f.write(b"".join(encoded))
+            np.save(os.path.join(temporary_path, "type_data.npy"), np.asarray(type_data, dtype=np.int8))
+            tables_data = [
+                {
+                    "name": table.name,
+                    "range": [table.range.column, table.range.row, table.range.width, table.range.height],
+                    "orientations": table.orientations,
+                    "blocks": [
+                        {
+                            "range": [block.relative_range.column, block.relative_range.row,
+                                      block.relative_range.width, block.relative_range.height],
+                            "orientation": block.orientation,
+                            "vector_types": block.vector_types,
+                        }
+                        for block in table.blocks
+                    ]
+                }
+                for table in tables
+            ]
+            with open(os.path.join(temporary_path, "tables.json"), "w") as f:
+                json.dump(tables_data, f)
+            os.rename(temporary_path, path)
+        except OSError:
+            # Another process stored the same entry concurrently
+            if not os.path.isdir(path):
+                raise
+        finally:
+            if os.path.isdir(temporary_path):
+                shutil.rmtree(temporary_path)
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
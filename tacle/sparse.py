@@ -0,0 +1,143 @@
+import csv
+
+import numpy as np
+
+from .convert import build_table
+from .core.group import StringDictionary
+from .detect import label_row_cells, remove_headers, large_enough
+from .indexing import Typing, Range
+
+
+class SparseSheet(object):
+    """
+    Coordinate representation of a sheet that only stores its non-empty cells (ordered by row and column), for large
+    sheets that are mostly empty.  Type detection and table detection only visit the stored cells, only the table
+    ranges are turned into dense grids.
+    """
+
+    def __init__(self, rows, columns, cell_rows, cell_columns, values):
+        """
+        :param rows: The number of rows of the sheet
+        :param columns: The number of columns of the sheet
+        :param cell_rows: The rows of the non-empty cells
+        :param cell_columns: The columns of the non-empty cells
+        :param values: The values of the non-empty cells
+        """
+        self.rows = rows
+        self.columns = columns
+        cell_rows, cell_columns = np.asarray(cell_rows, dtype=np.int64), np.asarray(cell_columns, dtype=np.int64)
+        order = np.lexsort((cell_columns, cell_rows))
+        self.cell_rows = cell_rows[order]
+        self.cell_columns = cell_columns[order]
+        self.values = np.empty(len(order), dtype=object)
+        self.values[:] = list(values)
+        self.values = self.values[order]
+        # Cells of row r are stored at positions row_starts[r] up to row_starts[r + 1]
+        self.row_starts = np.searchsorted(self.cell_rows, np.arange(rows + 1))
+        self._type_data = None
+
+    @staticmethod
+    def from_cells(data):
+        data = np.asarray(data, dtype=object)
+        cell_rows, cell_columns = np.nonzero(data != "")
+        return SparseSheet(np.size(data, 0), np.size(data, 1), cell_rows, cell_columns, data[cell_rows, cell_columns])
+
+    @staticmethod
+    def from_csv(csv_file):
+        """
+        Reads a CSV file, storing only its non-empty cells (repeated values share a single string object)
+        """
+        cell_rows, cell_columns, values = [], [], []
+        distinct = dict()
+        rows = columns = 0
+        with open(csv_file) as f:
+            for row, cells in enumerate(csv.reader(f, delimiter=',')):
+                rows, columns = row + 1, max(columns, len(cells))
+                if not any(cells):
+                    continue
+                for column, value in enumerate(cells):
+                    if value != "":
+                        cell_rows.append(row)
+                        cell_columns.append(column)
+                        values.append(distinct.setdefault(value, value))
+        return SparseSheet(rows, columns, cell_rows, cell_columns, values)
+
+    @property
+    def shape(self):
+        return self.rows, self.columns
+
+    @property
+    def type_data(self):
+        """
+        The type codes of the stored cells
+        """
+        if self._type_data is None:
+            self._type_data = Typing.detect_codes(self.values)
+        return self._type_data
+
+    def row_cells(self):
+        """
+        :return: An iterator over (row, columns) pairs listing the occupied (non-blank) columns of every row that
+        contains occupied cells
+        """
+        occupied = self.type_data != Typing.codes[Typing.any]
+        rows, columns = self.cell_rows[occupied], self.cell_columns[occupied]
+        boundaries = np.flatnonzero(rows[1:] != rows[:-1]) + 1
+        for start, end in zip([0] + boundaries.tolist(), boundaries.tolist() + [len(rows)]):
+            if end > start:
+                yield int(rows[start]), columns[start:end].tolist()
+
+    def cells_in(self, t_range):
+        """
+        :return: The positions of the stored cells that lie within the given range
+        """
+        start, end = self.row_starts[min(t_range.y0, self.rows)], self.row_starts[min(t_range.y1, self.rows)]
+        columns = self.cell_columns[start:end]
+        return start + np.flatnonzero((columns >= t_range.x0) & (columns < t_range.x1))
+
+    def get_data(self, t_range):
+        """
+        :return: The dense object grid of the cells within the given range (empty cells contain "")
+        """
+        data = np.full((t_range.rows, t_range.columns), "", dtype=object)
+        cells = self.cells_in(t_range)
+        data[self.cell_rows[cells] - t_range.y0, self.cell_columns[cells] - t_range.x0] = self.values[cells]
+        return data
+
+    def get_type_data(self, t_range):
+        """
+        :return: The dense grid of type codes of the cells within the given range
+        """
+        type_data = np.full((t_range.rows, t_range.columns), Typing.codes[Typing.any], dtype=np.int8)
+        cells = self.cells_in(t_range)
+        type_data[self.cell_rows[cells] - t_range.y0, self.cell_columns[cells] - t_range.x0] = self.type_data[cells]
+        return type_data
+
+    def to_dense(self):
+        return self.get_data(Range(0, 0, self.columns, self.rows))
+
+
+def detect_table_ranges(sheet, orientation=None, min_cells=None, min_rows=None, min_columns=None):
+    """
+    Sparse version of detect.detect_table_ranges
+    :type sheet: SparseSheet
+    """
+    table_ranges = []
+    for t_range in label_row_cells(sheet.row_cells())[0]:
+        t_r = remove_headers(t_range, sheet.get_type_data(t_range), orientation)
+        if large_enough(t_r, min_cells, min_rows, min_columns):
+            table_ranges.append(t_r)
+    return table_ranges
+
+
+def get_tables(sheet, ranges, names=None):
+    """
+    Sparse version of convert.get_tables
+    :type sheet: SparseSheet
+    """
+    if names is None:
+        names = ["T{}".format(i + 1) for i in range(len(ranges))]
+    dictionary = StringDictionary()
+    tables = [build_table(name, sheet.get_data(t_range), sheet.get_type_data(t_range), t_range, dictionary)
+              for name, t_range in zip(names, ranges)]
+    return [table for table in tables if table is not None]
@@ -0,0 +1,103 @@
+import csv
+import itertools
+
+import numpy as np
+
+from .indexing import Typing, type_cache
+
+
+class _Positions(dict):
+    """
+    Maps values to positions, values that are looked up for the first time get the next position
+    """
+
+    def __missing__(self, value):
+        position = self[value] = len(self)
+        return position
+
+
+def read_chunks(csv_file, values, chunk_size=10000, max_distinct=2 ** 20):
+    """
+    Reads a CSV file in chunks of rows and encodes every cell as the position of its value in a list of values.
+    Repeated cell values share a single position (as long as fewer than max_distinct different values have been seen),
+    which keeps the memory footprint of categorical data small and allows every distinct value to be typed only once.
+    :param csv_file: The path of the CSV file
+    :param values: The list of values that cells are encoded with, new values are appended as they are read (the
+    first value should be the empty string, which is used for padding)
+    :param chunk_size: The number of rows per chunk
+    :param max_distinct: The maximal number of distinct cell values that are shared
+    :return: An iterator over int32 arrays containing the positions of the cells of consecutive chunks of rows, padded
+    with empty cells
+    """
+    distinct = _Positions((value, i) for i, value in enumerate(values))
+
+    def share():
+        # Positions of shared values follow the insertion order of the dictionary
+        values.extend(itertools.islice(distinct, len(values), None))
+
+    with open(csv_file) as f:
+        csv_reader = csv.reader(f, delimiter=',')
+        while True:
+            rows = list(itertools.islice(csv_reader, chunk_size))
+            if len(rows) == 0:
+                return
+
+            width = max(len(row) for row in rows)
+            if len(distinct) + len(rows) * width <= max_distinct:
+                cells = [distinct[value] for row in rows for value in row]
+            else:
+                cells = [distinct[value] if len(distinct) < max_distinct else distinct.get(value, -1)
+                         for row in rows for value in row]
+            if len(cells) == len(rows) * width:
+                chunk = np.array(cells, dtype=np.int32).reshape(len(rows), width)
+            else:
+                # Rows of different lengths are padded with empty cells
+                chunk = np.zeros((len(rows), width), dtype=np.int32)
+                offset = 0
+                for i, row in enumerate(rows):
+                    chunk[i, :len(row)] = cells[offset:offset + len(row)]
+                    offset += len(row)
+            del cells
+            if len(values) < len(distinct):
+                share()
+            # Values that are not shared (once max_distinct values have been seen) get a position of their own
+            unshared = np.nonzero(chunk < 0)
+            if len(unshared[0]) > 0:
+                chunk[unshared] = np.arange(len(values), len(values) + len(unshared[0]))
+                values.extend(rows[i][j] for i, j in zip(*[index.tolist() for index in unshared]))
+            del rows
+            yield chunk
+
+
+def read_csv(csv_file, chunk_size=10000, max_distinct=2 ** 20):
+    """
+    Reads and types a CSV file in a single pass, without holding the whole file in Python lists.  Cells are read in
+    chunks that are encoded as positions in the list of distinct values (see read_chunks), every distinct value is
+    typed once and the grids are built from the positions at the end.
+    :param csv_file: The path of the CSV file
+    :param chunk_size: The number of rows per chunk
+    :param max_distinct: The maximal number of distinct cell values that are shared
+    :return: A tuple (data, type_data) containing the padded cell grid and the grid of type codes
+    """
+    values, types = [""], []
+    chunks = []
+    for chunk in read_chunks(csv_file, values, chunk_size, max_distinct):
+        # Values that are not shared may still repeat within the chunk
+        codes = dict.fromkeys(values[len(types):])
+        for value in codes:
+            codes[value] = Typing.codes[type_cache.detect_type(value)]
+        types += [codes[value] for value in values[len(types):]]
+        chunks.append(chunk)
+
+    positions = np.zeros((sum(len(chunk) for chunk in chunks), max((np.size(c, 1) for c in chunks), default=0)),
+                         dtype=np.int32)
+    offset = 0
+    while len(chunks) > 0:
+        chunk = chunks.pop(0)
+        positions[offset:offset + len(chunk), :np.size(chunk, 1)] = chunk
+        offset += len(chunk)
+
+    cells = np.empty(len(values), dtype=object)
+    cells[:] = values
+    del values
+    return cells[positions], np.array(types, dtype=np.int8)[positions]
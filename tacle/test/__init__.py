@@ -0,0 +1,11 @@
+import os
+
+from tacle import learn_from_csv
+
+
+def get_resource(name):
+    return os.path.join(os.path.dirname(__file__), "res", name)
+
+
+def get_constraints(name):
+    return learn_from_csv(get_resource(name))
@@ -0,0 +1,90 @@
+import itertools
+from collections import Counter
+
+import numpy as np
+
+from tacle import parse_csv, tables_from_csv
+from tacle.core.assignment import CandidateJoin
+from tacle.core.selectivity import FilterStatistics, get_statistics
+from tacle.core.solutions import Solutions
+from tacle.learn import get_groups, learn_constraints
+from tacle.test import get_resource
+from tacle.workflow import get_constraint_list
+
+
+def test_candidate_join(monkeypatch):
+    def product(join, solutions):
+        for values in itertools.product(*join.domains):
+            assignment = dict(zip(join.names, values))
+            if all(f.test_relaxed(assignment, solutions) for f in join.filters):
+                yield assignment
+
+    for name in ["magic_ice_cream.csv", "mutual_exclusive_vector_positive_1.csv"]:
+        csv_file = get_resource(name)
+        tables = tables_from_csv(csv_file)
+        groups = get_groups(tables)
+        solutions = learn_constraints(np.array(parse_csv(csv_file), dtype=object), tables)
+        for template in solutions.solutions:
+            with monkeypatch.context() as m:
+                m.setattr(CandidateJoin, "enumerate", product)
+                expected = template.source.candidates(groups, solutions, template.filters, template)
+            found = template.source.candidates(groups, solutions, template.filters, template)
+            assert Counter(frozenset(c.items()) for c in found) == Counter(frozenset(c.items()) for c in expected)
+
+
+def test_feature_masks():
+    csv_file = get_resource("magic_ice_cream.csv")
+    groups = get_groups(tables_from_csv(csv_file))
+    groups += [vector for group in groups for vector in group]
+    solutions = Solutions()
+    features = solutions.features.get(groups)
+    assert features["length"].tolist() == [g.length() for g in groups]
+    assert features["partial"].tolist() == [g.is_partial for g in groups]
+
+    tested = 0
+    for template in get_constraint_list():
+        for f in template.filters:
+            for relaxed in [False, True]:
+                mask = f.feature_mask(features, relaxed=relaxed)
+                if mask is None:
+                    continue
+                test = f.test_relaxed if relaxed else f.test
+                assert mask.tolist() == [test({v.name: g for v in f.variables}, solutions) for g in groups]
+                tested += 1
+    assert tested > 0
+
+
+def test_join_plan(tmp_path):
+    csv_file = get_resource("magic_ice_cream.csv")
+    tables = tables_from_csv(csv_file)
+    groups = get_groups(tables)
+    solutions = learn_constraints(np.array(parse_csv(csv_file), dtype=object), tables)
+    for template in solutions.solutions:
+        found = template.source.candidates(groups, solutions, template.filters, template)
+        plans = solutions.plans[template]
+        for plan in plans:
+            assert sorted(plan.order) == sorted(v.name for v in template.variables)
+            assert str(plan)
+        # Every seed assignment (of a constraint source) is joined separately
+        assert sum(plan.steps[-1]["matches"] for plan in plans) == len(found)
+
+        # Assignments are enumerated in the same order for every binding order
+        domains = [groups] * len(template.variables)
+        features = [solutions.features.get(groups)] * len(template.variables)
+        declared = CandidateJoin(template.name, template.variables, domains, features, template.filters,
+                                 FilterStatistics(), list(range(len(template.variables))))
+        planned = CandidateJoin(template.name, template.variables, domains, features, template.filters,
+                                FilterStatistics(), list(reversed(range(len(template.variables)))))
+        assert list(planned.enumerate(solutions)) == list(declared.enumerate(solutions))
+
+    statistics = get_statistics()
+    counts = statistics.as_dict()
+    assert len(statistics) > 0
+    assert all(0 <= statistics.selectivity(template, key) <= 1 for template in counts for key in counts[template])
+    # Filters that several templates share (e.g., NotPartial(X)) are counted per template
+    keys = [key for template in counts for key in counts[template]]
+    assert len(keys) > len(set(keys))
+    statistics.save(str(tmp_path / "statistics.json"))
+    loaded = FilterStatistics()
+    loaded.load(str(tmp_path / "statistics.json"))
+    assert loaded.as_dict() == statistics.as_dict()
@@ -0,0 +1,44 @@
+import gc
+
+from tacle import filter_statistics
+from tacle.core.template import template_registry
+from tacle.indexing import type_cache
+from tacle.test import get_constraints
+from tacle.util.cache import CacheRegistry, LRUCache, registry
+
+
+def test_cache_registry():
+    local_registry = CacheRegistry(budget=3)
+    first, second = LRUCache("a", local_registry, lambda v: 1), LRUCache("b", local_registry, lambda v: 1)
+    first[1], first[2], second[1] = "x", "z", "y"
+    assert second.get(1) == "y" and first.get(2) == "z" and first.get(1) == "x" and first.get(3) is None
+    second[2] = "w"  # Evicts the least recently used entry (second[1]) across caches
+    assert 1 not in second and len(first) == 2 and local_registry.size == 3
+    statistics = local_registry.statistics()
+    assert (statistics["a"].hits, statistics["a"].misses, statistics["b"].evictions) == (2, 1, 1)
+    bounded = LRUCache("c", local_registry, lambda v: 0, max_entries=2)
+    bounded[1], bounded[2] = "x", "y"
+    bounded.get(1)
+    bounded[3] = "z"  # Evicts the least recently used entry of the cache (bounded[2])
+    assert 2 not in bounded and len(bounded) == 2 and local_registry.size == 3
+    del second
+    gc.collect()
+    assert local_registry.size == 2 and local_registry.statistics("b").entries == 0
+    local_registry.clear()
+    assert len(first) == 0 and local_registry.size == 0
+
+    registry.clear()
+    constraints = [str(c) for c in get_constraints("magic_ice_cream.csv")]
+    assert registry.size > 0 and registry.statistics("precision_and_scale").entries > 0
+    registry.budget = 500
+    try:
+        assert registry.size <= 500
+        assert [str(c) for c in get_constraints("magic_ice_cream.csv")] == constraints
+        assert registry.size <= 500 and sum(s.evictions for s in registry.statistics().values()) > 0
+    finally:
+        registry.budget = None
+    get_constraints("magic_ice_cream.csv")
+    assert type_cache.size > 0 and len(template_registry) > 0 and len(filter_statistics) > 0
+    registry.clear()
+    assert registry.size == 0 and all(s.entries == 0 for s in registry.statistics().values())
+    assert type_cache.size == 0 and len(template_registry) == 0 and len(filter_statistics) == 0
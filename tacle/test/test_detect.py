@@ -0,0 +1,181 @@
+import numpy as np
+
+from tacle.indexing import Typing, TypeCache
+from tacle.test import get_resource
+
+
+def test_detect_types_matches_detect_type():
+    values = ["", "#?", "5%", " - 3.5 %", "$5", "5 €", "1,000", "1.2.3", "1.2", "abc", "1e5", " 12 ", "-0", "3.0",
+              "£1,2", 5, 3.0, True, None, 2.5, np.int64(4), np.float32(1.5)]
+    data = np.array([values[(i * 7) % len(values)] for i in range(len(values) * 5)], dtype=object).reshape(10, -1)
+    assert np.array_equal(np.vectorize(Typing.detect_type)(data), Typing.detect_types(data))
+
+
+def test_type_cache():
+    cache = TypeCache(max_size=2)
+    assert cache.detect_type("5%") == Typing.percentage
+    assert cache.detect_type("5%") == Typing.percentage
+    assert cache.detect_type(1) == Typing.int
+    assert cache.detect_type(1.0) == Typing.float
+    assert cache.cast(Typing.float, "$1,000") == 1000.0
+    assert cache.stats()["hits"] == 1
+    assert cache.size <= 4
+
+
+def test_max_codes_matches_sequential_max():
+    def sequential_max(cell_types):
+        super_type = cell_types[0]
+        for cell_type in cell_types[1:]:
+            super_type = Typing._lowest_common_ancestor(super_type, cell_type)
+        return super_type
+
+    generator = np.random.RandomState(0)
+    labels = Typing.labels
+    codes = generator.randint(0, len(labels), size=(50, 13)).astype(np.int8)
+    codes[:25] = np.where(codes[:25] % 2 == 0, Typing.codes[Typing.int], Typing.codes[Typing.any])
+    for axis in (0, 1):
+        expected = np.apply_along_axis(lambda v: Typing.code(sequential_max(list(labels[v]))), axis, codes)
+        assert np.array_equal(Typing.max_codes(codes, axis), expected)
+
+    assert Typing.max([Typing.int, Typing.any, Typing.int]) == Typing.numeric
+    assert Typing.max([Typing.int, Typing.int, Typing.any]) == Typing.float
+    assert Typing.max(Typing.encode([Typing.string, Typing.int])) is None
+
+
+def test_block_casts_match_per_cell_casts():
+    from tacle import tables_from_cells
+
+    data = [["a", "b", "c"],
+            ["x", "1", "2.5"],
+            ["y", "3", "10%"],
+            ["z", "4", ""]]
+    for table in tables_from_cells(data):
+        for block in table.blocks:
+            values = block.relative_range.get_data(table.data)
+            vectors = values.T if block.orientation == "vertical" else values
+            for v_type, vector, v_data in zip(block.vector_types, vectors, block.vector_data):
+                expected = np.vectorize(lambda v: Typing.cast(v_type, v))(vector)
+                assert v_data.dtype == expected.dtype and np.array_equal(v_data, expected, equal_nan=v_type != "string")
+            assert np.array_equal(block.data, np.vectorize(lambda v: Typing.cast(block.type, v))(values.ravel()),
+                                  equal_nan=block.type != "string")
+
+    type_data, cast_data = Typing.detect_and_cast(np.array(data, dtype=object))
+    assert np.array_equal(type_data, Typing.detect_codes(data))
+    assert cast_data[2, 2] == 0.1 and cast_data[1, 1] == 1
+
+
+def reference_label_ranges(occupied):
+    from tacle.indexing import Range
+
+    ranges = []
+
+    def find_range(_c, _r):
+        for _i, _range in enumerate(ranges):
+            if _range is not None and _range.contains_cell((_c, _r)):
+                return _i, _range
+        return None
+
+    for r in range(np.size(occupied, 0)):
+        for c in range(np.size(occupied, 1)):
+            if occupied[r, c] and find_range(c, r) is None:
+                top_range = find_range(c, r - 1) if r - 1 >= 0 else None
+                left_range = find_range(c - 1, r) if c - 1 >= 0 else None
+                cell_range = Range(c, r, 1, 1)
+                if top_range is None and left_range is None:
+                    ranges.append(cell_range)
+                elif top_range is None:
+                    ranges[left_range[0]] = cell_range.bounding_box(left_range[1])
+                elif left_range is None:
+                    ranges[top_range[0]] = cell_range.bounding_box(top_range[1])
+                else:
+                    ranges[top_range[0]] = top_range[1].bounding_box(left_range[1])
+                    ranges[left_range[0]] = None
+    return [r for r in ranges if r is not None]
+
+
+def test_label_ranges_matches_reference():
+    from tacle.detect import label_ranges
+
+    generator = np.random.RandomState(1)
+    for density in (0.1, 0.3, 0.5, 0.7):
+        for _ in range(50):
+            occupied = generator.rand(generator.randint(1, 15), generator.randint(1, 15)) < density
+            assert [repr(r) for r in label_ranges(occupied)] == [repr(r) for r in reference_label_ranges(occupied)]
+
+    # Combs of strips that are merged by their last row, one strip at a time
+    for step in (2, 3):
+        occupied = np.zeros((6, 40), dtype=bool)
+        occupied[:-1, ::step] = True
+        occupied[-1] = True
+        for comb in (occupied, occupied[:, ::-1], occupied[::-1], occupied[::-1, ::-1]):
+            assert [repr(r) for r in label_ranges(comb)] == [repr(r) for r in reference_label_ranges(comb)]
+
+
+def reference_headers_count(type_data, vectors):
+    headers = []
+    for vector in vectors(type_data):
+        header, running = 0, vector[0]
+        for i in range(1, len(vector)):
+            if Typing.lca_table[vector[i], running] == Typing.none:
+                header, running = i, vector[i]
+        headers.append(header)
+    return headers
+
+
+def test_headers_count_matches_reference():
+    from tacle.detect import get_headers_count
+    from tacle.indexing import Orientation, Range
+
+    generator = np.random.RandomState(0)
+    for _ in range(100):
+        rows, columns = generator.randint(1, 12), generator.randint(1, 12)
+        type_data = generator.randint(0, len(Typing.types), (rows, columns)).astype(np.int8)
+        t_range = Range(0, 0, columns, rows)
+        assert get_headers_count(t_range, type_data, Orientation.vertical) == \
+            reference_headers_count(type_data, lambda t: t.T)
+        assert get_headers_count(t_range, type_data, Orientation.horizontal) == \
+            reference_headers_count(type_data, lambda t: t)
+
+
+def test_type_summary_matches_blocks():
+    from tacle import tables_from_csv
+    from tacle.convert import orientation_compatible
+    from tacle.indexing import Orientation, Range, TypeSummary
+
+    generator = np.random.RandomState(0)
+    for _ in range(50):
+        type_data = generator.randint(0, len(Typing.types), (generator.randint(1, 8), generator.randint(1, 8)))
+        summary = TypeSummary(type_data.astype(np.int8))
+        t_range = Range(0, 0, type_data.shape[1], type_data.shape[0])
+        for orientation in Orientation.all():
+            assert summary.compatible(orientation) == orientation_compatible(type_data, t_range, orientation)
+
+    csv_file = get_resource("magic_ice_cream.csv")
+    for table in tables_from_csv(csv_file):
+        for block in table.blocks:
+            axis = 0 if block.orientation == Orientation.vertical else 1
+            type_data = block.relative_range.get_data(table.type_data)
+            assert block.vector_types == list(Typing.decode(Typing.max_codes(type_data, axis)))
+            assert block.has_blanks == Typing.has_blanks(block.type, block.data)
+
+
+def test_incremental_sheet_matches_full_detection():
+    import random
+    from tacle import tables_from_cells
+    from tacle.detect import detect_table_ranges, get_type_data
+    from tacle.incremental import IncrementalSheet
+
+    generator = random.Random(0)
+    values = ["", "", "", "a", "b", "1", "2.5", "10%", "$3"]
+    for _ in range(50):
+        rows, columns = generator.randint(1, 10), generator.randint(1, 10)
+        data = np.array([[generator.choice(values) for _ in range(columns)] for _ in range(rows)], dtype=object)
+        sheet = IncrementalSheet(data, min_cells=2)
+        for _ in range(3):
+            changes = {(generator.randint(0, rows), generator.randint(0, columns)): generator.choice(values)
+                       for _ in range(generator.randint(1, 3))}
+            region = sheet.update(changes)
+            assert all(region.contains_cell((column, row)) for row, column in changes)
+            assert sheet.table_ranges == detect_table_ranges(get_type_data(sheet.data), min_cells=2)
+            assert [(t.name, t.range) for t in sheet.tables()] == \
+                [(t.name, t.range) for t in tables_from_cells(sheet.data, min_cells=2)]
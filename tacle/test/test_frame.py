@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from tacle import learn_from_frame, parse_csv, tables_from_frame
+from tacle.test import get_resource
+
+
+def test_learn_from_frame():
+    csv_file = get_resource("magic_ice_cream.csv")
+    rows = parse_csv(csv_file)
+    header, body = rows[0], rows[1:9]
+    frame = pd.DataFrame({h: [row[i] for row in body] for i, h in enumerate(header)})
+    for h in header[2:6]:
+        frame[h] = frame[h].astype(int)
+    frame["Rating"] = [1.5, np.nan, 2.0, 3.5, 4.0, np.nan, 1.0, 2.5]
+    frame["Note"] = ["a", None, "b", "c", "d", "e", "f", "g"]
+
+    table = tables_from_frame(frame)[0]
+    assert [block.type for block in table.blocks] == ["string", "int", "string", "float", "string"]
+    assert np.shares_memory(table.blocks[1].vector_data[0], frame["June"].values)
+    assert np.shares_memory(table.blocks[3].vector_data[0], frame["Rating"].values)
+    assert table.blocks[3].has_blanks and table.blocks[4].vector_data[0][1] == ""
+
+    constraints = [str(c) for c in learn_from_frame(frame)]
+    assert "T1[:, 6] = SUM(T1[:, 3:5], row)" in constraints
+
+
+def test_learn_from_frame_mixed_and_blank_columns():
+    frame = pd.DataFrame({"A": [1, 2, 3], "B": [4, 5, 6], "C": [5, 7, 9], "D": ["a", 1, "b"]})
+    table = tables_from_frame(frame)[0]
+    assert [block.type for block in table.blocks if block.orientation == "vertical"] == ["int", "string"]
+    assert list(table.blocks[-1].vector_data[0]) == ["a", "1", "b"]
+    assert "T1[:, 2] = T1[:, 3] - T1[:, 1]" in [str(c) for c in learn_from_frame(frame)]
+
+    frame["D"] = [None, None, None]
+    table = tables_from_frame(frame)[0]
+    assert all(block.relative_range.x1 <= 3 for block in table.blocks if block.orientation == "vertical")
+    assert "T1[:, 2] = T1[:, 3] - T1[:, 1]" in [str(c) for c in learn_from_frame(frame)]
+
+
+def test_learn_from_frame_datetime_columns():
+    frame = pd.DataFrame({"A": [1, 2, 3], "B": [4, 5, 6], "C": [5, 7, 9]})
+    frame["D"] = pd.to_datetime(["2020-01-01", "2020-01-02", None])
+    frame["E"] = pd.to_timedelta(["1 days", "2 days", "3 days"])
+    table = tables_from_frame(frame)[0]
+    assert list(table.data[:, 3]) == ["2020-01-01", "2020-01-02", ""]
+    assert [block.type for block in table.blocks if block.orientation == "vertical"] == ["int", "string"]
+    # Timestamps and durations are not learned as numbers (e.g., as ordered nanoseconds)
+    constraints = [str(c) for c in learn_from_frame(frame)]
+    assert "T1[:, 2] = T1[:, 3] - T1[:, 1]" in constraints
+    assert "ORDERED(T1[:, 5])" not in constraints and "ALLDIFFERENT(T1[1, :])" not in constraints
@@ -0,0 +1,40 @@
+import numpy as np
+
+from tacle import tables_from_csv
+from tacle.core.group import Bounds
+from tacle.core.template import blank_filter
+from tacle.learn import get_groups
+from tacle.test import get_resource
+
+
+def test_dictionary_encoded_groups():
+    csv_file = get_resource("magic_ice_cream.csv")
+    tables = tables_from_csv(csv_file)
+    groups = get_groups(tables)
+    assert all(group.dictionary is tables[0].dictionary for group in groups)
+    for group in groups:
+        assert np.array_equal(group.blanks, ~np.vectorize(blank_filter(group.data)[1])(group.data))
+        if group.is_textual():
+            assert np.array_equal(group.dictionary.decode(group.codes), group.data)
+            for vector in group:
+                assert np.array_equal(vector.get_vector_codes(1), group.dictionary.encode(vector.get_vector(1)))
+
+    for table in tables:
+        for block in table.blocks:
+            if block.type == "string":
+                strings = table.dictionary.decode(block.codes)
+                for vector_strings, vector, blanks in zip(strings, block.vector_data, block.blanks):
+                    assert list(vector_strings[~blanks]) == list(vector[~blanks])
+
+
+def test_vector_views():
+    csv_file = get_resource("magic_ice_cream.csv")
+    for group in get_groups(tables_from_csv(csv_file)):
+        assert not hasattr(group, "__dict__") and not hasattr(group.bounds, "__dict__")
+        for i, vector in enumerate(group, 1):
+            bounds = Bounds([i, i, None, None] if group.row else [None, None, i, i])
+            subgroup = group.subgroup(bounds)
+            assert vector == subgroup and vector.bounds == subgroup.bounds
+            assert vector.vector_types == subgroup.vector_types and vector.is_partial == subgroup.is_partial
+            assert np.shares_memory(vector.data, group.data) and np.shares_memory(vector.blanks, group.blanks)
+            assert np.array_equal(vector.data, subgroup.data, equal_nan=group.is_numeric())
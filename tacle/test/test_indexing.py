@@ -0,0 +1,12 @@
+from tacle import tables_from_csv
+from tacle.test import get_resource
+
+
+def test_blocks_are_materialized_lazily():
+    csv_file = get_resource("magic_ice_cream.csv")
+    for table in tables_from_csv(csv_file):
+        for block in table.blocks:
+            assert block._data is None
+            vector_data = block.vector_data
+            assert block._data is not None and block.vector_data is vector_data
+            assert len(vector_data) == block.vector_count()
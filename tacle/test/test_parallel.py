@@ -0,0 +1,22 @@
+import numpy as np
+
+from tacle import parallel, parse_csv, tables_from_cells
+from tacle.detect import get_type_data
+from tacle.test import get_resource
+
+
+def test_parallel_tables():
+    csv_file = get_resource("magic_ice_cream.csv")
+    data = np.array(parse_csv(csv_file), dtype=object)
+    serial_tables = tables_from_cells(data)
+    parallel_tables = tables_from_cells(data, workers=2)
+    assert [(t.name, t.range, t.orientations) for t in serial_tables] ==\
+        [(t.name, t.range, t.orientations) for t in parallel_tables]
+    for serial_table, parallel_table in zip(serial_tables, parallel_tables):
+        assert serial_table.blocks == parallel_table.blocks
+        assert set(serial_table.blocks) == set(parallel_table.blocks)
+        for serial_block, parallel_block in zip(serial_table.blocks, parallel_table.blocks):
+            assert serial_block.vector_types == parallel_block.vector_types
+            assert np.array_equal(serial_block.data, parallel_block.data)
+
+    assert np.array_equal(parallel.get_type_data(data, 2, band_rows=3), get_type_data(data))
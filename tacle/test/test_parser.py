@@ -0,0 +1,112 @@
+import numpy as np
+
+from tacle import parse_csv, tables_from_cells
+from tacle.core.group import Bounds, GType, Orientation, Table
+from tacle.learn import get_groups
+from tacle.parse import parser, vectorized
+from tacle.parse.parser import DType
+from tacle.test import get_resource
+
+
+def get_data(name):
+    return parser.parse(get_resource(name))
+
+
+def synthetic_data():
+    nan = float("nan")
+    return np.array([
+        ["Name", "Price", "Share", "Stock", nan, nan, nan],
+        ["a", "$10", "10%", 5, nan, "x", 1],
+        ["b", "$20", "20%", nan, nan, "y", 2.5],
+        ["c", "$1,000", "70%", 7, nan, "z", 3],
+        [nan, nan, nan, nan, nan, nan, nan],
+        ["Q1", 1, 2, 3, nan, nan, nan],
+        ["Q2", 4, 5, 6, nan, nan, nan],
+    ], dtype=object)
+
+
+def assert_groups(groups, expected):
+    assert [str(group) for group in groups] == [name for name, _, _ in expected]
+    for group, (_, vector_types, data) in zip(groups, expected):
+        assert group.vector_types == vector_types
+        if data is not None:
+            assert group.data.dtype == (np.float64 if group.is_numeric() else object)
+            assert np.array_equal(group.data, np.array(data, dtype=group.data.dtype), equal_nan=group.is_numeric())
+
+
+def detect_groups(data):
+    type_data = vectorized.detect_types(data)
+    tables = vectorized.detect_tables(type_data)
+    tables = [(b, Table("T{}".format(i + 1), Bounds(b).subset(data), o)) for i, (b, o) in enumerate(tables)]
+    return vectorized.detect_groups(type_data, tables)
+
+
+def test_detect_types():
+    s, c, p, i, f, n = DType.string, DType.currency, DType.percent, DType.int, DType.float, DType.nan
+    type_data = vectorized.detect_types(synthetic_data())
+    assert [[vectorized.dtypes[code] for code in row] for row in type_data] == [
+        [s, s, s, s, n, n, n],
+        [s, c, p, i, n, s, i],
+        [s, c, p, n, n, s, f],
+        [s, c, p, i, n, s, i],
+        [n, n, n, n, n, n, n],
+        [s, i, i, i, n, n, n],
+        [s, i, i, i, n, n, n],
+    ]
+
+
+def test_detect_tables():
+    vertical, horizontal = Orientation.VERTICAL, Orientation.HORIZONTAL
+    assert vectorized.detect_tables(vectorized.detect_types(synthetic_data())) == [
+        ((2, 2, 1, 4), vertical), ((2, 4, 7, 7), horizontal), ((3, 3, 2, 3), horizontal), ((4, 4, 2, 4), horizontal),
+        ((6, 7, 2, 4), horizontal)
+    ]
+    assert vectorized.detect_tables(vectorized.detect_types(get_data("magic_ice_cream.csv"))) == [
+        ((2, 9, 1, 7), vertical), ((11, 14, 1, 2), vertical)
+    ]
+
+
+def test_detect_groups():
+    assert_groups(detect_groups(synthetic_data()), [
+        ("T1[:, 1]", [GType.string], [["a"]]),
+        ("T1[:, 2:4]", [GType.float, GType.float, GType.int], [[10.0, 0.1, 5.0]]),
+        ("T2[1:3, :]", [GType.int, GType.float, GType.int], [[1.0], [2.5], [3.0]]),
+        ("T3[1, :]", [GType.float], [[20.0, 0.2]]),
+        ("T4[1, :]", [GType.float], [[1000.0, 0.7, 7.0]]),
+        ("T5[1:2, :]", [GType.int, GType.int], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]),
+    ])
+    assert_groups(detect_groups(get_data("magic_ice_cream.csv")), [
+        ("T1[:, 1:2]", [GType.string] * 2, None),
+        ("T1[:, 3:6]", [GType.int] * 4, None),
+        ("T1[:, 7]", [GType.string], None),
+        ("T2[:, 1]", [GType.string], None),
+        ("T2[:, 2]", [GType.int], None),
+    ])
+
+
+def test_create_group():
+    nan = float("nan")
+    table = Table("T1", synthetic_data()[1:4, 1:4])
+    assert_groups([vectorized.create_group(bounds, table) for bounds in ([":", 1, 1], [":", 2, 3], [":", 1, 2])], [
+        ("T1[:, 1]", [GType.float], [[10.0], [20.0], [1000.0]]),
+        ("T1[:, 2:3]", [GType.float, GType.float], [[0.1, 5.0], [0.2, nan], [0.7, 7.0]]),
+        ("T1[:, 1:2]", [GType.float, GType.float], [[10.0, 0.1], [20.0, 0.2], [1000.0, 0.7]]),
+    ])
+
+
+def test_groups_from_blocks_match_parsed_groups():
+    for name in ("magic_ice_cream.csv", "mutual_exclusive_vector_positive_1.csv"):
+        data = np.array(parse_csv(get_resource(name)), dtype=object)
+        tables = tables_from_cells(data)
+        indexing_data = {
+            "Tables": [{"Name": table.name, "Bounds": table.range.as_legacy_bounds().bounds} for table in tables],
+            "Groups": [{"Table": table.name, "Bounds": block.relative_range.as_legacy_list(block.orientation),
+                        "Types": block.vector_types} for table in tables for block in table.blocks]
+        }
+        parsed_groups = parser.get_groups(data, indexing_data)
+        groups = get_groups(tables)
+        assert groups == parsed_groups
+        for group, parsed_group in zip(groups, parsed_groups):
+            assert group.vector_types == parsed_group.vector_types and group.is_partial == parsed_group.is_partial
+            assert group.data.dtype == parsed_group.data.dtype
+            assert np.array_equal(group.data, parsed_group.data, equal_nan=group.is_numeric())
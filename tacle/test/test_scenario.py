@@ -1,12 +1,7 @@
-import os
-
 from tacle.indexing import Range
 from tacle.core.template import MutualExclusiveVector
 from tacle import learn_from_csv, filter_constraints
-
-
-def get_constraints(name):
-    return learn_from_csv(os.path.join(os.path.dirname(__file__), "res", name))
+from tacle.test import get_constraints, get_resource
 
 
 def test_mutual_exclusive_vector_positive_1():
@@ -22,3 +17,12 @@ def test_ice_cream():
     sum_constraint = filter_constraints(constraints, "sum*")[0]
     print(sum_constraint["X"])
     print(sum_constraint.X)
+
+
+def test_virtual_conditional_aggregates():
+    csv_file = get_resource("magic_ice_cream.csv")
+    # Every candidate is evaluated on its own vectors (not on those of another assignment), candidates whose foreign
+    # keys are missing from the original keys are rejected instead of raising InvalidArguments
+    constraints = [str(c) for c in learn_from_csv(csv_file, virtual=True)]
+    assert "? = SUMIF(T1[:, 1]=T2[:, 1], T1[:, 3])" in constraints
+    assert "? = COUNTIF(T1[:, 1]=T2[:, 1], T1[:, 6])" in constraints
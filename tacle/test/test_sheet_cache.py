@@ -0,0 +1,52 @@
+import csv
+import os
+
+import numpy as np
+
+import tacle
+from tacle import learn_from_csv, tables_from_csv
+from tacle.sheet_cache import EncodedGrid
+from tacle.test import get_constraints, get_resource
+
+
+def test_sheet_cache(tmp_path):
+    csv_file = get_resource("magic_ice_cream.csv")
+    cache_dir = str(tmp_path / "cache")
+    tables = tables_from_csv(csv_file)
+    for _ in range(2):
+        cached_tables = tables_from_csv(csv_file, cache_dir=cache_dir)
+        assert [(t.name, t.range, t.orientations) for t in tables] ==\
+            [(t.name, t.range, t.orientations) for t in cached_tables]
+        for table, cached_table in zip(tables, cached_tables):
+            assert table.blocks == cached_table.blocks
+            for block, cached_block in zip(table.blocks, cached_table.blocks):
+                assert block.vector_types == cached_block.vector_types
+                assert np.array_equal(block.data, cached_block.data)
+    assert len(os.listdir(cache_dir)) == 1
+
+    tables_from_csv(csv_file, min_rows=2, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 2
+    assert len(learn_from_csv(csv_file, cache_dir=cache_dir)) == len(get_constraints("magic_ice_cream.csv"))
+
+
+def test_sheet_cache_hits(tmp_path, monkeypatch):
+    csv_file = str(tmp_path / "long.csv")
+    with open(csv_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "A", "B", "C"])
+        for i in range(200):
+            writer.writerow(["x" * 10000 if i == 0 else "n{}".format(i % 5), i, 2 * i, 3 * i])
+    cache_dir = str(tmp_path / "cache")
+    expected = [str(c) for c in learn_from_csv(csv_file)]
+    tacle.cached_tables_from_csv(csv_file, cache_dir)
+    entry = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    # A single long cell does not widen every stored cell
+    assert sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry)) < 50000
+
+    def read_csv(*args, **kwargs):
+        raise AssertionError("Cache hits should not read the CSV file")
+
+    monkeypatch.setattr(tacle, "read_csv", read_csv)
+    data, tables = tacle.cached_tables_from_csv(csv_file, cache_dir)
+    assert isinstance(data, EncodedGrid) and data[1, 0] == "x" * 10000
+    assert [str(c) for c in learn_from_csv(csv_file, cache_dir=cache_dir)] == expected
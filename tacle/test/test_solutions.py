@@ -0,0 +1,53 @@
+import itertools
+
+import numpy as np
+
+from tacle import tables_from_csv
+from tacle.core.group import Bounds, Group, GType, Table
+from tacle.core.solutions import Solutions
+from tacle.core.template import Equal
+from tacle.learn import get_groups
+from tacle.test import get_resource
+
+
+def test_interned_solutions():
+    table = Table("T1", np.arange(12.0).reshape(4, 3))
+
+    def vectors():
+        return list(Group(table, Bounds([1, 4, 1, 3]), False, table.data, [GType.float] * 3))
+
+    template = Equal()
+    x, y = (v.name for v in template.variables)
+    v1, v2, v3 = vectors()
+    solutions = Solutions()
+    solutions.add(template, [{x: v1, y: v2}, {x: v2, y: v3}])
+    assert solutions.solutions[template] == [(0, 1), (1, 2)] and len(solutions.registry) == 3
+
+    w1, w2, w3 = vectors()  # Equal groups that were not interned yet
+    assert solutions.has_solution(template, {x: w1, y: w2}) and solutions.has(template, template.variables, [w2, w3])
+    assert not solutions.has_solution(template, {x: w1, y: w3})
+    assert solutions.get_solutions(template) == [{x: v1, y: v2}, {x: v2, y: v3}]
+    assert [c.assignment for c in solutions.constraints] == solutions.get_solutions(template)
+    assert solutions.get_solutions(template)[0][x] is v1
+
+
+def test_overlap_index():
+    csv_file = get_resource("magic_ice_cream.csv")
+    wide = Table("W", np.zeros((3, 80)))
+    groups = get_groups(tables_from_csv(csv_file)) + [Group(wide, Bounds([1, 3, 1, 80]), False, wide.data,
+                                                            [GType.float] * 80)]
+    vectors = [list(group) for group in groups]
+    solutions = Solutions()
+    overlaps = solutions.overlaps
+    all_vectors = groups + [v for group_vectors in vectors for v in group_vectors]
+    assert len(all_vectors) > 64
+    expected = [[g1.overlaps_with(g2) for g2 in all_vectors] for g1 in all_vectors]
+    assert overlaps.matrix(all_vectors, all_vectors).tolist() == expected
+    # Queries (and features) do not intern the transient vectors
+    solutions.features.get(all_vectors)
+    assert len(solutions.registry) == 0
+
+    for lists in itertools.combinations(vectors[:-1] + groups[:2], 3):
+        found = list(overlaps.disjoint_product(lists))
+        assert found == [c for c in itertools.product(*lists)
+                         if not any(g1.overlaps_with(g2) for g1, g2 in itertools.combinations(c, 2))]
@@ -0,0 +1,21 @@
+import numpy as np
+
+from tacle import SparseSheet, parse_csv, tables_from_cells, tables_from_sparse
+from tacle.test import get_resource
+
+
+def test_sparse_sheet():
+    for name in ("magic_ice_cream.csv", "mutual_exclusive_vector_positive_1.csv"):
+        csv_file = get_resource(name)
+        data = np.array(parse_csv(csv_file), dtype=object)
+        sheet = SparseSheet.from_csv(csv_file)
+        assert sheet.shape == data.shape and len(sheet.values) == np.count_nonzero(data != "")
+        assert np.array_equal(sheet.to_dense(), data)
+
+        for orientation in (None, "vertical", "horizontal"):
+            dense_tables, sparse_tables = tables_from_cells(data, orientation), tables_from_sparse(sheet, orientation)
+            assert [(t.name, t.range, t.orientations) for t in dense_tables] == \
+                [(t.name, t.range, t.orientations) for t in sparse_tables]
+            for dense_table, sparse_table in zip(dense_tables, sparse_tables):
+                assert np.array_equal(dense_table.data, sparse_table.data)
+                assert np.array_equal(dense_table.type_data, sparse_table.type_data)
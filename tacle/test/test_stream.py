@@ -0,0 +1,26 @@
+import numpy as np
+
+from tacle import parse_csv
+from tacle.detect import get_type_data
+from tacle.stream import read_csv
+from tacle.test import get_resource
+
+
+def test_read_csv_in_chunks(tmp_path):
+    csv_file = get_resource("mutual_exclusive_vector_positive_1.csv")
+    data = np.array(parse_csv(csv_file), dtype=object)
+    for chunk_size in (1, 2, 100):
+        chunked_data, type_data = read_csv(csv_file, chunk_size=chunk_size)
+        assert np.array_equal(chunked_data, data)
+        assert np.array_equal(type_data, get_type_data(data))
+
+    # Rows of different lengths, and values that are no longer shared once max_distinct values have been seen
+    csv_file = str(tmp_path / "ragged.csv")
+    with open(csv_file, "w") as f:
+        for i in range(50):
+            f.write(",".join(["a", str(i % 7), "{:.1f}".format(i / 3), "", "x{}".format(i)][:1 + i % 5]) + "\n")
+    data = np.array(parse_csv(csv_file), dtype=object)
+    for chunk_size, max_distinct in [(3, 5), (7, 20), (100, 2 ** 20)]:
+        chunked_data, type_data = read_csv(csv_file, chunk_size=chunk_size, max_distinct=max_distinct)
+        assert np.array_equal(chunked_data, data)
+        assert np.array_equal(type_data, get_type_data(data))
@@ -0,0 +1,23 @@
+from tacle.core.template import Aggregate, ConstraintTemplate, Equal, Orientation, Operation
+from tacle.test import get_constraints
+from tacle.workflow import get_constraint_list
+
+
+def test_interned_templates(monkeypatch):
+    assert Equal.instance() is Equal.instance() and isinstance(Equal.instance(), Equal)
+    aggregate = Aggregate.instance(Orientation.VERTICAL, Operation.SUM)
+    assert aggregate is Aggregate.instance(Orientation.VERTICAL, Operation.SUM)
+    assert aggregate is not Aggregate.instance(Orientation.HORIZONTAL, Operation.SUM)
+    assert all(t1 is t2 for t1, t2 in zip(get_constraint_list(), get_constraint_list()))
+
+    constraints = [str(c) for c in get_constraints("magic_ice_cream.csv")]
+    built = []
+    original_init = ConstraintTemplate.__init__
+
+    def init(self, *args, **kwargs):
+        built.append(self)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(ConstraintTemplate, "__init__", init)
+    assert [str(c) for c in get_constraints("magic_ice_cream.csv")] == constraints
+    assert len(built) == 0
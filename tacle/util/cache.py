@@ -0,0 +1,221 @@
+import functools
+import sys
+import weakref
+from collections import OrderedDict
+
+
+class CacheStatistics(object):
+    __slots__ = ("hits", "misses", "evictions", "entries", "size")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = 0
+        self.size = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def as_dict(self):
+        return dict({name: getattr(self, name) for name in self.__slots__}, hit_rate=self.hit_rate)
+
+    def __repr__(self):
+        return "CacheStatistics({})".format(", ".join("{}={}".format(k, v) for k, v in self.as_dict().items()))
+
+
+class LRUCache(object):
+    """
+    Mapping whose entries are accounted for by a cache registry.  Entries are evicted in least recently used order
+    across all caches of the registry when the registry exceeds its memory budget, and in least recently used order
+    within the cache when it exceeds its maximal number of entries.  Many caches can share a name (e.g., the subgroup
+    cache of every group), their statistics are aggregated per name.
+    """
+
+    __slots__ = ("name", "registry", "sizeof", "max_entries", "_entries", "_statistics", "_order", "_ref",
+                 "__weakref__")
+
+    def __init__(self, name, registry=None, sizeof=sys.getsizeof, max_entries=None):
+        """
+        :param name: The name under which the cache is reported
+        :param registry: The registry that accounts for the cache (the global registry if None)
+        :param sizeof: Function estimating the size (in bytes) of a value when it is inserted
+        :param max_entries: The maximal number of entries of the cache, None for no limit
+        """
+        self.name = name
+        self.registry = registry if registry is not None else get_registry()
+        self.sizeof = sizeof
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, size), least recently used first
+        self._statistics = self.registry.statistics(name)
+        self._order = self.registry._order
+        self._ref = None  # The cache is registered when its first entry is inserted
+
+    def __reduce__(self):
+        # Cached entries are not copied along (e.g., to worker processes), copies start empty in the global registry
+        return LRUCache, (self.name, None, self.sizeof, self.max_entries)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._statistics.misses += 1
+            return default
+        self._statistics.hits += 1
+        self._entries.move_to_end(key)
+        self._order.move_to_end((self._ref, key))
+        return entry[0]
+
+    def __setitem__(self, key, value):
+        if key in self._entries:
+            self._remove(key)
+        if self._ref is None:
+            self._ref = self.registry._register(self)
+        size = self.sizeof(value)
+        self._entries[key] = (value, size)
+        self.registry._add(self._ref, self._statistics, key, size)
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            self.evict(next(iter(self._entries)))
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def items(self):
+        """
+        :return: A list of the (key, value) pairs of the cache (which does not count as using them)
+        """
+        return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def _remove(self, key):
+        _, size = self._entries.pop(key)
+        self.registry._remove(self._ref, self._statistics, key, size)
+
+    def evict(self, key):
+        self._remove(key)
+        self._statistics.evictions += 1
+
+    def clear(self):
+        for key in list(self._entries.keys()):
+            self._remove(key)
+
+
+class CacheRegistry(object):
+    """
+    Registry of all caches, with a total memory budget that is enforced by evicting the least recently used entries.
+    Besides the caches of groups and blocks, it accounts for the type cache of cell values, the filter statistics and
+    the interned templates, such that clearing (or bounding) the registry covers all memoized state of the package.
+    """
+
+    def __init__(self, budget=None):
+        """
+        :param budget: The maximal total (estimated) size in bytes of all cache entries, None for no limit
+        """
+        self._budget = budget
+        self._order = OrderedDict()  # (cache reference, key) -> size, least recently used first
+        self._statistics = dict()
+        self._caches = dict()  # cache reference -> (statistics, entries) of the registered caches
+        self.size = 0
+
+    @property
+    def budget(self):
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget):
+        self._budget = budget
+        self._enforce()
+
+    def statistics(self, name=None):
+        """
+        :return: The statistics of the caches with the given name, or a dictionary with the statistics of all names
+        """
+        if name is None:
+            return dict(self._statistics)
+        if name not in self._statistics:
+            self._statistics[name] = CacheStatistics()
+        return self._statistics[name]
+
+    def reset_statistics(self):
+        for statistics in self._statistics.values():
+            statistics.hits = statistics.misses = statistics.evictions = 0
+
+    def clear(self):
+        """
+        Removes all entries from all caches (e.g., between learning tasks)
+        """
+        while len(self._order) > 0:
+            (reference, key), _ = self._order.popitem(last=False)
+            cache = reference()
+            if cache is not None and key in cache:
+                cache._remove(key)
+
+    def _register(self, cache):
+        # Entries are released from the registry when the cache itself is garbage collected
+        reference = weakref.ref(cache, self._release)
+        self._caches[reference] = (cache._statistics, cache._entries)
+        return reference
+
+    def _add(self, reference, statistics, key, size):
+        self._order[(reference, key)] = size
+        statistics.entries += 1
+        statistics.size += size
+        self.size += size
+        self._enforce()
+
+    def _remove(self, reference, statistics, key, size):
+        self._order.pop((reference, key), None)
+        statistics.entries -= 1
+        statistics.size -= size
+        self.size -= size
+
+    def _release(self, reference):
+        statistics, entries = self._caches.pop(reference)
+        for key, (_, size) in entries.items():
+            self._remove(reference, statistics, key, size)
+        entries.clear()
+
+    def _enforce(self):
+        while self._budget is not None and self.size > self._budget and len(self._order) > 0:
+            reference, key = next(iter(self._order))
+            cache = reference()
+            if cache is None or key not in cache:
+                self._order.pop((reference, key))
+            else:
+                cache.evict(key)
+
+
+registry = CacheRegistry()
+
+
+def get_registry():
+    """
+    :return: The global cache registry, used by all caches of the package
+    """
+    return registry
+
+
+def cached(name, registry=None, sizeof=sys.getsizeof):
+    """
+    Decorator that memoizes a function (of hashable arguments) in a registered cache
+    """
+    def decorator(f):
+        cache = LRUCache(name, registry, sizeof)
+
+        @functools.wraps(f)
+        def wrapper(*args):
+            result = cache.get(args, _missing)
+            if result is _missing:
+                result = f(*args)
+                cache[args] = result
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+_missing = object()
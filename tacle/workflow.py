@@ -16,25 +16,25 @@ logger = logging.getLogger(__name__)
 
 def get_constraint_list():
     constraint_list = [
-        Equal(),
-        # EqualGroup(),
-        Permutation(),
-        Series(),
-        AllDifferent(),
-        Projection(),
-        Rank(),
-        ForeignKey(),
-        Lookup(),
-        FuzzyLookup(),
-        RunningTotal(),
-        ForeignProduct(),
-        Product(),
-        Diff(),
-        PercentualDiff(),
-        SumProduct(),
-        Ordered(),
-        MutualExclusivity(),
-        MutualExclusiveVector()
+        Equal.instance(),
+        # EqualGroup.instance(),
+        Permutation.instance(),
+        Series.instance(),
+        AllDifferent.instance(),
+        Projection.instance(),
+        Rank.instance(),
+        ForeignKey.instance(),
+        Lookup.instance(),
+        FuzzyLookup.instance(),
+        RunningTotal.instance(),
+        ForeignProduct.instance(),
+        Product.instance(),
+        Diff.instance(),
+        PercentualDiff.instance(),
+        SumProduct.instance(),
+        Ordered.instance(),
+        MutualExclusivity.instance(),
+        MutualExclusiveVector.instance()
     ]
     constraint_list += Aggregate.instances()
     constraint_list += ConditionalAggregate.instances()